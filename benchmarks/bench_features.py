@@ -0,0 +1,115 @@
+"""Benchmarks of PPG fiducial detection, HRV features and activity indices"""
+
+import warnings
+
+import numpy as np
+
+from biobss.hrvtools.hrv_features import get_hrv_features
+from biobss.imutools.acc_activityindex import calc_activity_index
+from biobss.ppgtools.ppg_peaks import ppg_detectpeaks, ppg_waves
+from biobss.preprocess.signal_filter import filter_signal
+from biobss.preprocess.signal_segment import segment_signal
+
+from .signals import DURATIONS, SAMPLING_RATES, beat_times, get_signal, throughput
+
+
+class PPGWaves:
+    """ppg_waves on 60 s windows, as called by a windowed pipeline.
+    The 24 h recording is not included since its runtime is 24 times the 1 h case."""
+
+    params = ["1min", "1h"]
+    param_names = ["duration"]
+    timeout = 600
+
+    def setup(self, duration):
+        warnings.simplefilter("ignore")
+        sampling_rate = SAMPLING_RATES["PPG"]
+        sig = filter_signal(get_signal("PPG", duration), sampling_rate, signal_type="PPG", method="bandpass")
+        self.windows = []
+        for window in segment_signal(sig, sampling_rate, window_size=60, step_size=60):
+            onsets = np.asarray(ppg_detectpeaks(window, sampling_rate, method="scipy")["Trough_locs"])
+            try:
+                ppg_waves(window, onsets, sampling_rate)
+            except (IndexError, ValueError):
+                # windows where the fiducial search fails at the window edges are skipped
+                continue
+            self.windows.append((window, onsets))
+
+    def _run(self):
+        return [ppg_waves(window, onsets, SAMPLING_RATES["PPG"]) for window, onsets in self.windows]
+
+    def time_ppg_waves(self, duration):
+        self._run()
+
+    def peakmem_ppg_waves(self, duration):
+        self._run()
+
+    def track_throughput(self, duration):
+        return throughput(self._run, sum(len(window) for window, _ in self.windows))
+
+    track_throughput.unit = "samples/s"
+
+
+class HRVFeatures:
+    """get_hrv_features from the R peaks of an ECG recording"""
+
+    params = (["Time", "Freq", "Nonlinear"], list(DURATIONS))
+    param_names = ["feature_type", "duration"]
+    timeout = 600
+
+    def setup(self, feature_type, duration):
+        warnings.simplefilter("ignore")
+        sampling_rate = SAMPLING_RATES["ECG"]
+        beats = beat_times(DURATIONS[duration], np.random.default_rng(0))
+        self.peaks_locs = np.round(beats * sampling_rate).astype(int)
+
+    def _run(self, feature_type, duration):
+        return get_hrv_features(
+            SAMPLING_RATES["ECG"],
+            DURATIONS[duration],
+            signal_type="ECG",
+            input_type="peaks",
+            peaks_locs=self.peaks_locs,
+            feature_types=[feature_type],
+        )
+
+    def time_get_hrv_features(self, feature_type, duration):
+        self._run(feature_type, duration)
+
+    def peakmem_get_hrv_features(self, feature_type, duration):
+        self._run(feature_type, duration)
+
+    def track_throughput(self, feature_type, duration):
+        n_samples = DURATIONS[duration] * SAMPLING_RATES["ECG"]
+        return throughput(self._run, n_samples, feature_type, duration)
+
+    track_throughput.unit = "samples/s"
+
+
+class ActivityIndex:
+    """calc_activity_index on a three-axis acceleration recording"""
+
+    params = (["PIM", "ZCM", "MAD", "ENMO", "HFEN"], list(DURATIONS))
+    param_names = ["metric", "duration"]
+    timeout = 600
+
+    def setup(self, metric, duration):
+        warnings.simplefilter("ignore")
+        self.acc = get_signal("ACC", duration)
+
+    def _run(self, metric, duration):
+        kwargs = {"input_types": ["FXYZ"], "threshold": [0.1, 0.1, 1.0]} if metric == "ZCM" else {}
+        return calc_activity_index(
+            *self.acc, signal_length=DURATIONS[duration], sampling_rate=SAMPLING_RATES["ACC"], metric=metric, **kwargs
+        )
+
+    def time_calc_activity_index(self, metric, duration):
+        self._run(metric, duration)
+
+    def peakmem_calc_activity_index(self, metric, duration):
+        self._run(metric, duration)
+
+    def track_throughput(self, metric, duration):
+        return throughput(self._run, self.acc.size, metric, duration)
+
+    track_throughput.unit = "samples/s"
@@ -0,0 +1,59 @@
+"""Benchmarks of a full Bio_Pipeline run"""
+
+import warnings
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.ppgtools.ppg_features import from_segment
+from biobss.preprocess.signal_filter import filter_signal
+from biobss.preprocess.signal_normalize import normalize_signal
+
+from .signals import DURATIONS, SAMPLING_RATES, get_signal, throughput
+
+
+def build_ppg_pipeline(sig):
+    """Windowed PPG pipeline: bandpass filter, z-score normalization and time/frequency domain segment features"""
+    sampling_rate = SAMPLING_RATES["PPG"]
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=60, step_size=30)
+    pipeline.set_input(sig, sampling_rate=sampling_rate, name="ppg")
+    filter_process = Bio_Process(filter_signal, process_name="filter", signal_type="PPG", method="bandpass")
+    pipeline.process_queue.add_process(
+        filter_process, input_signals=["ppg"], output_signals=["ppg_filtered"], sampling_rate=sampling_rate
+    )
+    normalize = Bio_Process(normalize_signal, process_name="normalize")
+    pipeline.process_queue.add_process(normalize, input_signals=["ppg_filtered"], output_signals=["ppg_normalized"])
+    features = Feature("segment", from_segment, sampling_rate=sampling_rate, feature_types=["Time", "Freq"])
+    pipeline.add_feature_step(features, input_signals=["ppg_normalized"], feature_prefix="ppg")
+    return pipeline
+
+
+def run_pipeline(sig):
+    # the pipeline is rebuilt for every run, since the feature queue only runs steps that have not run yet
+    pipeline = build_ppg_pipeline(sig)
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    return pipeline.get_features()
+
+
+class PPGPipeline:
+    """Bio_Pipeline run with 60 s windows and 30 s steps"""
+
+    params = list(DURATIONS)
+    param_names = ["duration"]
+    timeout = 900
+
+    def setup(self, duration):
+        warnings.simplefilter("ignore")
+        self.sig = get_signal("PPG", duration)
+
+    def time_run_pipeline(self, duration):
+        run_pipeline(self.sig)
+
+    def peakmem_run_pipeline(self, duration):
+        run_pipeline(self.sig)
+
+    def track_throughput(self, duration):
+        return throughput(run_pipeline, len(self.sig), self.sig)
+
+    track_throughput.unit = "samples/s"
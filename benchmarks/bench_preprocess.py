@@ -0,0 +1,152 @@
+"""Benchmarks of segmentation, filtering and peak detection"""
+
+import time
+import warnings
+
+import numpy as np
+
+from biobss.preprocess.signal_detectpeaks import _peakdetection_peakdet, peak_detection
+from biobss.preprocess.signal_filter import filter_signal
+from biobss.preprocess.signal_segment import segment_signal
+
+from .signals import DURATIONS, SAMPLING_RATES, get_signal, throughput
+
+FILTER_METHODS = {"ECG": "pantompkins", "PPG": "bandpass", "ACC": "lowpass", "EDA": "neurokit"}
+
+
+class SegmentSignal:
+    """segment_signal with 10 s windows and 5 s steps"""
+
+    params = (["ECG", "PPG"], list(DURATIONS), [False, True])
+    param_names = ["signal_type", "duration", "as_view"]
+    timeout = 600
+
+    def setup(self, signal_type, duration, as_view):
+        self.sig = get_signal(signal_type, duration)
+        self.sampling_rate = SAMPLING_RATES[signal_type]
+
+    def _run(self, as_view):
+        return segment_signal(self.sig, self.sampling_rate, window_size=10, step_size=5, as_view=as_view)
+
+    def time_segment_signal(self, signal_type, duration, as_view):
+        self._run(as_view)
+
+    def peakmem_segment_signal(self, signal_type, duration, as_view):
+        self._run(as_view)
+
+    def track_throughput(self, signal_type, duration, as_view):
+        return throughput(self._run, len(self.sig), as_view)
+
+    track_throughput.unit = "samples/s"
+
+
+class FilterSignal:
+    """filter_signal with the predefined filter of each signal type"""
+
+    params = (list(FILTER_METHODS), list(DURATIONS))
+    param_names = ["signal_type", "duration"]
+    timeout = 600
+
+    def setup(self, signal_type, duration):
+        warnings.simplefilter("ignore")
+        self.sig = get_signal(signal_type, duration)
+        if signal_type == "ACC":
+            self.sig = self.sig[0]
+        self.sampling_rate = SAMPLING_RATES[signal_type]
+        self.signal_type = signal_type
+
+    def _run(self):
+        return filter_signal(
+            self.sig, self.sampling_rate, signal_type=self.signal_type, method=FILTER_METHODS[self.signal_type]
+        )
+
+    def time_filter_signal(self, signal_type, duration):
+        self._run()
+
+    def peakmem_filter_signal(self, signal_type, duration):
+        self._run()
+
+    def track_throughput(self, signal_type, duration):
+        return throughput(self._run, len(self.sig))
+
+    track_throughput.unit = "samples/s"
+
+
+class PeakDetection:
+    """peak_detection on a PPG signal"""
+
+    params = (["peakdet", "scipy"], list(DURATIONS))
+    param_names = ["method", "duration"]
+    timeout = 600
+
+    def setup(self, method, duration):
+        self.sig = get_signal("PPG", duration)
+        self.delta = 0.3 * np.std(self.sig)
+
+    def _run(self, method):
+        return peak_detection(self.sig, SAMPLING_RATES["PPG"], method=method, delta=self.delta)
+
+    def time_peak_detection(self, method, duration):
+        self._run(method)
+
+    def peakmem_peak_detection(self, method, duration):
+        self._run(method)
+
+    def track_throughput(self, method, duration):
+        return throughput(self._run, len(self.sig), method)
+
+    track_throughput.unit = "samples/s"
+
+
+class PeakdetSpeedup:
+    """Speedup of the vectorized peakdet over the sample-by-sample loop it replaced, with a check of exact parity"""
+
+    params = list(DURATIONS)
+    param_names = ["duration"]
+    timeout = 1200
+
+    def setup(self, duration):
+        self.sig = get_signal("PPG", duration)
+        self.delta = 0.3 * np.std(self.sig)
+
+    def track_speedup(self, duration):
+        start = time.perf_counter()
+        tables = _peakdetection_peakdet(self.sig, self.delta)
+        vectorized = time.perf_counter() - start
+        start = time.perf_counter()
+        loop_tables = _peakdet_loop(self.sig, self.delta)
+        loop = time.perf_counter() - start
+        if not all(np.array_equal(table, loop_table) for table, loop_table in zip(tables, loop_tables)):
+            raise AssertionError("vectorized peakdet differs from the loop")
+        return loop / vectorized
+
+    track_speedup.unit = "x"
+
+
+def _peakdet_loop(v, delta):
+    # the sample-by-sample implementation of peakdet
+    maxtab, mintab = [], []
+    mn, mx = np.inf, -np.inf
+    mnpos, mxpos = np.nan, np.nan
+    lookformax = True
+    for i in np.arange(len(v)):
+        this = v[i]
+        if this > mx:
+            mx = this
+            mxpos = i
+        if this < mn:
+            mn = this
+            mnpos = i
+        if lookformax:
+            if this < mx - delta:
+                maxtab.append((mxpos, mx))
+                mn = this
+                mnpos = i
+                lookformax = False
+        else:
+            if this > mn + delta:
+                mintab.append((mnpos, mn))
+                mx = this
+                mxpos = i
+                lookformax = True
+    return np.array(maxtab), np.array(mintab)
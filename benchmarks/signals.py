@@ -0,0 +1,116 @@
+"""Deterministic synthetic signals used by the benchmarks"""
+
+import time
+
+import numpy as np
+from scipy import signal
+
+SAMPLING_RATES = {"ECG": 256, "PPG": 64, "ACC": 32, "EDA": 4}
+
+DURATIONS = {"1min": 60, "1h": 3600, "24h": 86400}
+
+_SIGNALS = {}
+
+
+def get_signal(signal_type: str, duration: str, seed: int = 0):
+    """Returns a synthetic signal of the given type and duration. Signals are generated once per process.
+
+    Args:
+        signal_type (str): Signal type, one of 'ECG', 'PPG', 'ACC' and 'EDA'.
+        duration (str): Signal duration, one of '1min', '1h' and '24h'.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        ArrayLike: 1-D signal, or (3, n_samples) array for 'ACC'.
+    """
+    key = (signal_type, duration, seed)
+    if key not in _SIGNALS:
+        generator = GENERATORS[signal_type]
+        _SIGNALS[key] = generator(DURATIONS[duration], SAMPLING_RATES[signal_type], np.random.default_rng(seed))
+    return _SIGNALS[key]
+
+
+def beat_times(duration: float, rng, heart_rate: float = 70.0):
+    """Returns beat onset times (s) with respiratory and random heart rate variability"""
+    n_beats = int(duration * heart_rate / 60 * 1.2) + 2
+    rr = 60 / heart_rate * (1 + 0.05 * rng.standard_normal(n_beats))
+    rr *= 1 + 0.03 * np.sin(2 * np.pi * 0.25 * np.cumsum(rr))
+    times = np.cumsum(np.clip(rr, 0.4, 1.5))
+    return times[times < duration]
+
+
+def _beat_train(n_samples: int, sampling_rate: float, beats, amplitudes, template):
+    # places a beat template at every beat time, scaled by the beat amplitude
+    impulses = np.zeros(n_samples)
+    np.add.at(impulses, np.round(beats * sampling_rate).astype(int), amplitudes)
+    return signal.fftconvolve(impulses, template)[:n_samples]
+
+
+def _waves(sampling_rate: float, length: float, waves: list):
+    # beat template: sum of gaussian waves given as (center, width, amplitude) in seconds
+    t = np.arange(int(length * sampling_rate)) / sampling_rate
+    return sum(amplitude * np.exp(-0.5 * ((t - center) / width) ** 2) for center, width, amplitude in waves)
+
+
+def synthetic_ecg(duration: float, sampling_rate: float, rng):
+    """P-QRS-T complexes with baseline wander and noise (mV)"""
+    n_samples = int(duration * sampling_rate)
+    beats = beat_times(duration, rng)
+    template = _waves(
+        sampling_rate,
+        0.7,
+        [(0.1, 0.025, 0.15), (0.275, 0.01, -0.1), (0.3, 0.012, 1.2), (0.33, 0.01, -0.25), (0.6, 0.05, 0.3)],
+    )
+    # the R wave of the template is at 0.3 s
+    sig = _beat_train(n_samples, sampling_rate, np.clip(beats - 0.3, 0, None), np.ones(len(beats)), template)
+    t = np.arange(n_samples) / sampling_rate
+    sig += 0.1 * np.sin(2 * np.pi * 0.2 * t) + 0.02 * rng.standard_normal(n_samples)
+    return sig
+
+
+def synthetic_ppg(duration: float, sampling_rate: float, rng):
+    """Systolic and diastolic waves with baseline wander and noise"""
+    n_samples = int(duration * sampling_rate)
+    beats = beat_times(duration, rng)
+    amplitudes = 1 + 0.05 * rng.standard_normal(len(beats))
+    template = _waves(sampling_rate, 1.0, [(0.2, 0.08, 1.0), (0.45, 0.1, 0.45)])
+    sig = _beat_train(n_samples, sampling_rate, beats, amplitudes, template)
+    t = np.arange(n_samples) / sampling_rate
+    sig += 0.2 * np.sin(2 * np.pi * 0.25 * t) + 0.01 * rng.standard_normal(n_samples)
+    return sig
+
+
+def synthetic_acc(duration: float, sampling_rate: float, rng):
+    """Three-axis acceleration (g) with gravity on the z-axis, alternating rest and walking bouts"""
+    n_samples = int(duration * sampling_rate)
+    t = np.arange(n_samples) / sampling_rate
+    walking = (np.floor(t / 30) % 2).astype(float)
+    acc = 0.01 * rng.standard_normal((3, n_samples))
+    acc[0] += 0.3 * walking * np.sin(2 * np.pi * 1.8 * t)
+    acc[1] += 0.1 * walking * np.sin(2 * np.pi * 0.9 * t)
+    acc[2] += 1 + 0.2 * walking * np.sin(2 * np.pi * 1.8 * t + 0.5)
+    return acc
+
+
+def synthetic_eda(duration: float, sampling_rate: float, rng):
+    """Slowly drifting tonic level with skin conductance responses (uS)"""
+    n_samples = int(duration * sampling_rate)
+    t = np.arange(n_samples) / sampling_rate
+    sig = 5 + 0.5 * np.sin(2 * np.pi * t / 1800)
+    onsets = np.cumsum(rng.exponential(20, int(duration / 10) + 1))
+    onsets = onsets[onsets < duration]
+    for onset in onsets:
+        start = int(onset * sampling_rate)
+        rel = t[start : start + int(20 * sampling_rate)] - onset
+        sig[start : start + len(rel)] += 0.3 * (np.exp(-rel / 4) - np.exp(-rel / 0.75))
+    return sig + 0.005 * rng.standard_normal(n_samples)
+
+
+GENERATORS = {"ECG": synthetic_ecg, "PPG": synthetic_ppg, "ACC": synthetic_acc, "EDA": synthetic_eda}
+
+
+def throughput(function, n_samples: int, *args, **kwargs) -> float:
+    """Runs function once and returns the number of input samples processed per second"""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return n_samples / (time.perf_counter() - start)
@@ -1,4 +1,6 @@
+from .signal_dtype import *
 from .signal_entropy import *
 from .signal_fft import *
+from .signal_filter_design import *
 from .signal_hjorth import *
 from .signal_psd import *
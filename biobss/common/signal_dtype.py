@@ -0,0 +1,37 @@
+import numpy as np
+from numpy.typing import ArrayLike
+
+__all__ = ["float_dtype", "as_float_dtype"]
+
+
+def float_dtype(sig: ArrayLike) -> np.dtype:
+    """Returns the floating point dtype that a filtered or resampled version of the signal should have.
+
+    Args:
+        sig (ArrayLike): Input signal.
+
+    Returns:
+        np.dtype: dtype of sig if it is a float32 or float64 array, float32 for float16 arrays and float64 otherwise.
+    """
+
+    dtype = getattr(sig, "dtype", None)
+    if dtype is None or dtype.kind != "f":
+        return np.dtype(np.float64)
+    return np.promote_types(dtype, np.float32)
+
+
+def as_float_dtype(result: ArrayLike, sig: ArrayLike) -> ArrayLike:
+    """Casts the result computed from a signal back to the floating point dtype of the signal.
+    Filters are designed and run in float64, so float32 signals stay float32 without losing filter stability.
+
+    Args:
+        result (ArrayLike): Result computed from sig, e.g. a filtered signal.
+        sig (ArrayLike): Input signal.
+
+    Returns:
+        ArrayLike: result with the dtype given by float_dtype(sig).
+    """
+
+    if not isinstance(result, np.ndarray):
+        return result
+    return result.astype(float_dtype(sig), copy=False)
@@ -0,0 +1,138 @@
+import inspect
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy import signal
+
+__all__ = [
+    "MAX_DESIGNS",
+    "butter_sos",
+    "notch_ba",
+    "filter_cache_info",
+    "clear_filter_cache",
+    "register_filter_designs",
+    "precompute_filter_designs",
+]
+
+MAX_DESIGNS = 256
+
+_designs = OrderedDict()
+_designers = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def butter_sos(N: int, cutoff, btype: str, sampling_rate: float) -> np.ndarray:
+    """Returns the second-order sections of a N-th order Butterworth filter. Designs are cached, so filters applied to every window of a signal are only designed once.
+
+    Args:
+        N (int): Order of the filter.
+        cutoff (float or list): Cutoff frequency (Hz), or lower and upper cutoff frequencies (Hz) of bandpass filters.
+        btype (str): Type of the filter. Can be 'lowpass', 'highpass' or 'bandpass'.
+        sampling_rate (float): Sampling rate of the signal (Hz).
+
+    Returns:
+        np.ndarray: Second-order sections of the filter.
+    """
+
+    normalized = tuple(float(f / (sampling_rate / 2)) for f in np.atleast_1d(cutoff))  # normalized frequencies
+    key = ("butter", btype, N, normalized, sampling_rate)
+    Wn = normalized[0] if np.ndim(cutoff) == 0 else list(normalized)
+    return _cached_design(key, lambda: signal.butter(N, Wn, btype, output="sos"))
+
+
+def notch_ba(f_notch: float, quality_factor: float, sampling_rate: float) -> tuple:
+    """Returns the numerator and denominator of a second-order IIR notch filter. Designs are cached.
+
+    Args:
+        f_notch (float): Center frequency of the notch filter (Hz).
+        quality_factor (float): Quality factor (Q). It is calculated as Q = w0/bw where bw is the -3dB bandwidth.
+        sampling_rate (float): Sampling rate of the signal (Hz).
+
+    Returns:
+        tuple: Numerator (b) and denominator (a) of the filter.
+    """
+
+    key = ("notch", "bandstop", 2, (f_notch, quality_factor), sampling_rate)
+    return _cached_design(key, lambda: signal.iirnotch(f_notch, quality_factor, sampling_rate))
+
+
+def filter_cache_info() -> dict:
+    """Returns the statistics of the filter design cache.
+
+    Returns:
+        dict: Number of hits, misses, cached designs and the hit rate (hits / lookups, NaN before the first lookup).
+    """
+
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "size": len(_designs),
+            "hit_rate": _stats["hits"] / lookups if lookups > 0 else np.nan,
+        }
+
+
+def clear_filter_cache():
+    """Removes all cached filter designs and resets the cache statistics."""
+
+    with _lock:
+        _designs.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def register_filter_designs(function, designer):
+    """Registers the function computing the filter designs used by a filter function, so that they can be precomputed.
+
+    Args:
+        function (callable): Filter function taking the signal as first argument.
+        designer (callable): Function taking the remaining arguments of function and designing its filters with butter_sos and notch_ba.
+    """
+
+    _designers[function] = designer
+
+
+def precompute_filter_designs(function, *args, **kwargs) -> bool:
+    """Designs the filters a filter function would use with the given arguments, without a signal.
+
+    Args:
+        function (callable): Filter function, e.g. filter_signal or filter_ecg.
+        *args, **kwargs: Arguments of function after the signal.
+
+    Raises:
+        ValueError: If the filter parameters are invalid.
+
+    Returns:
+        bool: True if function has registered filter designs, False otherwise.
+    """
+
+    designer = _designers.get(function)
+    if designer is None:
+        return False
+    parameters = inspect.signature(designer).parameters
+    if not any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        kwargs = {key: value for key, value in kwargs.items() if key in parameters}
+    designer(*args, **kwargs)
+    return True
+
+
+def _cached_design(key, design):
+    with _lock:
+        value = _designs.get(key)
+        if value is not None:
+            _designs.move_to_end(key)
+            _stats["hits"] += 1
+        else:
+            _stats["misses"] += 1
+    if value is None:
+        value = design()
+        value = tuple(np.array(v) for v in value) if isinstance(value, tuple) else np.array(value)
+        with _lock:
+            _designs[key] = value
+            while len(_designs) > MAX_DESIGNS:
+                _designs.popitem(last=False)
+    # scipy filters need writable coefficients, callers get copies so that the cached designs cannot be modified
+    return tuple(v.copy() for v in value) if isinstance(value, tuple) else value.copy()
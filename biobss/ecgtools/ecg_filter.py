@@ -1,12 +1,18 @@
 from numpy.typing import ArrayLike
 from scipy import signal
 
+from biobss.common.signal_dtype import as_float_dtype
+from biobss.common.signal_filter_design import butter_sos, notch_ba, register_filter_designs
+
+# order and cutoff frequencies (Hz) of the predefined bandpass filters
+ECG_BANDPASS_PRESETS = {"pantompkins": (1, [5, 15]), "hamilton": (1, [8, 16]), "elgendi": (2, [8, 20])}
+
 
 def filter_ecg(sig: ArrayLike, sampling_rate: float, method: str, **kwargs) -> ArrayLike:
     """Filters ECG signal using predefined filter parameters.
 
     Args:
-            sig (ArrayLike): ECG signal.
+            sig (ArrayLike): ECG signal, or 2-D array of ECG signals (e.g. windows) filtered along the last axis.
             sampling_rate (float): Sampling rate of the ECG signal (Hz).
             method (str): Filtering method. Should be one of ['notch', 'bandpass', 'pantompkins', 'hamilton', 'elgendi].
 
@@ -40,7 +46,7 @@ def filter_ecg(sig: ArrayLike, sampling_rate: float, method: str, **kwargs) -> A
     else:
         raise ValueError(f"Undefined method: {method}.")
 
-    return filtered_sig
+    return as_float_dtype(filtered_sig, sig)
 
 
 def _filter_ecg_notch(sig: ArrayLike, sampling_rate: float, **kwargs) -> ArrayLike:
@@ -50,8 +56,8 @@ def _filter_ecg_notch(sig: ArrayLike, sampling_rate: float, **kwargs) -> ArrayLi
         if kwargs["f_notch"] <= 0:
             raise ValueError("Cut-off frequencies must be greater than 0.")
 
-        b, a = signal.iirnotch(kwargs["f_notch"], kwargs["quality_factor"], sampling_rate)
-        filtered_sig = signal.filtfilt(b, a, sig)
+        b, a = notch_ba(kwargs["f_notch"], kwargs["quality_factor"], sampling_rate)
+        filtered_sig = signal.filtfilt(b, a, sig, axis=-1)
     else:
         raise ValueError(f'Missing keyword arguments for the selected method: "notch".')
 
@@ -61,12 +67,8 @@ def _filter_ecg_notch(sig: ArrayLike, sampling_rate: float, **kwargs) -> ArrayLi
 def _filter_ecg_pantompkins(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
     """Filters ECG signal using the filter parameters defined in: Pan, J. & Tompkins, W. J.,(1985). 'A real-time QRS detection algorithm'."""
 
-    W1 = 5 / (sampling_rate / 2)  # normalized frequency
-    W2 = 15 / (sampling_rate / 2)  # normalized frequency
-    N = 1
-    btype = "bandpass"
-    sos = signal.butter(N, [W1, W2], btype, output="sos")
-    filtered_sig = signal.sosfiltfilt(sos, sig)
+    sos = _ecg_bandpass_sos("pantompkins", sampling_rate)
+    filtered_sig = signal.sosfiltfilt(sos, sig, axis=-1)
 
     return filtered_sig
 
@@ -74,12 +76,8 @@ def _filter_ecg_pantompkins(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
 def _filter_ecg_hamilton(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
     """Filters ECG signal using the filter parameters defined in: Hamilton, P.S. (2002), 'Open Source ECG Analysis Software Documentation'."""
 
-    W1 = 8 / (sampling_rate / 2)  # normalized frequency
-    W2 = 16 / (sampling_rate / 2)  # normalized frequency
-    N = 1
-    btype = "bandpass"
-    sos = signal.butter(N, [W1, W2], btype, output="sos")
-    filtered_sig = signal.sosfiltfilt(sos, sig)
+    sos = _ecg_bandpass_sos("hamilton", sampling_rate)
+    filtered_sig = signal.sosfiltfilt(sos, sig, axis=-1)
 
     return filtered_sig
 
@@ -87,11 +85,37 @@ def _filter_ecg_hamilton(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
 def _filter_ecg_elgendi(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
     """Filters ECG signal using the filter parameters defined in: Elgendi, M. & Jonkman, M. & De Boer, F. (2010). 'Frequency Bands Effects on QRS Detection'."""
 
-    W1 = 8 / (sampling_rate / 2)  # normalized frequency
-    W2 = 20 / (sampling_rate / 2)  # normalized frequency
-    N = 2
-    btype = "bandpass"
-    sos = signal.butter(N, [W1, W2], btype, output="sos")
-    filtered_sig = signal.sosfiltfilt(sos, sig)
+    sos = _ecg_bandpass_sos("elgendi", sampling_rate)
+    filtered_sig = signal.sosfiltfilt(sos, sig, axis=-1)
 
     return filtered_sig
+
+
+def _ecg_bandpass_sos(method: str, sampling_rate: float):
+    """Returns the second-order sections of a predefined ECG bandpass filter."""
+
+    N, cutoff = ECG_BANDPASS_PRESETS[method]
+    return butter_sos(N, cutoff, "bandpass", sampling_rate)
+
+
+def _filter_ecg_designs(sampling_rate: float, method: str, **kwargs):
+    """Designs the filters used by filter_ecg."""
+
+    if sampling_rate <= 0:
+        raise ValueError("Sampling rate must be greater than 0.")
+
+    method = method.lower()
+
+    if method == "notch":
+        if not all(k in kwargs.keys() for k in ("f_notch", "quality_factor")):
+            raise ValueError(f'Missing keyword arguments for the selected method: "notch".')
+        if kwargs["f_notch"] <= 0:
+            raise ValueError("Cut-off frequencies must be greater than 0.")
+        notch_ba(kwargs["f_notch"], kwargs["quality_factor"], sampling_rate)
+    elif method in ECG_BANDPASS_PRESETS:
+        _ecg_bandpass_sos(method, sampling_rate)
+    else:
+        raise ValueError(f"Undefined method: {method}.")
+
+
+register_filter_designs(filter_ecg, _filter_ecg_designs)
@@ -1,12 +1,16 @@
 import neurokit2 as nk
+import numpy as np
 from numpy.typing import ArrayLike
 
+from biobss.common.signal_dtype import as_float_dtype
+from biobss.common.signal_filter_design import butter_sos
+
 
 def filter_eda(sig: ArrayLike, sampling_rate: float, method: str = "neurokit") -> ArrayLike:
     """Filters EDA signal using predefined filter parameters.
 
     Args:
-        sig (ArrayLike): EDA signal.
+        sig (ArrayLike): EDA signal, or 2-D array of EDA signals (e.g. windows) filtered along the last axis.
         sampling_rate (float): Sampling rate of the EDA signal (Hz).
         method (str, optional): Filtering method. It can be 'neurokit' or 'biosppy'. Defaults to 'neurokit'.
 
@@ -18,8 +22,21 @@ def filter_eda(sig: ArrayLike, sampling_rate: float, method: str = "neurokit") -
     """
 
     if method == "neurokit" or method == "biosppy":
-        cleaned = nk.eda_clean(sig, sampling_rate=sampling_rate, method=method)
+        if np.ndim(sig) > 1:
+            # neurokit filters 1-D signals only
+            cleaned = np.apply_along_axis(nk.eda_clean, -1, sig, sampling_rate=sampling_rate, method=method)
+        else:
+            cleaned = nk.eda_clean(sig, sampling_rate=sampling_rate, method=method)
     else:
         raise Exception("Method not implemented.")
 
-    return cleaned
+    return as_float_dtype(cleaned, sig)
+
+
+def _eda_lowpass_sos(sampling_rate: float):
+    """Returns the second-order sections of the lowpass filter of the 'neurokit' method (4th order, 3 Hz), or None
+    if the sampling rate is too low for filtering, in which case neurokit returns the signal unchanged."""
+
+    if sampling_rate <= 6:
+        return None
+    return butter_sos(4, 3, "lowpass", sampling_rate)
@@ -31,6 +31,7 @@ def get_hrv_features(
     ppi: ArrayLike = None,
     feature_types: ArrayLike = ["Freq", "Time", "Nonlinear"],
     prefix: str = "hrv",
+    context=None,
 ) -> dict:
     """Calculates HRV parameters
 
@@ -45,6 +46,7 @@ def get_hrv_features(
         ppi (ArrayLike, optional): Peak-to-peak intervals of the ppg/ecg signal (miliseconds). Defaults to None.
         feature_types (ArrayLike, optional): List of the type of hrv parameters to be calculated. Defaults to ['Freq','Time','Nonlinear'].
         prefix (str, optional): Prefix for the calculated parameters. Defaults to 'hrv'.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
 
     Raises:
         ValueError: If elements of feature_types are not 'Freq', 'Time' or 'Nonlinear'.
@@ -84,13 +86,13 @@ def get_hrv_features(
                 if peaks_locs is None:
                     raise ValueError("The argument 'peaks_locs' is required.")
                 else:
-                    ppi = 1000 * np.diff(peaks_locs) / sampling_rate
+                    ppi = _calculate_ppi(peaks_locs, sampling_rate, context)
 
             elif input_type == "troughs":
                 if troughs_locs is None:
                     raise ValueError("The argument 'troughs_locs' is required.")
                 else:
-                    ppi = 1000 * np.diff(troughs_locs) / sampling_rate
+                    ppi = _calculate_ppi(troughs_locs, sampling_rate, context)
 
             else:
                 raise ValueError("Undefined input type: " + input_type)
@@ -99,3 +101,11 @@ def get_hrv_features(
             features.update(domain_function(ppi, sampling_rate, prefix=prefix))
 
     return features
+
+
+def _calculate_ppi(locs: ArrayLike, sampling_rate: float, context=None) -> ArrayLike:
+
+    if context is not None:
+        return context.get_or_compute("ppi", (locs, sampling_rate), lambda: _calculate_ppi(locs, sampling_rate))
+
+    return 1000 * np.diff(locs) / sampling_rate
@@ -3,7 +3,9 @@ import warnings
 import numpy as np
 from numpy.typing import ArrayLike
 
+from biobss.common.signal_filter_design import register_filter_designs
 from biobss.preprocess.signal_filter import *
+from biobss.preprocess.signal_filter import _butter_filter_sos
 
 DATA_TO_METRIC = {
     "PIM": ["FXYZ_modified", "UFM_modified", "UFNM", "FMpost_modified", "FMpre"],
@@ -232,14 +234,15 @@ def generate_dataset(
             raise ValueError("Required parameter filtered_order.")
 
         elif filtering_order == "pre":
-            f_x = filter_signal(
-                accx, filter_type=filter_type, N=N, sampling_rate=sampling_rate, f_lower=f_lower, f_upper=f_upper
-            )
-            f_y = filter_signal(
-                accy, filter_type=filter_type, N=N, sampling_rate=sampling_rate, f_lower=f_lower, f_upper=f_upper
-            )
-            f_z = filter_signal(
-                accz, filter_type=filter_type, N=N, sampling_rate=sampling_rate, f_lower=f_lower, f_upper=f_upper
+            # the three axes are filtered in a single call
+            f_x, f_y, f_z = filter_signal(
+                np.vstack([accx, accy, accz]),
+                filter_type=filter_type,
+                N=N,
+                sampling_rate=sampling_rate,
+                f_lower=f_lower,
+                f_upper=f_upper,
+                axis=-1,
             )
             if magnitude:
                 mag = _calc_magnitude(f_x, f_y, f_z)  # FMpre
@@ -444,3 +447,22 @@ def _calc_ai(sig: ArrayLike, baseline_variance: list) -> list:
         ai = [np.sqrt(max([np.mean([x_, y_, z_]), 0]))]
 
     return ai
+
+
+def _generate_dataset_designs(
+    sampling_rate: float,
+    filtering: bool = False,
+    filter_type: str = "bandpass",
+    N: int = 2,
+    f_lower: float = 0.5,
+    f_upper: float = 2,
+):
+    """Designs the filter used by generate_dataset."""
+
+    if sampling_rate <= 0:
+        raise ValueError("Sampling rate must be greater than 0.")
+    if filtering:
+        _butter_filter_sos(sampling_rate, filter_type, N, f_lower, f_upper)
+
+
+register_filter_designs(generate_dataset, _generate_dataset_designs)
@@ -1,12 +1,15 @@
 from numpy.typing import ArrayLike
 from scipy import signal
 
+from biobss.common.signal_dtype import as_float_dtype
+from biobss.common.signal_filter_design import butter_sos, register_filter_designs
+
 
 def filter_acc(sig: ArrayLike, sampling_rate: float, method: str = "lowpass") -> ArrayLike:
     """Filters ACC signal using predefined filter parameters.
 
     Args:
-        sig (ArrayLike): ACC signal.
+        sig (ArrayLike): ACC signal, or 2-D array of ACC signals (e.g. windows or axes) filtered along the last axis.
         sampling_rate (float): Sampling rate of the ACC signal (Hz).
         method (str, optional): Filtering method. Defaults to 'lowpass'.
 
@@ -29,16 +32,35 @@ def filter_acc(sig: ArrayLike, sampling_rate: float, method: str = "lowpass") ->
     else:
         raise ValueError(f"Undefined method: {method}.")
 
-    return filtered_sig
+    return as_float_dtype(filtered_sig, sig)
 
 
 def _filter_acc_lowpass(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
     """Filters ACC signal using a predefined lowpass filter."""
-    N = 2
-    btype = "lowpass"
-    W2 = 10 / (sampling_rate / 2)
-
-    sos = signal.butter(N, W2, btype, output="sos")
-    filtered_sig = signal.sosfiltfilt(sos, sig)
+    sos = _acc_lowpass_sos(sampling_rate)
+    filtered_sig = signal.sosfiltfilt(sos, sig, axis=-1)
 
     return filtered_sig
+
+
+def _acc_lowpass_sos(sampling_rate: float):
+    """Returns the second-order sections of the predefined ACC lowpass filter."""
+
+    return butter_sos(2, 10, "lowpass", sampling_rate)
+
+
+def _filter_acc_designs(sampling_rate: float, method: str = "lowpass"):
+    """Designs the filters used by filter_acc."""
+
+    if sampling_rate <= 0:
+        raise ValueError("Sampling rate must be greater than 0.")
+
+    method = method.lower()
+
+    if method == "lowpass":
+        _acc_lowpass_sos(sampling_rate)
+    else:
+        raise ValueError(f"Undefined method: {method}.")
+
+
+register_filter_designs(filter_acc, _filter_acc_designs)
@@ -1,6 +1,11 @@
+from .batch_runner import run_batch
 from .bio_channel import Channel
 from .bio_data import Bio_Data
 from .bio_process import Bio_Process
 from .event_channel import Event_Channel
+from .feature_context import Feature_Context
 from .feature_extraction import Feature
 from .pipeline import Bio_Pipeline
+from .pipeline_export import export_pipeline, import_pipeline
+from .result_cache import Result_Cache
+from .step_profiler import Step_Profiler
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from .pipeline import Bio_Pipeline
+from .pipeline_export import import_pipeline, pipeline_from_dict, pipeline_to_dict
+from .window_executor import check_executor
+
+"""runs a pipeline over many recordings with resumable per-recording outputs"""
+
+ERROR_POLICIES = ["continue", "raise"]
+
+
+def run_batch(
+    pipeline,
+    recordings: list,
+    output_dir: str,
+    loader=None,
+    names: list = None,
+    executor: str = "process",
+    n_workers: int = None,
+    overwrite: bool = False,
+    on_error: str = "continue",
+    run_kwargs: dict = None,
+) -> pd.DataFrame:
+    """Run a pipeline on a list of recordings and write the features of each recording to its own CSV file.
+    Outputs are written atomically as soon as a recording finishes, so an interrupted batch can be resumed:
+    recordings whose output already exists are skipped.
+
+    Parameters
+    ----------
+    pipeline: Bio_Pipeline, dict or str
+        Pipeline, pipeline definition (see pipeline_to_dict) or path of an exported definition. Workers rebuild
+        the pipeline from its definition, so the functions of its steps must be importable
+    recordings: list
+        Recordings to process. Each item is a path passed to loader, a callable without arguments returning the
+        input data, or the input data itself (Bio_Data or Channel)
+    output_dir: str
+        Directory of the feature files, one <name>.csv file for each recording
+    loader: callable
+        Function loading the input data (Bio_Data or Channel) of a recording path. Required if recordings are paths
+    names: list
+        Output names of the recordings. Defaults to the file name of paths without extension and to
+        'recording_<index>' for other recordings
+    executor: str
+        Backend used to run recordings concurrently. Should be one of 'serial', 'thread' or 'process'.
+        With 'process', loader and callable recordings must be picklable
+    n_workers: int
+        Number of workers of the pool
+    overwrite: bool
+        If True, recordings are processed even if their output exists
+    on_error: str
+        'continue' records the error of a failed recording and processes the remaining recordings,
+        'raise' raises the first error
+    run_kwargs: dict
+        Keyword arguments of Bio_Pipeline.run_pipeline, e.g. {'schedule': 'graph'}
+
+    Returns
+    -------
+    summary: pd.DataFrame
+        One row for each recording with its name, output file, status ('done', 'skipped' or 'failed'),
+        number of feature rows, run time in seconds and error message
+    """
+    check_executor(executor, n_workers)
+    if on_error not in ERROR_POLICIES:
+        raise ValueError(f"on_error must be one of {ERROR_POLICIES}")
+    if names is None:
+        names = [_recording_name(recording, i) for i, recording in enumerate(recordings)]
+    elif len(names) != len(recordings):
+        raise ValueError("names must have the same length as recordings")
+    if len(set(names)) != len(names):
+        raise ValueError("Recording names must be unique")
+    if loader is None and any(isinstance(r, (str, os.PathLike)) for r in recordings):
+        raise ValueError("loader is required when recordings are paths")
+
+    definition = _get_definition(pipeline)
+    os.makedirs(output_dir, exist_ok=True)
+    run_kwargs = {} if run_kwargs is None else run_kwargs
+
+    rows = {}
+    tasks = []
+    for name, recording in zip(names, recordings):
+        output = os.path.join(output_dir, name + ".csv")
+        if not overwrite and os.path.exists(output):
+            rows[name] = _summary_row(name, output, "skipped")
+        else:
+            tasks.append((definition, recording, loader, output, run_kwargs))
+
+    if executor == "serial":
+        for task in tasks:
+            rows[_task_name(task)] = _check_result(_run_recording(*task), on_error)
+    else:
+        pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+        with pool_class(max_workers=n_workers) as pool:
+            futures = [pool.submit(_run_recording, *task) for task in tasks]
+            try:
+                for future in as_completed(futures):
+                    row = _check_result(future.result(), on_error)
+                    rows[row["name"]] = row
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    return pd.DataFrame([rows[name] for name in names])
+
+
+def _run_recording(definition, recording, loader, output, run_kwargs):
+    name = _task_name((definition, recording, loader, output, run_kwargs))
+    start = time.perf_counter()
+    try:
+        if isinstance(recording, (str, os.PathLike)):
+            data = loader(recording)
+        elif callable(recording):
+            data = recording()
+        else:
+            data = recording
+        pipeline = pipeline_from_dict(definition)
+        pipeline.set_input(data)
+        pipeline.run_pipeline(**run_kwargs)
+        pipeline.extract_features()
+        features = pipeline.get_features()
+        _write_atomic(features, output)
+    except Exception as e:
+        row = _summary_row(name, output, "failed", duration=time.perf_counter() - start)
+        row["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+        return row
+    return _summary_row(name, output, "done", n_rows=len(features), duration=time.perf_counter() - start)
+
+
+def _write_atomic(features, output):
+    # a partially written file would be skipped when the batch is resumed
+    tmp_output = output + ".tmp"
+    features.to_csv(tmp_output)
+    os.replace(tmp_output, output)
+
+
+def _check_result(row, on_error):
+    if row["status"] == "failed" and on_error == "raise":
+        raise RuntimeError(f"Recording {row['name']} failed: {row['error']}")
+    return row
+
+
+def _summary_row(name, output, status, n_rows=None, duration=None):
+    return {"name": name, "output": output, "status": status, "rows": n_rows, "duration": duration, "error": None}
+
+
+def _task_name(task):
+    return os.path.splitext(os.path.basename(task[3]))[0]
+
+
+def _recording_name(recording, index):
+    if isinstance(recording, (str, os.PathLike)):
+        return os.path.splitext(os.path.basename(os.fspath(recording)))[0]
+    return f"recording_{index}"
+
+
+def _get_definition(pipeline):
+    if isinstance(pipeline, Bio_Pipeline):
+        return pipeline_to_dict(pipeline)
+    elif isinstance(pipeline, dict):
+        # validated before any recording is processed
+        pipeline_from_dict(pipeline)
+        return pipeline
+    elif isinstance(pipeline, (str, os.PathLike)):
+        return pipeline_to_dict(import_pipeline(os.fspath(pipeline)))
+    raise ValueError("pipeline must be a Bio_Pipeline, a pipeline definition or a path of an exported definition")
@@ -33,20 +33,120 @@ class Channel:
 
         # initialize channel data"""
 
-        self.channel = np.array(signal)
+        self.channel = signal
         self.signal_name = name
         self.sampling_rate = sampling_rate
 
+    @classmethod
+    def from_file(
+        cls,
+        filename: str,
+        name: str,
+        sampling_rate: float,
+        dtype=None,
+        offset: int = 0,
+        shape=None,
+        order: str = "C",
+    ) -> Channel:
+        # Docstring
+        """Creates a channel backed by a read-only memory map of a file, so the signal is read lazily
+        page by page instead of being loaded into memory
+        Parameters
+        ----------
+        filename: str
+            Path of a .npy file, opened with np.load(mmap_mode='r'), or of a raw binary file
+        name: str
+            Name of the signal
+        sampling_rate: float
+            Sampling rate of the signal
+        dtype: np.dtype or str
+            Data type of the samples of a raw file, e.g. '<i2'. Required for raw files
+        offset: int
+            Number of header bytes before the first sample of a raw file
+        shape: int or tuple
+            Shape of the samples of a raw file. Defaults to all samples after offset as a 1-D signal
+        order: str
+            Memory layout of a raw file with a multi-dimensional shape, 'C' or 'F'
+
+        Returns
+        -------
+        channel: Channel
+            Channel sharing the pages of the file
+        """
+        #
+        if str(filename).lower().endswith(".npy"):
+            if dtype is not None or offset != 0 or shape is not None:
+                raise ValueError("dtype, offset and shape are read from the header of .npy files")
+            signal = np.load(filename, mmap_mode="r")
+        else:
+            if dtype is None:
+                raise ValueError("dtype must be provided for raw files")
+            signal = np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=shape, order=order)
+        return cls(signal, name, sampling_rate)
+
+    @property
+    def channel(self):
+        """Read-only signal array of the channel"""
+        return self._channel
+
+    @channel.setter
+    def channel(self, signal: ArrayLike):
+        # Channels share their buffers on copy, so the stored array is always read-only.
+        # Writable inputs are copied once to keep later writes by the caller out of the channel.
+        if isinstance(signal, np.memmap):
+            if signal.mode == "r":
+                # copying would read the whole file, so read-only memory maps are stored as views that are paged
+                # in on access
+                signal = signal.view(np.ndarray)
+            else:
+                # the caller can still write to writable and copy-on-write maps, so they are read into memory
+                signal = np.array(signal)
+            signal.flags.writeable = False
+        elif type(signal) is not np.ndarray:
+            # lists and other array-likes are converted by a single copy, that is frozen instead of copied again.
+            # np.asarray could return a buffer that the caller still writes to, e.g. the values of a pd.Series
+            signal = np.array(signal)
+            signal.flags.writeable = False
+        elif signal.flags.writeable:
+            signal = signal.copy()
+            signal.flags.writeable = False
+        self._channel = signal
+
     def copy(self):
         # Docstring
-        """Returns a copy of the channel
+        """Returns a copy of the channel. The signal buffer is shared since it is read-only.
         Returns
         -------
         copy: Channel
             Copy of the channel
         """
         #
-        return copy.deepcopy(self)
+        return copy.copy(self)
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def astype(self, dtype):
+        # Docstring
+        """Returns a copy of the channel with a floating point signal converted to dtype.
+        Signals of other kinds (e.g. integer counts) and signals that already have dtype are not converted
+        Parameters
+        ----------
+        dtype: np.dtype or str
+            Floating point data type, e.g. np.float32
+        Returns
+        -------
+        channel: Channel
+            Channel with the converted signal, sharing the buffer if no conversion is needed
+        """
+        #
+        output = self.copy()
+        if self._channel.dtype.kind == "f" and self._channel.dtype != np.dtype(dtype):
+            converted = self._channel.astype(dtype)
+            # the converted array is not referenced elsewhere, so it is stored without a second copy
+            converted.flags.writeable = False
+            output.channel = converted
+        return output
 
     def __eq__(self, other: object) -> bool:
         # Docstring
@@ -113,6 +213,11 @@ class Channel:
         else:
             return self.channel.shape[0]
 
+    @property
+    def is_view(self):
+        """True if the channel is a view that does not own a compact buffer, e.g. overlapping windows"""
+        return self._channel.base is not None and not self._channel.flags.c_contiguous
+
     @property
     def segmented(self):
         return self.n_windows > 1
@@ -37,7 +37,8 @@ class Bio_Data:
         Parameters
         ----------
         signal: Union[ArrayLike, Channel ,Event_Channel]
-            Signal to add
+            Signal to add. Read-only arrays, e.g. memory maps opened with np.load(mmap_mode='r') or np.memmap(mode='r'),
+            are stored without copy. Writable memory maps are copied
         channel_name: str
             Name of the channel
         sampling_rate: Union[int, float]
@@ -78,8 +79,6 @@ class Bio_Data:
             self.channels[channel_name] = signal.copy()
 
         else:
-            if isinstance(signal, (np.ndarray, list)):
-                signal = np.array(signal)
             if sampling_rate is None:
                 raise ValueError("sampling_rate must be provided if signal is not a Channel or Event_Channel object")
             if not isinstance(sampling_rate, (int, float)):
@@ -133,7 +132,38 @@ class Bio_Data:
         return list(self.channels.keys())
 
     def copy(self):
-        return copy.deepcopy(self)
+        # Docstring
+        """Returns a copy of the Bio_Data object. Channel buffers are shared, only the channel objects are copied
+        Returns
+        -------
+        copy: Bio_Data
+            Copy of the Bio_Data object
+        """
+        #
+        output = Bio_Data()
+        output.channels = {k: v.copy() for k, v in self.channels.items()}
+        return output
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def astype(self, dtype):
+        # Docstring
+        """Returns a copy of the Bio_Data object with the floating point signal channels converted to dtype.
+        Event channels are not converted
+        Parameters
+        ----------
+        dtype: np.dtype or str
+            Floating point data type, e.g. np.float32
+        Returns
+        -------
+        copy: Bio_Data
+            Converted copy of the Bio_Data object
+        """
+        #
+        output = Bio_Data()
+        output.channels = {k: v.astype(dtype) if isinstance(v, Channel) else v.copy() for k, v in self.channels.items()}
+        return output
 
     def join(self, other: "Bio_Data", overwrite: bool = False):
         # Docstring
@@ -149,8 +179,7 @@ class Bio_Data:
         #
         if not isinstance(other, Bio_Data):
             raise ValueError("Can only join Bio_Data objects")
-        other = other.copy()
-        for k, v in other.channels.items():
+        for k, v in list(other.channels.items()):
             if k in self.channels.keys():
                 if overwrite:
                     warnings.warn("Overwriting channel " + k)
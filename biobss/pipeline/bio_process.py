@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import inspect
+from functools import lru_cache
+
+import numpy as np
 
 from .channel_input import *
 from .event_input import *
@@ -9,27 +12,62 @@ from .event_input import *
 
 
 class Bio_Process:
-    def __init__(self, process_method, process_name, *args, **kwargs):
+    def __init__(self, process_method, process_name, *args, batch=False, writes_input=False, **kwargs):
+        """Generic signal process object
+
+        Parameters
+        ----------
+        process_method: callable
+            Function to be applied to the input signals
+        process_name: str
+            Name of the process
+        batch: bool
+            If True, process_method accepts a 2-D (n_windows, n_samples) array and processes all windows
+            in a single call. The process queue then skips the per-window loop for this process.
+        writes_input: bool
+            If True, process_method modifies its input signals in place. Channels are read-only and windows
+            may be strided views of the same buffer, so the process receives writable copies of its inputs.
+        """
         self.process_method = process_method
         self.process_name = process_name
+        self.batch = batch
+        self.writes_input = writes_input
         self.args = args
         self.kwargs = kwargs
 
     def process_args(self, **kwargs):
         """Process the input arguments"""
-        signature = inspect.signature(self.process_method)
-        excess_args = []
-        for key in kwargs.keys():
-            if key not in signature.parameters.keys():
-                excess_args.append(key)
-        for e in excess_args:
-            kwargs.pop(e)
-        return kwargs
+        parameters = get_parameter_names(self.process_method)
+        return {key: value for key, value in kwargs.items() if key in parameters}
 
     def run(self, *args, **kwargs):
         """Run the process method on the input arguments"""
+        if self.writes_input:
+            args = tuple(writable_input(a) for a in args)
+            kwargs = {key: writable_input(value) for key, value in kwargs.items()}
         args = args + self.args
         kwargs = {**self.kwargs, **kwargs}
         kwargs = self.process_args(**kwargs)
         result = self.process_method(*args, **kwargs)
         return result
+
+
+def writable_input(value):
+    """Returns a writable copy of a read-only array, other values are returned as they are"""
+    if isinstance(value, np.ndarray) and not value.flags.writeable:
+        return np.array(value)
+    return value
+
+
+def get_parameter_names(function) -> frozenset:
+    """Returns the parameter names of function. Signatures are inspected once per function"""
+    try:
+        return _parameter_names(function)
+    except TypeError:
+        # unhashable callables are inspected on every call
+        return frozenset(inspect.signature(function).parameters)
+
+
+@lru_cache(maxsize=1024)
+def _parameter_names(function):
+    return frozenset(inspect.signature(function).parameters)
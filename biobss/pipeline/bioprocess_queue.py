@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+from ..common.signal_filter_design import precompute_filter_designs
 from .bio_data import Bio_Data
+from .bio_process import get_parameter_names, writable_input
 from .channel_input import *
 from .event_input import *
+from .result_cache import make_key
+from .window_executor import check_executor, run_windows
+
+SCHEDULES = ["sequential", "graph"]
 
 
 class Process_List:
@@ -15,6 +24,13 @@ class Process_List:
         self.is_event = []
         self.name = name
         self.processed_index = 0
+        self.executor = "serial"
+        self.n_workers = None
+        self.chunk_size = 1
+        self.cache = None
+        self.profiler = None
+        self.dtype = None
+        self._plan = None
 
     def add_process(self, process, input_signals=None, output_signals=None, is_event=False, *args, **kwargs):
         self.process_list.append(process)
@@ -27,97 +43,351 @@ class Process_List:
         else:
             raise ValueError("kwargs must be a dictionary or None")
         self.args.append(args)
+        self._plan = None
+
+    def compile(self) -> list:
+        """Compile the queue into a flat execution plan.
+        Signatures, filtered keyword arguments and input bindings are resolved once per process instead of
+        once per call. The plan is rebuilt when a process is added and at every run of the queue, so that
+        parameters of the processes modified in place are used.
+
+        Returns
+        -------
+        plan: list
+            One _Compiled_Step for each process of the queue
+        """
+        if self._plan is None or len(self._plan) != len(self.process_list):
+            self._plan = [_Compiled_Step(self, i) for i in range(len(self.process_list))]
+        return self._plan
+
+    def set_executor(self, executor="serial", n_workers=None, chunk_size=1):
+        """Set the backend used to run windowed processes
+
+        Parameters
+        ----------
+        executor: str
+            Execution backend. Should be one of 'serial', 'thread' or 'process'
+        n_workers: int
+            Number of workers of the pool
+        chunk_size: int
+            Number of windows sent to a worker at once
+        """
+        check_executor(executor, n_workers, chunk_size)
+        self.executor = executor
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+
+    def set_cache(self, cache):
+        """Set a Result_Cache used to reuse the outputs of processes. Use None to disable caching"""
+        self.cache = cache
 
-    def run_process_queue(self, bio_data: Bio_Data) -> Bio_Data:
+    def set_profiler(self, profiler):
+        """Set a Step_Profiler that records the cost of each process. Use None to disable profiling"""
+        self.profiler = profiler
 
+    def set_dtype(self, dtype):
+        """Set the floating point dtype of the signal outputs of processes, e.g. np.float32. Use None to keep
+        the dtype returned by the process functions"""
+        self.dtype = None if dtype is None else np.dtype(dtype)
+
+    def run_process_queue(
+        self, bio_data: Bio_Data, schedule="sequential", required_signals=None, steps=None
+    ) -> Bio_Data:
+        """Run the processes on the input data
+
+        Parameters
+        ----------
+        bio_data: Bio_Data
+            Input data
+        schedule: str
+            'sequential' runs the processes in insertion order. 'graph' runs processes that do not depend on
+            each other concurrently, level by level of the dependency graph
+        required_signals: list
+            If given, only the processes needed to produce these signals are run
+        steps: list
+            If given, only the processes with these indices are run. Their inputs must be in bio_data or be
+            produced by other given processes. Overrides required_signals
+
+        Returns
+        -------
+        bio_data: Bio_Data
+            Input data joined with the outputs of the processes
+        """
+        if schedule not in SCHEDULES:
+            raise ValueError(f"schedule must be one of {SCHEDULES}")
+        # compiling is cheap compared to a run, the plan is rebuilt in case process parameters were modified
+        self._plan = None
         bio_data = bio_data.copy()
-        for i in range(len(self.process_list)):
-            result = self.run_next(bio_data)
-            bio_data = bio_data.join(result)
-            self.processed_index += 1
+        input_names = bio_data.get_channel_names()
+        if steps is not None:
+            steps = sorted(steps)
+            # outputs of processes run earlier are not inputs of the queue for the dependency graph
+            earlier = {
+                name
+                for i in range(len(self.process_list))
+                if i not in steps
+                for name in self._signal_names(self.output_signals[i])
+            }
+            input_names = [name for name in input_names if name not in earlier]
+        elif required_signals is None:
+            steps = list(range(len(self.process_list)))
+        else:
+            steps = self.get_required_steps(required_signals, input_names)
+
+        if schedule == "sequential":
+            for i in steps:
+                result = self.run_step(bio_data, i)
+                bio_data = bio_data.join(result)
+        else:
+            dependencies, _ = self.get_dependencies(input_names)
+            for level in self.get_levels(steps, dependencies):
+                if len(level) == 1:
+                    results = [self.run_step(bio_data, level[0])]
+                else:
+                    with ThreadPoolExecutor(max_workers=len(level)) as pool:
+                        results = list(pool.map(lambda i: self.run_step(bio_data, i), level))
+                # join in insertion order so that channel names do not depend on completion order
+                for result in results:
+                    bio_data = bio_data.join(result)
+        self.processed_index = len(self.process_list)
         return bio_data
 
     def run_next(self, bio_data):
-        bio_data = bio_data.copy()
-        inputs = self.input_signals[self.processed_index]
-        outputs = self.output_signals[self.processed_index]
-        args = self.args[self.processed_index]
-        kwargs = self.kwargs[self.processed_index]
-        sampling_rate = kwargs.get("sampling_rate", None)
-        output_sampling_rate = kwargs.get("new_sr", None)
-        get_rate = False
-        input_args = ()
-        input_kwargs = {}
-        n_windows = []
-        if isinstance(inputs, dict):
-            if sampling_rate is None:
-                sampling_rate = []
-                get_rate = True
-            for key in inputs.keys():
-                input_kwargs.append({key: bio_data[inputs[key]].channel})
-                n_windows.append(bio_data[inputs[key]].n_windows)
-                if get_rate:
-                    sampling_rate.append(bio_data[inputs[key]].sampling_rate)
-        elif isinstance(inputs, list):
-            if sampling_rate is None:
-                sampling_rate = []
-                get_rate = True
-            for i in inputs:
-                input_args = input_args + (bio_data[i].channel,)
-                n_windows.append(bio_data[i].n_windows)
-                if get_rate:
-                    sampling_rate.append(bio_data[i].sampling_rate)
-        elif isinstance(inputs, str):
-            if sampling_rate is None:
-                sampling_rate = bio_data[inputs].sampling_rate
-            input_args = (bio_data[inputs].channel,)
-            n_windows.append(bio_data[inputs].n_windows)
+        return self.run_step(bio_data, self.processed_index)
+
+    def run_step(self, bio_data, index):
+        """Run a single process of the queue
+
+        Parameters
+        ----------
+        bio_data: Bio_Data
+            Data containing the input signals of the process
+        index: int
+            Index of the process in the queue
+
+        Returns
+        -------
+        output: Bio_Data
+            Output signals of the process
+        """
+        if self.profiler is not None:
+            name = self.process_list[index].process_name
+            return self.profiler.call("process", index, name, self._run_cached_step, bio_data, index)
+        return self._run_cached_step(bio_data, index)
+
+    def _run_cached_step(self, bio_data, index):
+        if self.cache is None:
+            return self._run_step(bio_data, index)
+        key = make_key(
+            "process",
+            [bio_data[name] for name in self._signal_names(self.input_signals[index])],
+            self.process_list[index],
+            self.input_signals[index],
+            self.output_signals[index],
+            self.is_event[index],
+            self.args[index],
+            self.kwargs[index],
+            self.dtype,
+        )
+        output = self.cache.get(key)
+        if output is None:
+            output = self._run_step(bio_data, index)
+            self.cache.set(key, output)
+        return output
+
+    def _run_step(self, bio_data, index):
+        step = self.compile()[index]
+        input_args = tuple(bio_data[name].channel for name in step.arg_names)
+        input_kwargs = {key: bio_data[name].channel for key, name in step.kwarg_names.items()}
+        n_windows = [bio_data[name].n_windows for name in step.input_names]
+        sampling_rate = step.sampling_rate
+        if sampling_rate is None:
+            if isinstance(self.input_signals[index], str):
+                sampling_rate = bio_data[step.input_names[0]].sampling_rate
+            else:
+                sampling_rate = [bio_data[name].sampling_rate for name in step.input_names]
 
         if any(n_windows[0] != n for n in n_windows):
             raise ValueError("All input channels must have the same number of windows")
 
-        results = []
-        if n_windows[0] == 1:
-            current_args = input_args + args
-            current_kwargs = {**input_kwargs, **kwargs}
-            results = self.run_single(current_args, current_kwargs)
+        if n_windows[0] == 1 or step.batch:
+            # batch processes receive the whole (n_windows, n_samples) channel in a single call
+            results = step(*input_args, **input_kwargs)
         else:
+            tasks = []
             for i in range(n_windows[0]):
-                current_args = [x[i] for x in input_args]
-                current_args = tuple(current_args)
-                current_kwargs = {key: input_kwargs[key][i] for key in input_kwargs.keys()}
-                current_args = current_args + args
-                current_kwargs = {**current_kwargs, **kwargs}
-                results.append(self.run_single(current_args, current_kwargs))
-
-        output = self._handle_results(results, sampling_rate, outputs, n_windows[0], output_sampling_rate)
+                current_args = tuple(x[i] for x in input_args)
+                current_kwargs = {key: value[i] for key, value in input_kwargs.items()}
+                tasks.append((current_args, current_kwargs))
+            results = run_windows(
+                step,
+                tasks,
+                executor=self.executor,
+                n_workers=self.n_workers,
+                chunk_size=self.chunk_size,
+            )
+
+        output = self._handle_results(results, sampling_rate, step.outputs, n_windows[0], step.new_sr, index)
         return output
 
-    def _handle_results(self, results, sampling_rate, name, n_windows, new_sr):
+    def _handle_results(self, results, sampling_rate, name, n_windows, new_sr, index=None):
+        if index is None:
+            index = self.processed_index
 
         if not new_sr is None:
             sampling_rate = new_sr
-        if not self.is_event[self.processed_index]:
+        if not self.is_event[index]:
             results = np.array(results).reshape(len(name), n_windows, -1)
             results = np.squeeze(results)
+            if self.dtype is not None and results.dtype.kind == "f":
+                results = results.astype(self.dtype, copy=False)
+            # the freshly stacked results are not referenced elsewhere, so the channels can share them
+            results.flags.writeable = False
             output = convert_channel(results, sampling_rate=sampling_rate, name=name, n_windows=n_windows)
-        elif self.is_event[self.processed_index]:
+        elif self.is_event[index]:
             output = convert_event(results, sampling_rate=sampling_rate, name=name, n_windows=n_windows)
 
         return output
 
-    def run_single(self, args, kwargs):
-
-        result = self.process_list[self.processed_index].run(*args, **kwargs)
+    def run_single(self, args, kwargs, index=None):
+        if index is None:
+            index = self.processed_index
+        result = self.process_list[index].run(*args, **kwargs)
 
         return result
 
+    def get_dependencies(self, input_names=()):
+        """Build the dependency graph of the processes from their input and output signals
+
+        Parameters
+        ----------
+        input_names: list
+            Names of the channels available before the first process
+
+        Returns
+        -------
+        dependencies: list
+            Set of process indices each process depends on
+        producers: dict
+            Index of the process producing each signal
+        """
+        available = set(input_names)
+        producers = {}
+        dependencies = []
+        for i in range(len(self.process_list)):
+            dependencies.append(
+                {producers[name] for name in self._signal_names(self.input_signals[i]) if name in producers}
+            )
+            for name in self._signal_names(self.output_signals[i]):
+                # Bio_Data.join renames outputs that already exist
+                if name in available:
+                    name = name + "_1"
+                available.add(name)
+                producers[name] = i
+        return dependencies, producers
+
+    def get_required_steps(self, signals, input_names=()):
+        """Find the processes needed to produce the given signals
+
+        Parameters
+        ----------
+        signals: list
+            Names of the required signals
+        input_names: list
+            Names of the channels available before the first process
+
+        Returns
+        -------
+        steps: list
+            Sorted indices of the required processes
+        """
+        dependencies, producers = self.get_dependencies(input_names)
+        required = set()
+        stack = [producers[s] for s in self._signal_names(signals) if s in producers]
+        while stack:
+            step = stack.pop()
+            if step not in required:
+                required.add(step)
+                stack.extend(dependencies[step])
+        return sorted(required)
+
+    def get_levels(self, steps, dependencies):
+        """Group processes into levels that can run concurrently
+
+        Parameters
+        ----------
+        steps: list
+            Indices of the processes to schedule
+        dependencies: list
+            Output of get_dependencies
+
+        Returns
+        -------
+        levels: list
+            List of lists of process indices. Each process only depends on processes of earlier levels
+        """
+        depth = {}
+        for i in sorted(steps):
+            depth[i] = 1 + max([depth[d] for d in dependencies[i] if d in depth], default=-1)
+        levels = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for i in sorted(steps):
+            levels[depth[i]].append(i)
+        return levels
+
+    def _signal_names(self, signals):
+        if isinstance(signals, str):
+            return [signals]
+        elif isinstance(signals, dict):
+            signals = list(signals.values())
+        names = []
+        for s in signals:
+            if isinstance(s, (list, tuple)):
+                names.extend(s)
+            else:
+                names.append(s)
+        return names
+
     def get_process_by_name(self, name):
         for process in self.process_list:
             if process.name == name:
                 return process
         raise ValueError("Process with name " + name + " not found")
 
+    def update_process(self, index, **kwargs):
+        """Update the keyword arguments of a process of the queue
+
+        Parameters
+        ----------
+        index: int or str
+            Index or name of the process
+        kwargs:
+            Keyword arguments merged into the queue keyword arguments of the process. They take precedence over
+            the keyword arguments of the Bio_Process
+        """
+        if isinstance(index, str):
+            names = [process.process_name for process in self.process_list]
+            if index not in names:
+                raise ValueError("Process with name " + index + " not found")
+            index = names.index(index)
+        self.kwargs[index] = {**self.kwargs[index], **kwargs}
+        self._plan = None
+
+    def precompute_filters(self) -> int:
+        """Design the filters of the processes before the queue runs, so that no window pays for a filter design.
+        The designs are stored in the filter design cache of biobss.common
+
+        Returns
+        -------
+        n_processes: int
+            Number of processes whose filters were designed
+        """
+        n_processes = 0
+        for step in self.compile():
+            arguments = _filter_arguments(step)
+            if arguments is not None:
+                n_processes += precompute_filter_designs(step.method, **arguments)
+        return n_processes
+
     def _process_io(self, input_signals, output_signals):
 
         """Check output signals and convert to list of list of strings"""
@@ -166,3 +436,64 @@ class Process_List:
             representation += "\t" + str(i + 1) + ": " + process + "(" + process_in + ") -> " + process_out + "\n"
 
         return representation
+
+
+class _Compiled_Step:
+    """Call binding of a single process of a Process_List, resolved once"""
+
+    def __init__(self, queue, index):
+        process = queue.process_list[index]
+        inputs = queue.input_signals[index]
+        kwargs = queue.kwargs[index]
+        parameters = get_parameter_names(process.process_method)
+        self.method = process.process_method
+        self.batch = process.batch
+        self.writes_input = process.writes_input
+        self.outputs = queue.output_signals[index]
+        self.sampling_rate = kwargs.get("sampling_rate", None)
+        self.new_sr = kwargs.get("new_sr", None)
+        if isinstance(inputs, dict):
+            self.arg_names = []
+            self.kwarg_names = dict(inputs)
+        elif isinstance(inputs, str):
+            self.arg_names = [inputs]
+            self.kwarg_names = {}
+        else:
+            self.arg_names = list(inputs)
+            self.kwarg_names = {}
+        self.input_names = self.arg_names + list(self.kwarg_names.values())
+        # keyword precedence of Bio_Process.run: queue kwargs > input signals > process kwargs
+        self.args = queue.args[index] + process.args
+        self.kwargs = {k: v for k, v in {**process.kwargs, **kwargs}.items() if k in parameters}
+        self.input_keys = {k for k in self.kwarg_names if k in parameters and k not in kwargs}
+
+    def __call__(self, *inputs, **input_kwargs):
+        if self.writes_input:
+            # the process receives writable copies instead of the read-only (possibly strided) windows
+            inputs = tuple(writable_input(x) for x in inputs)
+            input_kwargs = {k: writable_input(v) for k, v in input_kwargs.items()}
+        if input_kwargs:
+            kwargs = dict(self.kwargs)
+            kwargs.update((k, v) for k, v in input_kwargs.items() if k in self.input_keys)
+        else:
+            kwargs = self.kwargs
+        return self.method(*inputs, *self.args, **kwargs)
+
+
+def _filter_arguments(step):
+    # arguments of the process function after its input signals, or None if they cannot be bound
+    try:
+        signature = inspect.signature(step.method)
+        bound = signature.bind_partial(*([None] * len(step.arg_names)), *step.args, **step.kwargs)
+    except (TypeError, ValueError):
+        return None
+    parameters = list(signature.parameters.values())
+    inputs = {p.name for p in parameters[: len(step.arg_names)]} | set(step.kwarg_names)
+    arguments = {}
+    for name, value in bound.arguments.items():
+        kind = signature.parameters[name].kind
+        if kind == inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        elif kind != inspect.Parameter.VAR_POSITIONAL and name not in inputs:
+            arguments[name] = value
+    return arguments
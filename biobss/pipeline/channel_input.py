@@ -58,7 +58,7 @@ def _from_dataframe(signal, sampling_rate=None, name=None, n_windows=1, n_signal
     output = Bio_Data()
     for key in signal.keys():
         data = signal[key]
-        data = np.array(data)
+        data = _frozen_copy(data)
         data = data.reshape(n_windows, -1)
         data = data.squeeze()
         output.add_channel(Channel(data, key, sampling_rate))
@@ -88,7 +88,8 @@ def _from_dict(signal, sampling_rate=None, name=None, n_windows=1, n_signal=None
         if not isinstance(signal[key], (list, tuple, np.ndarray)):
             raise ValueError("signal must be a list, tuple or numpy array")
         data = signal[key]
-        data = np.array(data)
+        # arrays are not copied here, so memory maps stay lazily loaded
+        data = data if isinstance(data, np.ndarray) else _frozen_copy(data)
         data = data.reshape(n_windows, -1)
         data = data.squeeze()
         output.add_channel(Channel(data, key, sampling_rate))
@@ -134,7 +135,7 @@ def _from_list(signal, sampling_rate=None, name=None, n_windows=1, n_signal=None
         if len(name) != len(signal):
             raise ValueError("name must be a string or a list of length len(signal)")
 
-    signal = np.array(signal)
+    signal = _frozen_copy(signal)
     if n_signal is None:
         n_signal = 1
 
@@ -192,7 +193,7 @@ def _from_tuple(signal, sampling_rate=None, name=None, n_windows=1, n_signal=Non
     output = Bio_Data()
     _check_sampling_rate(sampling_rate, n_signal)
     for i, s in enumerate(signal):
-        data = np.array(s)
+        data = _frozen_copy(s)
         data = data.reshape(n_windows, -1)
         data = data.squeeze()
         if name == "signal":
@@ -278,3 +279,11 @@ def _check_sampling_rate(sampling_rate, n_signal):
                 elif rate <= 0:
                     raise ValueError("sampling_rate must be positive")
     return True
+
+
+def _frozen_copy(data):
+    # the new array is only referenced by the channels created from it, so it is frozen instead of being copied
+    # again by Channel
+    data = np.array(data)
+    data.flags.writeable = False
+    return data
@@ -7,12 +7,37 @@ from numpy.typing import ArrayLike
 
 
 class Event_Channel:
-    """Biological signal channel class"""
+    """Biological event channel class"""
 
     def __init__(self, events: list, name: str, sampling_rate: float):
 
-        if not isinstance(events, list):
-            raise ValueError("events data must be a list")
+        # Docstring
+        """Biological event channel class. Events are stored in a compressed sparse row layout:
+        a single flat array of event values (e.g. sample indices) and an array of window offsets,
+        so that the events of window i are indices[offsets[i]:offsets[i + 1]].
+        Parameters
+        ----------
+        events: list or ArrayLike
+            Events of a single window (a flat list or 1-D array) or a list with the events of each window
+        name: str
+            Name of the events
+        sampling_rate: float
+            Sampling rate of the signal the events belong to
+
+        Attributes
+        -----------
+        indices: np.ndarray
+            Read-only flat array of the events of all windows
+        offsets: np.ndarray
+            Read-only array of n_windows + 1 offsets of the windows in indices
+        signal_name: str
+            Name of the events
+        sampling_rate: float
+            Sampling rate of the signal the events belong to
+        """
+        #
+        if not isinstance(events, (list, np.ndarray)):
+            raise ValueError("events data must be a list or numpy array")
         elif len(events) == 0:
             raise ValueError("events must have at least one key")
         elif not isinstance(name, str):
@@ -24,6 +49,72 @@ class Event_Channel:
         self.signal_name = name
         self.sampling_rate = sampling_rate
 
+    @classmethod
+    def from_windows(cls, windows: list, name: str, sampling_rate: float) -> Event_Channel:
+        # Docstring
+        """Creates a segmented event channel from the events of each window, even if there is a single window
+        Parameters
+        ----------
+        windows: list
+            Events of each window. Scalars are treated as windows with a single event
+        """
+        #
+        indices, offsets = _pack_windows(windows)
+        return cls.from_arrays(indices, offsets, name, sampling_rate)
+
+    @classmethod
+    def from_arrays(cls, indices: ArrayLike, offsets: ArrayLike, name: str, sampling_rate: float) -> Event_Channel:
+        # Docstring
+        """Creates an event channel from its flat events and window offsets without copying read-only arrays
+        Parameters
+        ----------
+        indices: ArrayLike
+            Flat array of the events of all windows
+        offsets: ArrayLike
+            Offsets of the windows in indices. None for an unsegmented channel
+        """
+        #
+        output = cls.__new__(cls)
+        output._set_arrays(indices, offsets)
+        output.signal_name = name
+        output.sampling_rate = sampling_rate
+        return output
+
+    @property
+    def channel(self):
+        """Events of the channel: the flat event array of an unsegmented channel,
+        a list with a read-only view of the events of each window otherwise"""
+        if not self._windowed:
+            return self.indices
+        if self._windows is None:
+            self._windows = [self.indices[start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+        return self._windows
+
+    @channel.setter
+    def channel(self, events):
+        if isinstance(events, np.ndarray) and events.ndim > 1:
+            self._set_arrays(*_pack_windows(list(events)))
+        elif all(isinstance(value, (np.ndarray, list)) for value in events):
+            self._set_arrays(*_pack_windows(events))
+        else:
+            self._set_arrays(events, None)
+
+    def _set_arrays(self, indices, offsets):
+        indices = _read_only(_as_event_array(indices))
+        if indices.ndim != 1:
+            raise ValueError("events must be one-dimensional")
+        self._windowed = offsets is not None
+        if offsets is None:
+            offsets = np.array([0, len(indices)], dtype=np.int64)
+        offsets = _read_only(np.asarray(offsets, dtype=np.int64))
+        if offsets.ndim != 1 or len(offsets) < 2 or offsets[0] != 0 or offsets[-1] != len(indices):
+            raise ValueError("offsets must start at 0 and end at the number of events")
+        if np.any(np.diff(offsets) < 0):
+            raise ValueError("offsets must be non-decreasing")
+        self.indices = indices
+        self.offsets = offsets
+        self._windows = None
+
     def get_event(self, event_name: str):
         if event_name in self.channel.keys():
             return self.channel[event_name]
@@ -32,10 +123,10 @@ class Event_Channel:
 
     def get_window(self, window_index):
 
-        if self.n_windows == 1:
-            return self.channel
+        if not self._windowed:
+            return self.indices
         else:
-            return self.channel[window_index]
+            return self.indices[self.offsets[window_index] : self.offsets[window_index + 1]]
 
     def __getitem__(self, event_name: str):
         return self.get_event(event_name)
@@ -44,23 +135,105 @@ class Event_Channel:
         if not isinstance(event, (np.ndarray, list)):
             raise ValueError("event must be a list or numpy array")
         else:
-            self.channel = list(event)
+            self.channel = event
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Event_Channel):
             raise ValueError("other must be an Event_Channel object")
         return (
-            self.channel == other.channel
+            self._windowed == other._windowed
+            and np.array_equal(self.offsets, other.offsets)
+            and np.array_equal(self.indices, other.indices)
             and self.signal_name == other.signal_name
             and self.sampling_rate == other.sampling_rate
         )
 
+    def __getstate__(self):
+        # only the two arrays are serialized, the window views are rebuilt on access
+        state = self.__dict__.copy()
+        state["_windows"] = None
+        return state
+
     def copy(self):
-        return copy.deepcopy(self)
+        # the event arrays are read-only, so copies share them
+        return copy.copy(self)
 
     def __copy__(self):
+        output = type(self).__new__(type(self))
+        output.__dict__.update(self.__dict__)
+        return output
+
+    def __deepcopy__(self, memo):
         return self.copy()
 
+    def segment(self, window_size: float, step_size: float, n_windows: int = None) -> Event_Channel:
+        # Docstring
+        """Splits the events of an unsegmented channel into windows, like segment_signal splits a signal.
+        Events are sample indices, they are shifted to be relative to the start of their window.
+        Parameters
+        ----------
+        window_size: float
+            Window size in seconds
+        step_size: float
+            Step size in seconds
+        n_windows: int
+            Number of windows. Defaults to the number of windows ending before the last event
+
+        Returns
+        -------
+        windowed: Event_Channel
+            Segmented channel
+        """
+        #
+        if self._windowed:
+            raise ValueError("Event channel is already segmented")
+        window_samples = int(window_size * self.sampling_rate)
+        step_samples = int(step_size * self.sampling_rate)
+        if window_samples <= 0 or step_samples <= 0:
+            raise ValueError("window_size and step_size must be positive")
+        events = np.sort(self.indices, kind="stable")
+        if n_windows is None:
+            length = int(events[-1]) + 1 if len(events) > 0 else window_samples
+            n_windows = max(int(np.floor((length - window_samples) / step_samples)) + 1, 1)
+
+        starts = np.arange(n_windows, dtype=np.int64) * step_samples
+        first = np.searchsorted(events, starts, side="left")
+        last = np.searchsorted(events, starts + window_samples, side="left")
+        counts = last - first
+        offsets = np.zeros(n_windows + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        # position of each output event in the sorted events: first[window] + rank within the window
+        positions = np.arange(offsets[-1], dtype=np.int64) + np.repeat(first - offsets[:-1], counts)
+        indices = events[positions] - np.repeat(starts, counts).astype(events.dtype)
+        return Event_Channel.from_arrays(indices, offsets, self.signal_name, self.sampling_rate)
+
+    def to_absolute(self, step_size: float = None, window_starts: ArrayLike = None) -> np.ndarray:
+        # Docstring
+        """Returns the events of all windows as sample indices of the unsegmented signal
+        Parameters
+        ----------
+        step_size: float
+            Step size of the windows in seconds, the window i starts at sample i * step_size * sampling_rate
+        window_starts: ArrayLike
+            Start sample of each window. Overrides step_size
+
+        Returns
+        -------
+        indices: np.ndarray
+            Flat array of the shifted events of all windows, in window order
+        """
+        #
+        if not self._windowed:
+            return self.indices.copy()
+        if window_starts is None:
+            if step_size is None:
+                raise ValueError("step_size or window_starts must be given")
+            window_starts = np.arange(self.n_windows, dtype=np.int64) * int(step_size * self.sampling_rate)
+        window_starts = np.asarray(window_starts)
+        if len(window_starts) != self.n_windows:
+            raise ValueError("window_starts must have one value for each window")
+        return self.indices + np.repeat(window_starts, np.diff(self.offsets))
+
     def get_timestamp(self):
         if self.n_windows == 1:
             return np.array([0])
@@ -83,11 +256,53 @@ class Event_Channel:
 
     @property
     def n_windows(self):
-        if all(isinstance(value, (np.ndarray, list)) for value in self.channel):
-            return len(self.channel)
-        else:
-            return 1
+        return len(self.offsets) - 1 if self._windowed else 1
+
+    @property
+    def window_counts(self):
+        """Number of events of each window"""
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.offsets.nbytes
 
     @property
     def segmented(self):
         return self.n_windows > 1
+
+
+def _pack_windows(windows):
+    # concatenates the events of each window into a single array and returns it with the window offsets
+    windows = [np.ravel(_as_event_array(window)) for window in windows]
+    offsets = np.zeros(len(windows) + 1, dtype=np.int64)
+    np.cumsum([len(window) for window in windows], out=offsets[1:])
+    dtypes = [window.dtype for window in windows if len(window) > 0]
+    dtype = np.result_type(*dtypes) if dtypes else np.int64
+    indices = np.concatenate(windows).astype(dtype, copy=False) if windows else np.array([], dtype=dtype)
+    return indices, offsets
+
+
+def _as_event_array(events):
+    events = np.asarray(events)
+    if events.dtype == object:
+        # lists converted by event_input hold python numbers, they are packed into a numeric array if possible
+        try:
+            events = np.asarray(events.tolist())
+        except ValueError:
+            pass
+    if events.ndim == 0:
+        events = events.reshape(1)
+    if events.size == 0:
+        events = events.astype(np.int64).ravel()
+    elif events.dtype.kind == "b":
+        events = events.astype(np.int64)
+    return events
+
+
+def _read_only(array):
+    # event arrays are shared by copies of the channel, so writable inputs are copied once
+    if array.flags.writeable:
+        array = array.copy()
+        array.flags.writeable = False
+    return array
@@ -141,8 +141,10 @@ def _from_array_list(event, name, sampling_rate, n_windows=1, n_signal=None):
             data = data.squeeze()
             output.append(data.tolist())
         if n_windows == 1:
-            output = output[0]
-        output = Event_Channel(output, name, sampling_rate)
+            output = Event_Channel(output[0], name, sampling_rate)
+        else:
+            # windows with a single event are squeezed to scalars, so the windows are passed explicitly
+            output = Event_Channel.from_windows(output, name, sampling_rate)
 
         return output
 
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+
+"""per-window store of intermediate results shared by feature functions"""
+
+
+class Feature_Context:
+    """Intermediate results of a single window, shared by the feature steps of a Feature_Queue"""
+
+    def __init__(self):
+        # Docstring
+        """Intermediate results of a single window, shared by the feature steps of a Feature_Queue.
+        Feature functions that accept a 'context' argument receive the context of the current window.
+        Values are keyed by a name and the identity of the arrays they are computed from, so a value
+        is only reused when it is requested for the same input buffers. Stored arrays are made read-only
+        since they are shared by the steps of the window.
+
+        Attributes
+        -----------
+        hits: int
+            Number of requests served from the context
+        misses: int
+            Number of requests that computed a new value
+        """
+        #
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, name: str, sources, function):
+        # Docstring
+        """Returns the intermediate 'name' computed from sources, computing it with function if needed
+        Parameters
+        ----------
+        name: str
+            Name of the intermediate result, e.g. 'vpg', 'apg', 'fiducials' or 'ppi'
+        sources: object or tuple
+            Input(s) the value is computed from. Arrays are identified by their buffer, other values by equality
+        function: callable
+            Function without arguments that computes the value
+        """
+        #
+        key = self._key(name, sources)
+        if key in self._values:
+            self.hits += 1
+            return self._values[key][0]
+        self.misses += 1
+        value = _read_only(function())
+        # the sources are kept alive with the value so that their buffer addresses are not reused
+        self._values[key] = (value, sources)
+        return value
+
+    def set(self, name: str, sources, value):
+        """Stores the intermediate 'name' computed from sources"""
+        self._values[self._key(name, sources)] = (_read_only(value), sources)
+
+    def get(self, name: str, sources, default=None):
+        """Returns the intermediate 'name' computed from sources, or default if it is not stored"""
+        return self._values.get(self._key(name, sources), (default,))[0]
+
+    def __contains__(self, name: str) -> bool:
+        return any(key[0] == name for key in self._values)
+
+    def clear(self):
+        self._values = {}
+
+    def _key(self, name, sources):
+        if not isinstance(sources, tuple):
+            sources = (sources,)
+        return (name,) + tuple(_source_key(s) for s in sources)
+
+
+def _source_key(source):
+    if isinstance(source, np.ndarray):
+        return ("ndarray", source.__array_interface__["data"][0], source.shape, source.strides, source.dtype.str)
+    elif isinstance(source, (list, dict)):
+        return (type(source).__name__, id(source))
+    elif isinstance(source, tuple):
+        return tuple(_source_key(s) for s in source)
+    return source
+
+
+def _read_only(value):
+    # the arrays of a value are shared by the steps of the window, a step must not modify them in place
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _read_only(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _read_only(v)
+    return value
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import inspect
 from distutils.log import warn
 
 import pandas as pd
 
+from .bio_process import get_parameter_names
+
 
 class Feature:
     def __init__(self, name, function, *args, **kwargs):
@@ -24,14 +25,8 @@ class Feature:
 
     def _process_args(self, **kwargs):
 
-        signature = inspect.signature(self.function)
-        excess_args = []
-        for key in kwargs.keys():
-            if key not in signature.parameters.keys():
-                excess_args.append(key)
-        for e in excess_args:
-            kwargs.pop(e)
-        return kwargs
+        parameters = get_parameter_names(self.function)
+        return {key: value for key, value in kwargs.items() if key in parameters}
 
     def __extract(self, *args, **kwargs):
 
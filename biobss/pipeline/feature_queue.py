@@ -7,7 +7,10 @@ import numpy as np
 import pandas as pd
 
 from .bio_data import Bio_Data
+from .feature_context import Feature_Context
 from .feature_extraction import Feature
+from .result_cache import make_key
+from .window_executor import check_executor, run_windows
 
 
 class Feature_Queue:
@@ -21,6 +24,11 @@ class Feature_Queue:
         self.processed_index = 0
         self.feature_set = pd.DataFrame()
         self.prefix = []
+        self.executor = "serial"
+        self.n_workers = None
+        self.chunk_size = 1
+        self.cache = None
+        self.profiler = None
 
     def add_feature(self, feature, input_signals=None, feature_prefix=None, *args, **kwargs):
         self.extraction_list.append(feature)
@@ -29,33 +37,163 @@ class Feature_Queue:
         self.kwargs.append(kwargs)
         self.prefix.append(feature_prefix)
 
+    def set_executor(self, executor="serial", n_workers=None, chunk_size=1):
+        """Set the backend used to extract features from windows
+
+        Parameters
+        ----------
+        executor: str
+            Execution backend. Should be one of 'serial', 'thread' or 'process'
+        n_workers: int
+            Number of workers of the pool
+        chunk_size: int
+            Number of windows sent to a worker at once
+        """
+        check_executor(executor, n_workers, chunk_size)
+        self.executor = executor
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+
+    def set_cache(self, cache):
+        """Set a Result_Cache used to reuse the outputs of feature steps. Use None to disable caching"""
+        self.cache = cache
+
+    def set_profiler(self, profiler):
+        """Set a Step_Profiler that records the cost of each feature step. Use None to disable profiling"""
+        self.profiler = profiler
+
     def run_feature_queue(self, bio_data: Bio_Data, reset=False) -> pd.DataFrame:
-        bio_data = bio_data.copy()
         if reset:
             self.reset()
-        for i in range(len(self.extraction_list)):
-            res = self.run_next(bio_data)
-            if self.prefix[i] is not None:
-                res.columns = [self.prefix[i] + "_" + c for c in res.columns]
-            self.feature_set = pd.concat([self.feature_set, res], axis=1)
-            self.processed_index += 1
+        steps = list(range(self.processed_index, len(self.extraction_list)))
+        results = self.run_steps(bio_data, steps)
+        self.processed_index = len(self.extraction_list)
+        # a single concatenation for all steps
+        self.feature_set = pd.concat([self.feature_set] + [results[i] for i in steps], axis=1)
 
         return self.feature_set
 
-    def run_next(self, bio_data: Bio_Data):
+    def run_steps(self, bio_data: Bio_Data, steps) -> dict:
+        """Runs the given feature steps without adding their features to feature_set
+
+        Parameters
+        ----------
+        bio_data: Bio_Data
+            Data containing the input signals of the steps
+        steps: list
+            Indices of the feature steps to run
+
+        Returns
+        -------
+        results: dict
+            Features of each step (pd.DataFrame with prefixed column names), keyed by step index
+        """
+        steps = list(steps)
+        if self.windowed:
+            results = self._run_windowed_steps(bio_data, steps)
+        else:
+            # intermediate results are shared by all steps of the queue
+            context = Feature_Context()
+            results = {}
+            for i in steps:
+                self.processed_index = i
+                results[i] = self._profile(i, self.run_next, bio_data, context=context)
+        for i in steps:
+            if self.prefix[i] is not None:
+                results[i].columns = [self.prefix[i] + "_" + c for c in results[i].columns]
+        return results
+
+    def run_next(self, bio_data: Bio_Data, context=None):
         inputs = self.input_signals[self.processed_index]
         args = self.args[self.processed_index]
         kwargs = self.kwargs[self.processed_index]
+        if self.cache is not None:
+            key = self._cache_key(bio_data, self.processed_index)
+            result = self.cache.get(key)
+            if result is not None:
+                return result
         if self.windowed:
             result = self.run_windowed(inputs, args, kwargs, bio_data)
         else:
-            result = self.run_single(inputs, args, kwargs, bio_data)
+            result = self.run_single(inputs, args, kwargs, bio_data, context=context)
+        if self.cache is not None:
+            self.cache.set(key, result)
 
         return result
 
-    def run_single(self, inputs, args, kwargs, bio_data, index=None):
-        input_keys = self._get_input_keys(inputs)
+    def _cache_key(self, bio_data, index):
+        inputs = self.input_signals[index]
+        return make_key(
+            "feature",
+            [bio_data[name] for name in self.get_input_names(inputs)],
+            self.extraction_list[index],
+            inputs,
+            self.args[index],
+            self.kwargs[index],
+            self.windowed,
+        )
+
+    def _profile(self, index, function, *args, **kwargs):
+        if self.profiler is None:
+            return function(*args, **kwargs)
+        return self.profiler.call("feature", index, self.extraction_list[index].name, function, *args, **kwargs)
+
+    def _run_windowed_steps(self, bio_data, steps):
+        """Runs the given feature steps window by window, so that the steps of a window share a Feature_Context"""
+        if self.profiler is not None:
+            # each step is measured over all of its windows, so intermediates are not shared between steps
+            return {i: self._profile(i, lambda i=i: self._run_step_group(bio_data, [i])[i]) for i in steps}
+        return self._run_step_group(bio_data, steps)
 
+    def _run_step_group(self, bio_data, steps):
+        results = {}
+        groups = {}
+        for i in steps:
+            if self.cache is not None:
+                result = self.cache.get(self._cache_key(bio_data, i))
+                if result is not None:
+                    results[i] = result
+                    continue
+            n_windows = self._count_windows(self.input_signals[i], bio_data)
+            if n_windows > 1:
+                groups.setdefault(n_windows, []).append(i)
+            else:
+                self.processed_index = i
+                results[i] = self.run_single(self.input_signals[i], self.args[i], self.kwargs[i], bio_data)
+
+        for n_windows, group in groups.items():
+            features = [self.extraction_list[i] for i in group]
+            tasks = []
+            for w in range(n_windows):
+                calls = [
+                    self._get_arguments(self.input_signals[i], self.args[i], self.kwargs[i], bio_data, w) for i in group
+                ]
+                tasks.append(((features, calls), {}))
+            outputs = run_windows(
+                _run_window, tasks, executor=self.executor, n_workers=self.n_workers, chunk_size=self.chunk_size
+            )
+            for j, i in enumerate(group):
+                # column names generated for unnamed outputs depend on the current step
+                self.processed_index = i
+                results[i] = self._to_columns([output[j] for output in outputs])
+
+        if self.cache is not None:
+            for i in steps:
+                self.cache.set(self._cache_key(bio_data, i), results[i])
+        return results
+
+    def run_single(self, inputs, args, kwargs, bio_data, index=None, context=None):
+        args, kwargs = self._get_arguments(inputs, args, kwargs, bio_data, index)
+        context = Feature_Context() if context is None else context
+        args, kwargs = _as_float64(args, kwargs, context)
+        kwargs["context"] = context
+        result = self.extraction_list[self.processed_index].process(*args, **kwargs)
+        result = self._process_results_single(result)
+        result.index = [index]
+        return result
+
+    def _get_arguments(self, inputs, args, kwargs, bio_data, index=None):
+        kwargs = dict(kwargs)
         if isinstance(inputs, dict):
             for key, value in inputs.items():
                 if isinstance(value, str):
@@ -77,15 +215,35 @@ class Feature_Queue:
         else:
             raise ValueError("Inputs must be a string, list, or dictionary.")
 
-        result = self.extraction_list[self.processed_index].process(*args, **kwargs)
-        result = self._process_results_single(result)
-        result.index = [index]
-        return result
+        return args, kwargs
 
     def run_windowed(self, inputs, args, kwargs, bio_data):
-        n_windows = []
-        results = []  # list of results for each window, to be concatenated
+        n_windows = self._count_windows(inputs, bio_data)
+        if n_windows > 1:
+            tasks = [
+                (
+                    (
+                        [self.extraction_list[self.processed_index]],
+                        [self._get_arguments(inputs, args, kwargs, bio_data, i)],
+                    ),
+                    {},
+                )
+                for i in range(n_windows)
+            ]
+            outputs = run_windows(
+                _run_window,
+                tasks,
+                executor=self.executor,
+                n_workers=self.n_workers,
+                chunk_size=self.chunk_size,
+            )
+            results = self._to_columns([output[0] for output in outputs])
+        else:
+            results = self.run_single(inputs, args, kwargs, bio_data)
+        return results
 
+    def _count_windows(self, inputs, bio_data):
+        n_windows = []
         input_keys = self._get_input_keys(inputs)
         for key in input_keys:
             if isinstance(key, str):
@@ -99,14 +257,35 @@ class Feature_Queue:
                 else:
                     n_windows.append(input_windows[0])
 
-        n_windows = min(n_windows)
-        if n_windows > 1:
-            for i in range(n_windows):
-                results.append(self.run_single(inputs, args, kwargs, bio_data, i))
-        else:
-            results.append(self.run_single(inputs, args, kwargs, bio_data))
-        results = pd.concat(results)
-        return results
+        return min(n_windows)
+
+    def _to_columns(self, outputs):
+        # window results are written into preallocated columns, the data frame is built once
+        columns = _Column_Store(len(outputs))
+        for i, output in enumerate(outputs):
+            columns.set_row(i, *self._flatten_results(output))
+        return columns.to_frame()
+
+    def _flatten_results(self, results):
+        """Returns the column names and values of the feature row of a single window"""
+        if isinstance(results, dict) and all(np.isscalar(v) or v is None for v in results.values()):
+            # fast path for the most common output, equivalent to pd.DataFrame([results])
+            return list(results.keys()), list(results.values())
+        frame = self._process_results_single(results)
+        if len(frame) == 0:
+            return [], []
+        if len(frame) != 1:
+            raise ValueError("Feature must return a single row for each window.")
+        return list(frame.columns), list(frame.iloc[0])
+
+    def get_input_names(self, inputs=None):
+        """Returns the names of the signals used by the given inputs, or by all feature steps if inputs is None"""
+        names = []
+        for inputs in self.input_signals if inputs is None else [inputs]:
+            for key in self._get_input_keys(inputs):
+                keys = key if isinstance(key, list) else [key]
+                names.extend(k for k in keys if k not in names)
+        return names
 
     def _get_input_keys(self, inputs):
         if isinstance(inputs, dict):
@@ -235,3 +414,99 @@ class Feature_Queue:
                 input_args.append(bio_data[i].channel)
 
         return np.array(input_args)
+
+
+def _run_window(features, calls):
+    """Runs the feature steps of a single window with a shared Feature_Context"""
+    context = Feature_Context()
+    outputs = []
+    for feature, (args, kwargs) in zip(features, calls):
+        args, kwargs = _as_float64(args, kwargs, context)
+        kwargs["context"] = context
+        outputs.append(feature.process(*args, **kwargs))
+    return outputs
+
+
+def _as_float64(args, kwargs, context):
+    # features are computed in float64, inputs of lower precision are converted once per window and context
+    # so that the steps sharing the context receive the same converted buffers
+    def convert(value):
+        if isinstance(value, np.ndarray) and value.dtype.kind == "f" and value.dtype.itemsize < 8:
+            return context.get_or_compute("float64", value, lambda: value.astype(np.float64))
+        elif isinstance(value, list):
+            return [convert(v) for v in value]
+        return value
+
+    return tuple(convert(a) for a in args), {k: convert(v) for k, v in kwargs.items()}
+
+
+class _Column_Store:
+    """Preallocated feature columns, filled one window (row) at a time"""
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.columns = []
+        self._positions = {}
+        self._values = []  # one array for each column, with the dtype of the values seen so far
+        self._filled = []  # mask of the rows set in each column
+
+    def set_row(self, row, columns, values):
+        for column, value in zip(columns, values):
+            # schema is discovered on the first window and extended when a window returns new columns
+            position = self._positions.get(column)
+            if position is None:
+                position = self._add_column(column, _value_kind(value))
+            kind = _column_kind(self._values[position].dtype.kind, _value_kind(value))
+            if kind != self._values[position].dtype.kind:
+                self._values[position] = _with_missing(self._values[position], self._filled[position], kind)
+            self._values[position][row] = value
+            self._filled[position][row] = True
+
+    def to_frame(self):
+        data = {}
+        for column, values, filled in zip(self.columns, self._values, self._filled):
+            # restore the dtypes that concatenated per-window data frames would have produced: integer and boolean
+            # columns are only kept if every window has a value, missing values are NaN
+            if not filled.all():
+                values = _with_missing(values, filled, "f" if values.dtype.kind in "fi" else "O")
+            if values.dtype == object:
+                values = pd.Series(values, dtype=object).infer_objects().to_numpy()
+            data[column] = values
+        return pd.DataFrame(data, columns=self.columns, index=range(self.n_rows))
+
+    def _add_column(self, column, kind):
+        self._positions[column] = len(self.columns)
+        self.columns.append(column)
+        self._values.append(np.empty(self.n_rows, dtype=_KIND_DTYPES[kind]))
+        self._filled.append(np.zeros(self.n_rows, dtype=bool))
+        return self._positions[column]
+
+
+_KIND_DTYPES = {"b": bool, "i": np.int64, "f": np.float64, "O": object}
+
+
+def _column_kind(column_kind, value_kind):
+    # integers and floats are stored as floats, other mixed columns as objects
+    if column_kind == value_kind:
+        return column_kind
+    elif {column_kind, value_kind} == {"i", "f"}:
+        return "f"
+    return "O"
+
+
+def _with_missing(values, filled, kind):
+    # converts a column and sets its missing rows to NaN
+    values = values.astype(_KIND_DTYPES[kind])
+    if kind in "fO":
+        values[~filled] = np.nan
+    return values
+
+
+def _value_kind(value):
+    if isinstance(value, (bool, np.bool_)):
+        return "b"
+    elif isinstance(value, (int, np.integer)) and -(2**63) <= value < 2**63:
+        return "i"
+    elif isinstance(value, (float, np.floating)):
+        return "f"
+    return "O"
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import csv
+import os
+import time
+from collections import deque
 from copy import copy
 from typing import Union
 
+import numpy as np
 import pandas as pd
 from numpy.typing import ArrayLike
 
@@ -16,6 +21,8 @@ from .channel_input import *
 from .event_input import *
 from .feature_extraction import Feature
 from .feature_queue import Feature_Queue
+from .result_cache import make_key
+from .window_buffer import Window_Buffer
 
 """a biological signal processing object with preprocessing and postprocessing steps"""
 
@@ -26,7 +33,27 @@ class Bio_Pipeline:
         windowed_process=False,
         window_size=None,
         step_size=None,
+        window_view=False,
+        dtype=None,
     ):
+        """Biological signal processing pipeline
+
+        Parameters
+        ----------
+        windowed_process: bool
+            If True, the input channels are segmented into windows before processing
+        window_size: float
+            Window size in seconds
+        step_size: float
+            Step size in seconds
+        window_view: bool
+            If True, windows are read-only views over the input buffer instead of copies. With channels created by
+            Channel.from_file, the windows then read the file lazily
+        dtype: np.dtype or str
+            Floating point dtype of the signal channels, windows and process outputs, e.g. np.float32 to halve
+            their memory. Filters keep the dtype of their input and feature steps receive float64 windows.
+            If None, the channels keep their dtype and windows and process outputs are float64
+        """
         if windowed_process:
             self.windowed = True
             if window_size is None or step_size is None:
@@ -37,10 +64,16 @@ class Bio_Pipeline:
             self.window_size = "Not Windowed"
             self.step_size = "Not Windowed"
             self.windowed = False
+        self.window_view = window_view
+        self.dtype = None if dtype is None else np.dtype(dtype)
 
         self.process_queue = Process_List(name="Process_List")
+        self.process_queue.set_dtype(self.dtype)
         self.features = pd.DataFrame()
         self.feature_list = Feature_Queue()
+        self.profiler = None
+        self._state = None  # signatures of the processes run on the current data, see run_pipeline
+        self._feature_results = {}  # features of each feature step, keyed by signature
 
     def set_input(
         self,
@@ -71,55 +104,485 @@ class Bio_Pipeline:
         self.step_size = step_size
 
     def convert_windows(self):
-        for ch in self.data.get_channel_names():
-            channel = self.data[ch]
+        self._segment(self.data)
+        self.feature_list.windowed = True
+        self.segmented = True
+        pass
+
+    def _segment(self, data):
+        # splits the channels of data into the windows of the pipeline, in place
+        n_windows = None
+        event_names = []
+        for ch in data.get_channel_names():
+            channel = data[ch]
             if isinstance(channel, Event_Channel):
-                is_event = True
-            else:
-                is_event = False
+                # events are split after the signals, into the same number of windows
+                event_names.append(ch)
+                continue
 
             windowed = segment_signal(
                 signal=channel.channel,
                 window_size=self.window_size,
                 step_size=self.step_size,
                 sampling_rate=channel.sampling_rate,
-                is_event=is_event,
+                as_view=self.window_view,
+                dtype=self.dtype,
             )
-            if is_event:
-                windowed = Event_Channel(windowed, name=channel.signal_name, sampling_rate=channel.sampling_rate)
-            else:
-                windowed = Channel(windowed, name=channel.signal_name, sampling_rate=channel.sampling_rate)
+            windowed = Channel(windowed, name=channel.signal_name, sampling_rate=channel.sampling_rate)
+            n_windows = windowed.n_windows if n_windows is None else max(n_windows, windowed.n_windows)
 
-        self.data[ch] = windowed
-        self.feature_list.windowed = True
-        self.segmented = True
-        pass
+            data[ch] = windowed
+        for ch in event_names:
+            data[ch] = data[ch].segment(self.window_size, self.step_size, n_windows=n_windows)
+
+    def set_cache(self, cache):
+        """Set a Result_Cache shared by the process queue and the feature queue. Use None to disable caching
+
+        Parameters
+        ----------
+        cache: Result_Cache
+            Cache of the step results
+        """
+        self.process_queue.set_cache(cache)
+        self.feature_list.set_cache(cache)
+
+    def precompute_filters(self) -> int:
+        """Design the filters of the processes before the pipeline runs. The designs are cached and reused by
+        every window, see Process_List.precompute_filters
 
-    def extract_features(self):
-        self.features = self.feature_list.run_feature_queue(self.data)
+        Returns
+        -------
+        n_processes: int
+            Number of processes whose filters were designed
+        """
+        return self.process_queue.precompute_filters()
+
+    def set_profiler(self, profiler):
+        """Set a Step_Profiler shared by the process queue and the feature queue. Use None to disable profiling
+
+        Parameters
+        ----------
+        profiler: Step_Profiler
+            Profiler recording the wall time, CPU time, windows, peak memory and output size of each step
+        """
+        self.process_queue.set_profiler(profiler)
+        self.feature_list.set_profiler(profiler)
+        self.profiler = profiler
+
+    def extract_features(self, executor="serial", n_workers=None, chunk_size=1, incremental=False):
+        """Extract features from the processed data
+
+        Parameters
+        ----------
+        executor: str
+            Backend used to run windows. Should be one of 'serial', 'thread' or 'process'
+        n_workers: int
+            Number of workers of the pool
+        chunk_size: int
+            Number of windows sent to a worker at once
+        incremental: bool
+            If True, all feature steps are evaluated, reusing the features of the steps whose definition and
+            input signals did not change since the last incremental extraction. Otherwise only the steps added
+            since the last extraction are run
+        """
+        self.feature_list.set_executor(executor, n_workers, chunk_size)
+        feature_list = self.feature_list
+        if self._state is not None and incremental:
+            # processes changed since the last run are run again before their features are extracted
+            self._invalidate_steps()
+            if not self._state["lazy"]:
+                self.compute()
+        if self._state is not None and self._state["lazy"]:
+            pending = range(0 if incremental else feature_list.processed_index, len(feature_list.extraction_list))
+            signals = []
+            for i in pending:
+                signals.extend(feature_list.get_input_names(feature_list.input_signals[i]))
+            self.compute(signals)
+        if not incremental:
+            self.features = feature_list.run_feature_queue(self.data)
+            return
+
+        signatures = self._feature_signatures()
+        missing = [i for i, signature in enumerate(signatures) if signature not in self._feature_results]
+        results = feature_list.run_steps(self.data, missing)
+        for i in missing:
+            self._feature_results[signatures[i]] = results[i]
+        # features of removed or changed steps are dropped
+        self._feature_results = {signature: self._feature_results[signature] for signature in signatures}
+        frames = [self._feature_results[signature] for signature in signatures]
+        feature_list.feature_set = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        feature_list.processed_index = len(feature_list.extraction_list)
+        self.features = feature_list.feature_set
 
     def add_feature_step(self, feature: Feature, input_signals, *args, **kwargs):
         self.feature_list.add_feature(feature, input_signals, *args, **kwargs)
 
-    def run_pipeline(self):
-        try:
-            self.data = copy(self.input)
-        except AttributeError:
+    def run_pipeline(
+        self,
+        executor="serial",
+        n_workers=None,
+        chunk_size=1,
+        schedule="sequential",
+        prune=False,
+        lazy=False,
+        incremental=False,
+    ):
+        """Run the process queue on the input data
+
+        Parameters
+        ----------
+        executor: str
+            Backend used to run windows. Should be one of 'serial', 'thread' or 'process'
+        n_workers: int
+            Number of workers of the pool
+        chunk_size: int
+            Number of windows sent to a worker at once
+        schedule: str
+            'sequential' runs processes in insertion order, 'graph' runs independent processes concurrently
+        prune: bool
+            If True, only the processes whose outputs are used by the feature steps are run
+        lazy: bool
+            If True, the input data is prepared but no process is run. Processes are run on demand:
+            extract_features runs the processes needed by its feature steps and compute runs the processes
+            needed for given signals. Each process is run at most once
+        incremental: bool
+            If True and the input data did not change since the last run, the outputs of the previous run are
+            reused. Only the processes whose definition (function, parameters, inputs and outputs) changed,
+            the processes downstream of them and new processes are run
+        """
+        self.process_queue.set_executor(executor, n_workers, chunk_size)
+        if getattr(self, "input", None) is None:
             raise ValueError("Input data must be set before running pipeline")
 
-        # self.data = self.preprocess_queue.run_process_queue(self.data)
-        if self.windowed:
-            self.convert_windows()
-        self.data = self.process_queue.run_process_queue(self.data)
+        input_signature = self._input_signature()
+        if not (incremental and self._state is not None and self._state["input"] == input_signature):
+            self.data = self.input.copy()
+            # self.data = self.preprocess_queue.run_process_queue(self.data)
+            if self.dtype is not None:
+                self.data = self.data.astype(self.dtype)
+            if self.windowed:
+                self.convert_windows()
+            self._state = {
+                "input": input_signature,
+                "input_names": self.data.get_channel_names(),
+                # the input buffers are kept alive so that their addresses in the signature are not reused
+                "sources": [arrays for _, _, arrays in self._input_arrays()],
+                "steps": {},
+            }
+        self._state["schedule"] = schedule
+        self._state["lazy"] = lazy
+        self._invalidate_steps()
+        if lazy:
+            return
+        self.compute(self.feature_list.get_input_names() if prune else None)
+
+    def compute(self, signals=None):
+        """Run the processes needed for the given signals that have not been run yet, e.g. in a lazy pipeline
+        (see run_pipeline)
+
+        Parameters
+        ----------
+        signals: list
+            Names of the required signals. If None, all remaining processes are run
+
+        Returns
+        -------
+        steps: list
+            Indices of the processes that were run
+        """
+        if self._state is None:
+            raise ValueError("run_pipeline must be called before compute")
+        signatures, outputs, _ = self._step_signatures()
+        if signals is None:
+            required = range(len(self.process_queue.process_list))
+        else:
+            required = self.process_queue.get_required_steps(signals, self._state["input_names"])
+        steps = [i for i in required if signatures[i] not in self._state["steps"]]
+        if steps:
+            self.data = self.process_queue.run_process_queue(self.data, schedule=self._state["schedule"], steps=steps)
+            for i in steps:
+                self._state["steps"][signatures[i]] = outputs[i]
+            # rerun processes append their outputs, the channels are kept in the order of a full run
+            order = self._state["input_names"] + [name for names in outputs for name in names]
+            channels = self.data.channels
+            self.data.channels = {
+                **{name: channels[name] for name in order if name in channels},
+                **{name: channel for name, channel in channels.items() if name not in order},
+            }
+        return steps
+
+    def _invalidate_steps(self):
+        # outputs of processes that were changed, or depend on changed processes, are removed from the data
+        signatures, _, _ = self._step_signatures()
+        stale = set(self._state["steps"]) - set(signatures)
+        for signature in stale:
+            for name in self._state["steps"].pop(signature):
+                if name in self.data.get_channel_names():
+                    self.data.remove_channel(name)
+
+    def _step_signatures(self):
+        # signature of each process, chained through the signatures of its input signals so that a change
+        # invalidates everything downstream
+        queue = self.process_queue
+        signals = {name: make_key("input", self._state["input"], name) for name in self._state["input_names"]}
+        signatures = []
+        outputs = []
+        for i in range(len(queue.process_list)):
+            signature = make_key(
+                "process",
+                queue.process_list[i],
+                queue.input_signals[i],
+                queue.output_signals[i],
+                queue.is_event[i],
+                queue.args[i],
+                queue.kwargs[i],
+                queue.dtype,
+                [signals.get(name) for name in queue._signal_names(queue.input_signals[i])],
+            )
+            names = []
+            for name in queue._signal_names(queue.output_signals[i]):
+                # Bio_Data.join renames outputs that already exist
+                if name in signals:
+                    name = name + "_1"
+                signals[name] = make_key(signature, name)
+                names.append(name)
+            signatures.append(signature)
+            outputs.append(names)
+        return signatures, outputs, signals
+
+    def _feature_signatures(self):
+        feature_list = self.feature_list
+        signals = self._step_signatures()[2] if self._state is not None else {}
+        signatures = []
+        for i in range(len(feature_list.extraction_list)):
+            names = feature_list.get_input_names(feature_list.input_signals[i])
+            signatures.append(
+                make_key(
+                    "feature",
+                    feature_list.extraction_list[i],
+                    feature_list.input_signals[i],
+                    feature_list.args[i],
+                    feature_list.kwargs[i],
+                    feature_list.prefix[i],
+                    feature_list.windowed,
+                    # signals that are not produced by the pipeline are identified by their content
+                    [signals[name] if name in signals else make_key(self.data[name]) for name in names],
+                )
+            )
+        return signatures
+
+    def _input_arrays(self):
+        for name, channel in self.input.channels.items():
+            arrays = [channel.indices, channel.offsets] if isinstance(channel, Event_Channel) else [channel.channel]
+            yield name, channel, arrays
+
+    def _input_signature(self):
+        # input channels are identified by their read-only buffers instead of their content
+        channels = []
+        for name, channel, arrays in self._input_arrays():
+            buffers = [(a.__array_interface__["data"][0], a.shape, a.strides, a.dtype.str) for a in arrays]
+            channels.append((name, type(channel).__name__, channel.sampling_rate, buffers))
+        return make_key(
+            "input", channels, self.windowed, self.window_size, self.step_size, self.window_view, self.dtype
+        )
+
+    def start_stream(self, sampling_rate: dict, latency_history=1000):
+        """Start streaming mode. Chunks are pushed with push() and windows are processed as soon as they are complete
+
+        Parameters
+        ----------
+        sampling_rate: dict
+            Sampling rate of each streamed channel, keyed by channel name
+        latency_history: int
+            Number of latest per-window latencies kept in stream_latency
+        """
+        if not self.windowed:
+            raise ValueError("Streaming requires a windowed pipeline")
+        if not isinstance(sampling_rate, dict) or len(sampling_rate) == 0:
+            raise ValueError("sampling_rate must be a dictionary of channel names and sampling rates")
+        self._stream = {}
+        for name, rate in sampling_rate.items():
+            self._stream[name] = Window_Buffer(int(self.window_size * rate), int(self.step_size * rate))
+        self._stream_rates = dict(sampling_rate)
+        self.stream_latency = deque(maxlen=latency_history)
+
+    def push(self, chunk: ArrayLike, channel_name: str):
+        """Push new samples of a channel in streaming mode
+
+        Parameters
+        ----------
+        chunk: ArrayLike
+            New samples of the channel
+        channel_name: str
+            Name of the channel
+
+        Returns
+        -------
+        features: generator
+            Feature rows (pd.DataFrame indexed by window number) of the windows completed so far.
+            Windows that are not consumed stay buffered until the generator of a later push is consumed
+        """
+        if getattr(self, "_stream", None) is None:
+            raise ValueError("start_stream must be called before pushing data")
+        if channel_name not in self._stream:
+            raise ValueError("Channel " + channel_name + " is not streamed")
+        self._stream[channel_name].append(chunk)
+        return self._stream_windows()
+
+    def stop_stream(self):
+        """Stop streaming mode and release the stream buffers"""
+        self._stream = None
+
+    def _stream_windows(self):
+        while self._stream is not None and all(b.ready() for b in self._stream.values()):
+            start = time.perf_counter()
+            window_index = next(iter(self._stream.values())).n_windows
+            data = Bio_Data()
+            for name, buffer in self._stream.items():
+                data.add_channel(buffer.pop_window(), channel_name=name, sampling_rate=self._stream_rates[name])
+            if self.dtype is not None:
+                data = data.astype(self.dtype)
+            data = self.process_queue.run_process_queue(data)
+            features = self._block_features(data, windowed=False)
+            features.index = [window_index]
+            self.stream_latency.append(time.perf_counter() - start)
+            yield features
+
+    def run_blocks(
+        self,
+        source,
+        output: str,
+        sampling_rate: dict = None,
+        block_windows: int = 1000,
+        executor="serial",
+        n_workers=None,
+        chunk_size=1,
+        schedule="sequential",
+    ) -> int:
+        """Run the processes and feature steps on a recording in blocks of windows, appending the features of
+        each block to a CSV file. Memory use depends on block_windows instead of the length of the recording.
+        The windows are the windows of segment_signal on the whole recording, whatever the block and chunk sizes
+
+        Parameters
+        ----------
+        source: Bio_Data, Channel or dict
+            Recording to process. A Bio_Data or Channel, e.g. backed by a file with Channel.from_file, is read one
+            block at a time. A dictionary maps channel names to iterables of 1-D sample chunks of any size
+        output: str
+            CSV file the features are written to. An existing file is overwritten. Feature columns that first
+            appear in a later block are added to the rows already written, as missing values
+        sampling_rate: dict
+            Sampling rate of each channel, keyed by channel name. Required if source is a dictionary
+        block_windows: int
+            Number of windows processed at once
+        executor: str
+            Backend used to run windows. Should be one of 'serial', 'thread' or 'process'
+        n_workers: int
+            Number of workers of the pool
+        chunk_size: int
+            Number of windows sent to a worker at once
+        schedule: str
+            'sequential' runs processes in insertion order, 'graph' runs independent processes concurrently
+
+        Returns
+        -------
+        n_windows: int
+            Number of windows processed
+        """
+        if not self.windowed:
+            raise ValueError("Block processing requires a windowed pipeline")
+        if not isinstance(block_windows, int) or block_windows <= 0:
+            raise ValueError("block_windows must be a positive integer")
+        chunks, sampling_rate = self._block_source(source, sampling_rate, block_windows)
+        self.process_queue.set_executor(executor, n_workers, chunk_size)
+        self.feature_list.set_executor(executor, n_workers, chunk_size)
+
+        buffers = {}
+        for name, rate in sampling_rate.items():
+            dtype = np.float64 if self.dtype is None else self.dtype
+            buffers[name] = Window_Buffer(int(self.window_size * rate), int(self.step_size * rate), dtype=dtype)
+        exhausted = set()
+        columns = []
+        n_windows = 0
+        # the file is truncated here and each block is appended, so that it can be rewritten between blocks
+        open(output, "w").close()
+        while True:
+            for name, buffer in buffers.items():
+                while name not in exhausted and not buffer.ready(block_windows):
+                    try:
+                        buffer.append(next(chunks[name]))
+                    except StopIteration:
+                        exhausted.add(name)
+            n_block = min(_complete_windows(buffer, block_windows) for buffer in buffers.values())
+            if n_block == 0:
+                break
+
+            block = Bio_Data()
+            for name, buffer in buffers.items():
+                samples = buffer.peek(buffer.window_samples + (n_block - 1) * buffer.step_samples)
+                samples.flags.writeable = False
+                block.add_channel(samples, channel_name=name, sampling_rate=sampling_rate[name])
+                buffer.advance(n_block)
+            features = self._run_block(block, n_block, schedule)
+            features.index = range(n_windows, n_windows + n_block)
+            new_columns = [c for c in features.columns if c not in columns]
+            if new_columns and n_windows > 0:
+                _add_csv_columns(output, new_columns)
+            columns += new_columns
+            # the columns of all blocks are kept in the order they first appear, so that the rows line up
+            with open(output, "a", newline="") as f:
+                features.reindex(columns=columns).to_csv(f, header=n_windows == 0)
+            n_windows += n_block
+            if n_block < block_windows:
+                break
+        return n_windows
+
+    def _block_source(self, source, sampling_rate, block_windows):
+        if isinstance(source, Channel):
+            data = Bio_Data()
+            data.add_channel(source)
+            source = data
+        if isinstance(source, Bio_Data):
+            chunks = {}
+            sampling_rate = {}
+            for name, channel in source.channels.items():
+                if not isinstance(channel, Channel) or channel.channel.ndim != 1:
+                    raise ValueError("Block processing requires unsegmented signal channels")
+                step = block_windows * int(self.step_size * channel.sampling_rate)
+                # slices of file-backed channels are only read when they are appended to the window buffers
+                chunks[name] = _channel_chunks(channel.channel, step)
+                sampling_rate[name] = channel.sampling_rate
+            return chunks, sampling_rate
+        if isinstance(source, dict):
+            if not isinstance(sampling_rate, dict) or set(sampling_rate) != set(source):
+                raise ValueError("sampling_rate must be a dictionary with the sampling rate of each channel")
+            return {name: iter(chunks) for name, chunks in source.items()}, dict(sampling_rate)
+        raise ValueError("source must be a Bio_Data, a Channel or a dictionary of chunk iterables")
+
+    def _run_block(self, block, n_windows, schedule):
+        if self.dtype is not None:
+            block = block.astype(self.dtype)
+        if n_windows > 1:
+            self._segment(block)
+        block = self.process_queue.run_process_queue(block, schedule=schedule)
+        # a single window is processed like a streamed window, as an unsegmented signal
+        return self._block_features(block, windowed=n_windows > 1)
+
+    def _block_features(self, data, windowed):
+        # blocks and streamed windows are run by a copy of the feature queue, so that the data and extracted
+        # features of the pipeline are kept for run_pipeline and extract_features
+        feature_list = self.feature_list.copy()
+        feature_list.windowed = windowed
+        return feature_list.run_feature_queue(data, reset=True)
 
     def get_features(self):
         return copy(self.features)
 
     def get_data(self):
-        return copy(self.data)
+        return self.data.copy()
 
     def get_input(self):
-        return copy(self.input)
+        return self.input.copy()
 
     def export_data(self, filename):
         self.data.export_data(filename)
@@ -129,9 +592,13 @@ class Bio_Pipeline:
 
     def clear_data(self):
         self.data = None
+        self._state = None
 
     def clear_features(self):
         self.features = None
+        # the features of the steps are dropped as well, so the next extraction runs all feature steps
+        self._feature_results = {}
+        self.feature_list.reset()
 
     def clear_input(self):
         self.input = None
@@ -143,3 +610,27 @@ class Bio_Pipeline:
         representation += "\tStep Size: " + str(self.step_size) + "\n"
 
         return representation
+
+
+def _channel_chunks(signal, chunk_samples):
+    for start in range(0, len(signal), chunk_samples):
+        yield signal[start : start + chunk_samples]
+
+
+def _add_csv_columns(filename, new_columns):
+    # adds empty columns to the header and the rows of a feature file written by run_blocks, one row at a time
+    temp = filename + ".tmp"
+    with open(filename, newline="") as source, open(temp, "w", newline="") as target:
+        reader = csv.reader(source)
+        writer = csv.writer(target, lineterminator=os.linesep)
+        writer.writerow(next(reader) + list(new_columns))
+        for row in reader:
+            writer.writerow(row + [""] * len(new_columns))
+    os.replace(temp, filename)
+
+
+def _complete_windows(buffer, max_windows):
+    # number of complete windows in a window buffer, at most max_windows
+    if buffer.available() < buffer.window_samples:
+        return 0
+    return min((buffer.available() - buffer.window_samples) // buffer.step_samples + 1, max_windows)
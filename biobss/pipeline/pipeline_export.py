@@ -1,28 +1,270 @@
 from __future__ import annotations
 
+import importlib
+import json
+import os
+from copy import copy
+
+import numpy as np
 import pandas as pd
+import yaml
+
+from .bio_process import Bio_Process
+from .feature_extraction import Feature
+from .pipeline import Bio_Pipeline
+
+"""export and import of pipeline definitions"""
 
-from .pipeline import Pipeline
+FORMAT_NAME = "biobss-pipeline"
+FORMAT_VERSION = 1
 
+DEFINITION_FORMATS = {".json": "json", ".yaml": "yaml", ".yml": "yaml"}
 
-def export_pipeline(pipeline: Pipeline, filename: str, include_data=False, include_features=False):
+
+def export_pipeline(pipeline: Bio_Pipeline, filename: str, include_data=False, include_features=False):
 
     """Export a pipeline to a file
 
     Parameters
     ----------
-    pipeline : Pipeline
+    pipeline : Bio_Pipeline
         The pipeline to export
     filename : str
-        The filename to export the pipeline to
+        The filename to export the pipeline to. Files with a .json, .yaml or .yml extension store the
+        versioned pipeline definition (see pipeline_to_dict). Other files store the pickled pipeline object
+    include_data : bool
+        If True, the input and processed data are pickled with the pipeline. Only supported for pickle files
+    include_features : bool
+        If True, the extracted features are pickled with the pipeline. Only supported for pickle files
+    """
+    definition_format = DEFINITION_FORMATS.get(os.path.splitext(filename)[1].lower())
+    if definition_format is None:
+        # the exported copy is cleared, so the pipeline keeps its data. The feature queue holds the extracted
+        # features and is copied as well
+        pipeline = copy(pipeline)
+        pipeline.feature_list = pipeline.feature_list.copy()
+        if not include_data:
+            pipeline.clear_input()
+            pipeline.clear_data()
+        if not include_features:
+            pipeline.clear_features()
+        pd.to_pickle(pipeline, filename)
+        return
+
+    if include_data or include_features:
+        raise ValueError("Data and features can only be exported to pickle files")
+    definition = pipeline_to_dict(pipeline)
+    with open(filename, "w") as f:
+        if definition_format == "json":
+            json.dump(definition, f, indent=2)
+        else:
+            yaml.safe_dump(definition, f, sort_keys=False)
+
+
+def import_pipeline(filename: str) -> Bio_Pipeline:
+
+    """Import a pipeline exported with export_pipeline
+
+    Parameters
+    ----------
+    filename : str
+        The file to import the pipeline from
+
+    Returns
+    -------
+    pipeline : Bio_Pipeline
+        The imported pipeline
     """
-    if not include_data:
-        pipeline.clear_input()
-        pipeline.clear_data()
-    if not include_features:
-        pipeline.clear_features()
+    definition_format = DEFINITION_FORMATS.get(os.path.splitext(filename)[1].lower())
+    if definition_format is None:
+        return pd.read_pickle(filename)
+
+    with open(filename, "r") as f:
+        if definition_format == "json":
+            definition = json.load(f)
+        else:
+            definition = yaml.safe_load(f)
+    return pipeline_from_dict(definition)
+
+
+def pipeline_to_dict(pipeline: Bio_Pipeline) -> dict:
+
+    """Convert a pipeline to a versioned definition of plain values.
+    Functions are stored by their dotted import path, so they must be defined at module level.
+
+    Parameters
+    ----------
+    pipeline : Bio_Pipeline
+        The pipeline to convert
+
+    Returns
+    -------
+    definition : dict
+        Definition that can be stored as JSON or YAML
+    """
+    process_queue = pipeline.process_queue
+    processes = []
+    for i, process in enumerate(process_queue.process_list):
+        processes.append(
+            {
+                "name": process.process_name,
+                "function": _function_path(process.process_method),
+                "batch": process.batch,
+                "writes_input": process.writes_input,
+                "args": _encode(process.args),
+                "kwargs": _encode(process.kwargs),
+                "input_signals": _encode(process_queue.input_signals[i]),
+                "output_signals": _encode(process_queue.output_signals[i]),
+                "is_event": process_queue.is_event[i],
+                "step_args": _encode(process_queue.args[i]),
+                "step_kwargs": _encode(process_queue.kwargs[i]),
+            }
+        )
+
+    feature_queue = pipeline.feature_list
+    features = []
+    for i, feature in enumerate(feature_queue.extraction_list):
+        features.append(
+            {
+                "name": feature.name,
+                "function": _function_path(feature.function),
+                "args": _encode(feature.args),
+                "kwargs": _encode(feature.kwargs),
+                "input_signals": _encode(feature_queue.input_signals[i]),
+                "prefix": feature_queue.prefix[i],
+                "step_args": _encode(feature_queue.args[i]),
+                "step_kwargs": _encode(feature_queue.kwargs[i]),
+            }
+        )
+
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "windowed": pipeline.windowed,
+        "window_size": _encode(pipeline.window_size) if pipeline.windowed else None,
+        "step_size": _encode(pipeline.step_size) if pipeline.windowed else None,
+        "window_view": pipeline.window_view,
+        "dtype": None if pipeline.dtype is None else pipeline.dtype.name,
+        "processes": processes,
+        "features": features,
+    }
+
+
+def pipeline_from_dict(definition: dict) -> Bio_Pipeline:
+
+    """Build a pipeline from a definition created by pipeline_to_dict
+
+    Parameters
+    ----------
+    definition : dict
+        Pipeline definition
+
+    Returns
+    -------
+    pipeline : Bio_Pipeline
+        Pipeline with the defined processes and feature steps, without data
+    """
+    if definition.get("format") != FORMAT_NAME:
+        raise ValueError("Definition is not a biobss pipeline definition")
+    version = definition.get("version")
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported pipeline definition version {version}, the latest is {FORMAT_VERSION}")
+
+    pipeline = Bio_Pipeline(
+        windowed_process=definition["windowed"],
+        window_size=definition.get("window_size"),
+        step_size=definition.get("step_size"),
+        window_view=definition.get("window_view", False),
+        dtype=definition.get("dtype"),
+    )
+    for step in definition.get("processes", []):
+        process = Bio_Process(
+            _resolve_function(step["function"]),
+            step["name"],
+            *_decode(step.get("args", [])),
+            batch=step.get("batch", False),
+            writes_input=step.get("writes_input", False),
+            **_decode(step.get("kwargs", {})),
+        )
+        pipeline.process_queue.add_process(
+            process,
+            _decode(step["input_signals"]),
+            _decode(step["output_signals"]),
+            step.get("is_event", False),
+            *_decode(step.get("step_args", [])),
+            **_decode(step.get("step_kwargs", {})),
+        )
+    for step in definition.get("features", []):
+        feature = Feature(
+            step["name"],
+            _resolve_function(step["function"]),
+            *_decode(step.get("args", [])),
+            **_decode(step.get("kwargs", {})),
+        )
+        pipeline.feature_list.add_feature(
+            feature,
+            _decode(step["input_signals"]),
+            step.get("prefix"),
+            *_decode(step.get("step_args", [])),
+            **_decode(step.get("step_kwargs", {})),
+        )
+    return pipeline
+
+
+def _function_path(function) -> str:
+    module = getattr(function, "__module__", None)
+    qualname = getattr(function, "__qualname__", None)
+    if module is None or qualname is None or "<" in qualname:
+        raise ValueError(f"{function!r} cannot be exported, functions must be defined at module level")
+    return module + "." + qualname
+
+
+def _resolve_function(path: str):
+    parts = path.split(".")
+    # the longest importable prefix is the module, the rest are attributes
+    for i in range(len(parts) - 1, 0, -1):
+        try:
+            obj = importlib.import_module(".".join(parts[:i]))
+        except ImportError:
+            continue
+        try:
+            for attribute in parts[i:]:
+                obj = getattr(obj, attribute)
+        except AttributeError:
+            break
+        return obj
+    raise ValueError(f"Function {path} could not be imported")
+
 
-    pd.to_pickle(pipeline, filename)
+def _encode(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif isinstance(value, list):
+        return [_encode(v) for v in value]
+    elif isinstance(value, tuple):
+        return {"__tuple__": [_encode(v) for v in value]}
+    elif isinstance(value, dict):
+        if not all(isinstance(k, str) for k in value):
+            raise ValueError("Only dictionaries with string keys can be exported")
+        return {k: _encode(v) for k, v in value.items()}
+    elif isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    elif callable(value):
+        return {"__function__": _function_path(value)}
+    raise ValueError(f"Parameter {value!r} of type {type(value).__name__} cannot be exported")
 
 
-##TODO add import pipeline function
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    elif isinstance(value, dict):
+        if "__ndarray__" in value:
+            return np.array(value["__ndarray__"], dtype=value["dtype"])
+        elif "__function__" in value:
+            return _resolve_function(value["__function__"])
+        elif "__tuple__" in value:
+            return tuple(_decode(v) for v in value["__tuple__"])
+        return {k: _decode(v) for k, v in value.items()}
+    return value
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .bio_channel import Channel
+from .bio_data import Bio_Data
+from .event_channel import Event_Channel
+
+"""content-addressed cache for the results of pipeline steps"""
+
+
+class Result_Cache:
+    """Two-tier (memory and disk) LRU cache for step results"""
+
+    def __init__(self, max_size: int = 256 * 2**20, cache_dir: str = None, max_disk_size: int = 2**30):
+        # Docstring
+        """Two-tier (memory and disk) LRU cache for step results
+        Parameters
+        ----------
+        max_size: int
+            Maximum size of the in-memory tier in bytes
+        cache_dir: str
+            Directory of the on-disk tier. If None, only the in-memory tier is used
+        max_disk_size: int
+            Maximum size of the on-disk tier in bytes
+
+        Attributes
+        -----------
+        hits: int
+            Number of lookups served from the cache (either tier)
+        disk_hits: int
+            Number of lookups served from the on-disk tier
+        misses: int
+            Number of lookups not found in the cache
+        """
+        #
+        if max_size < 0 or max_disk_size < 0:
+            raise ValueError("Cache sizes must be non-negative")
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (value, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock cannot be pickled, pickled caches keep the settings, counters and on-disk tier but not the memory tier
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_memory"] = OrderedDict()
+        state["_size"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        # Docstring
+        """Returns the cached value of key, or default if key is not cached
+        Parameters
+        ----------
+        key: str
+            Key generated by make_key
+        default: object
+            Value returned on a miss
+        """
+        #
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return _copy_value(self._memory[key][0])
+            value = self._read_disk(key)
+            if value is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.disk_hits += 1
+            self._store_memory(key, value)
+            return _copy_value(value)
+
+    def set(self, key: str, value):
+        # Docstring
+        """Stores value under key in both tiers
+        Parameters
+        ----------
+        key: str
+            Key generated by make_key
+        value: object
+            Picklable value to store
+        """
+        #
+        with self._lock:
+            self._store_memory(key, _copy_value(value))
+            self._write_disk(key, value)
+
+    def clear(self, disk: bool = True):
+        # Docstring
+        """Removes all entries and resets the counters
+        Parameters
+        ----------
+        disk: bool
+            If True, the on-disk tier is cleared as well
+        """
+        #
+        with self._lock:
+            self._memory.clear()
+            self._size = 0
+            self.hits = self.disk_hits = self.misses = 0
+            if disk and self.cache_dir is not None:
+                for path in self._disk_entries():
+                    os.remove(path)
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the size of the tiers"""
+        disk_size = sum(os.path.getsize(p) for p in self._disk_entries()) if self.cache_dir is not None else 0
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self._memory),
+            "size": self._size,
+            "disk_size": disk_size,
+        }
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def _store_memory(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_size:
+            return
+        if key in self._memory:
+            self._size -= self._memory.pop(key)[1]
+        self._memory[key] = (value, size)
+        self._size += size
+        while self._size > self.max_size:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._size -= evicted_size
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def _disk_entries(self):
+        return [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".pkl")]
+
+    def _read_disk(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+        os.utime(path)  # modification time is used as the LRU order of the disk tier
+        return value
+
+    def _write_disk(self, key, value):
+        if self.cache_dir is None:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_disk_size:
+            return
+        path = self._disk_path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        entries = sorted(self._disk_entries(), key=os.path.getmtime)
+        total = sum(os.path.getsize(p) for p in entries)
+        while total > self.max_disk_size and entries:
+            oldest = entries.pop(0)
+            total -= os.path.getsize(oldest)
+            os.remove(oldest)
+
+
+def make_key(*items) -> str:
+    """Generates a cache key from the content of the given items.
+    Arrays are hashed by dtype, shape and bytes, functions by their module and qualified name.
+
+    Returns
+    -------
+    key: str
+        Hex digest of the items
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    for item in items:
+        _update_hash(hasher, item)
+    return hasher.hexdigest()
+
+
+def _update_hash(hasher, item):
+    if isinstance(item, np.ndarray):
+        hasher.update(b"ndarray" + str(item.dtype).encode() + str(item.shape).encode())
+        if item.dtype == object:
+            for value in item.ravel():
+                _update_hash(hasher, value)
+        else:
+            hasher.update(np.ascontiguousarray(item).data)
+    elif isinstance(item, Channel):
+        hasher.update(type(item).__name__.encode())
+        _update_hash(hasher, item.channel)
+        _update_hash(hasher, item.sampling_rate)
+    elif isinstance(item, Event_Channel):
+        hasher.update(type(item).__name__.encode() + str(item._windowed).encode())
+        _update_hash(hasher, item.indices)
+        _update_hash(hasher, item.offsets)
+        _update_hash(hasher, item.sampling_rate)
+    elif isinstance(item, (list, tuple)):
+        hasher.update(type(item).__name__.encode() + str(len(item)).encode())
+        try:
+            # event lists are hashed as a single array when they are not ragged
+            values = np.asarray(item)
+        except ValueError:
+            values = None
+        if values is not None and values.dtype.kind in "biuf":
+            _update_hash(hasher, values)
+        else:
+            for value in item:
+                _update_hash(hasher, value)
+    elif isinstance(item, dict):
+        hasher.update(b"dict" + str(len(item)).encode())
+        for key in sorted(item.keys(), key=str):
+            _update_hash(hasher, key)
+            _update_hash(hasher, item[key])
+    elif isinstance(item, (set, frozenset)):
+        # the iteration order of sets of strings changes between processes
+        hasher.update(type(item).__name__.encode() + str(len(item)).encode())
+        for value in sorted(item, key=repr):
+            _update_hash(hasher, value)
+    elif isinstance(item, (pd.DataFrame, pd.Series)):
+        hasher.update(pd.util.hash_pandas_object(item).values.tobytes())
+    elif callable(item) and hasattr(item, "__qualname__"):
+        hasher.update(("callable" + str(getattr(item, "__module__", "")) + "." + item.__qualname__).encode())
+        code = getattr(item, "__code__", None)
+        if code is not None:
+            # the code object separates lambdas with the same name and invalidates entries of edited functions
+            _update_code_hash(hasher, code)
+            _update_hash(hasher, getattr(item, "__defaults__", None))
+            _update_hash(hasher, getattr(item, "__kwdefaults__", None))
+            for cell in getattr(item, "__closure__", None) or ():
+                _update_hash(hasher, cell.cell_contents)
+    elif hasattr(item, "__dict__") and not isinstance(item, type):
+        # process and feature objects are hashed by their attributes
+        hasher.update(type(item).__qualname__.encode())
+        _update_hash(hasher, vars(item))
+    else:
+        hasher.update((type(item).__name__ + repr(item)).encode())
+
+
+def _update_code_hash(hasher, code):
+    # nested code objects (comprehensions, lambdas) are hashed by content, their repr holds a memory address
+    hasher.update(code.co_code + repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code_hash(hasher, const)
+        else:
+            _update_hash(hasher, const)
+
+
+def _nbytes(value):
+    if isinstance(value, Bio_Data):
+        return sum(_nbytes(ch) for ch in value.channels.values())
+    elif isinstance(value, Channel):
+        return value.channel.nbytes
+    elif isinstance(value, Event_Channel):
+        return value.nbytes
+    elif isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    elif isinstance(value, np.ndarray):
+        return value.nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _copy_value(value):
+    # channel buffers are read-only and shared, data frames are copied since queues rename their columns
+    if isinstance(value, (Bio_Data, pd.DataFrame)):
+        return value.copy()
+    return value
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .bio_data import Bio_Data
+from .event_channel import Event_Channel
+
+"""per-step profiler of the process and feature queues"""
+
+REPORT_COLUMNS = [
+    "queue",
+    "index",
+    "step",
+    "windows",
+    "wall_time",
+    "cpu_time",
+    "peak_memory",
+    "output_bytes",
+]
+
+
+class Step_Profiler:
+    """Records the cost of every step run by a Process_List or Feature_Queue"""
+
+    def __init__(self, trace_memory: bool = True):
+        # Docstring
+        """Records the cost of every step run by a Process_List or Feature_Queue
+        Parameters
+        ----------
+        trace_memory: bool
+            If True, the peak memory allocated by each step is measured with tracemalloc. Tracing slows
+            down allocation-heavy steps, so wall and CPU times are lower with trace_memory=False
+
+        Notes
+        -----
+        CPU time is the CPU time of the current process, so the work of 'process' executor workers is not
+        included. Steps run concurrently by the 'graph' schedule share the CPU time and peak memory counters.
+        """
+        #
+        self.trace_memory = trace_memory
+        self.records = []
+        self._lock = threading.Lock()
+        self._tracing = 0  # number of steps being measured while this profiler started tracemalloc
+        self._started_tracing = False
+
+    def __getstate__(self):
+        # the lock cannot be pickled, pickled profilers keep their records but no running measurement
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_tracing"] = 0
+        state["_started_tracing"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def call(self, queue: str, index: int, step: str, function, *args, **kwargs):
+        # Docstring
+        """Runs function(*args, **kwargs) and records its cost as the given step
+        Parameters
+        ----------
+        queue: str
+            Queue of the step, 'process' or 'feature'
+        index: int
+            Index of the step in its queue
+        step: str
+            Name of the step
+        function: callable
+            Function running the step. Should return a Bio_Data or a pd.DataFrame
+
+        Returns
+        -------
+        output: object
+            Output of function
+        """
+        #
+        if self.trace_memory:
+            self._start_tracing()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            output = function(*args, **kwargs)
+        finally:
+            wall_time = time.perf_counter() - start_wall
+            cpu_time = time.process_time() - start_cpu
+            if self.trace_memory:
+                peak_memory = max(tracemalloc.get_traced_memory()[1] - start_memory, 0)
+                self._stop_tracing()
+            else:
+                peak_memory = np.nan
+        windows, output_bytes = _describe_output(output)
+        with self._lock:
+            self.records.append(
+                {
+                    "queue": queue,
+                    "index": index,
+                    "step": step,
+                    "windows": windows,
+                    "wall_time": wall_time,
+                    "cpu_time": cpu_time,
+                    "peak_memory": peak_memory,
+                    "output_bytes": output_bytes,
+                }
+            )
+        return output
+
+    def report(self) -> pd.DataFrame:
+        """Returns one row for each measured step, in the order the steps finished"""
+        return pd.DataFrame(self.records, columns=REPORT_COLUMNS)
+
+    def to_json(self, filename: str = None) -> str:
+        # Docstring
+        """Returns the report as a JSON string
+        Parameters
+        ----------
+        filename: str
+            If given, the report is also written to this file
+        """
+        #
+        report = self.report()
+        report["peak_memory"] = report["peak_memory"].astype(object).where(report["peak_memory"].notna(), None)
+        text = json.dumps(report.to_dict(orient="records"), indent=2)
+        if filename is not None:
+            with open(filename, "w") as f:
+                f.write(text)
+        return text
+
+    def summary(self) -> str:
+        """Returns a table of the steps sorted by wall time, with their share of the total wall time"""
+        report = self.report()
+        if len(report) == 0:
+            return "No steps profiled"
+        report = (
+            report.groupby(["queue", "index", "step"], sort=False)
+            .agg(
+                runs=("wall_time", "size"),
+                windows=("windows", "sum"),
+                wall_time=("wall_time", "sum"),
+                cpu_time=("cpu_time", "sum"),
+                peak_memory=("peak_memory", "max"),
+                output_bytes=("output_bytes", "sum"),
+            )
+            .reset_index()
+            .sort_values("wall_time", ascending=False)
+        )
+        total = report["wall_time"].sum()
+        report["share"] = report["wall_time"] / total if total > 0 else 0.0
+        report["ms_per_window"] = 1000 * report["wall_time"] / report["windows"].clip(lower=1)
+        formatters = {
+            "wall_time": "{:.4f} s".format,
+            "cpu_time": "{:.4f} s".format,
+            "share": "{:.1%}".format,
+            "ms_per_window": "{:.3f}".format,
+            "peak_memory": lambda v: "-" if pd.isna(v) else _format_bytes(v),
+            "output_bytes": _format_bytes,
+        }
+        table = report.to_string(index=False, formatters=formatters)
+        return table + f"\nTotal wall time: {total:.4f} s"
+
+    def clear(self):
+        """Removes all records"""
+        with self._lock:
+            self.records = []
+
+    def _start_tracing(self):
+        with self._lock:
+            if self._tracing == 0:
+                self._started_tracing = not tracemalloc.is_tracing()
+                if self._started_tracing:
+                    tracemalloc.start()
+            self._tracing += 1
+
+    def _stop_tracing(self):
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+
+def _describe_output(output):
+    # number of windows and size of the output of a step
+    if isinstance(output, Bio_Data):
+        windows = max((ch.n_windows for ch in output.channels.values()), default=0)
+        output_bytes = sum(_channel_bytes(ch) for ch in output.channels.values())
+        return int(windows), int(output_bytes)
+    elif isinstance(output, pd.DataFrame):
+        return len(output), int(output.memory_usage(deep=True).sum())
+    return 0, 0
+
+
+def _channel_bytes(channel):
+    if isinstance(channel, Event_Channel):
+        return channel.nbytes
+    return channel.channel.nbytes
+
+
+def _format_bytes(n_bytes):
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(n_bytes) < 1024:
+            return f"{n_bytes:.0f} {unit}" if unit == "B" else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GiB"
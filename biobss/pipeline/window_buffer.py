@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+"""sample buffer that cuts a stream into windows aligned with segment_signal"""
+
+
+class Window_Buffer:
+    """Buffer of incoming samples of a single channel"""
+
+    def __init__(self, window_samples: int, step_samples: int, dtype=np.float64):
+        # Docstring
+        """Buffer of incoming samples of a single channel. Window k starts at sample k * step_samples of the stream,
+        as in segment_signal.
+        Parameters
+        ----------
+        window_samples: int
+            Number of samples in a window
+        step_samples: int
+            Number of samples between the starts of consecutive windows
+        dtype: np.dtype
+            Data type of the buffer
+
+        Attributes
+        -----------
+        n_windows: int
+            Number of windows popped so far
+        """
+        #
+        if window_samples <= 0 or step_samples <= 0:
+            raise ValueError("window_samples and step_samples must be positive")
+        self.window_samples = window_samples
+        self.step_samples = step_samples
+        self.n_windows = 0
+        self._buffer = np.empty(2 * window_samples, dtype=dtype)
+        self._start = 0
+        self._end = 0
+        self._skip = 0  # samples to drop before the next window when step_samples > window_samples
+
+    def append(self, chunk: ArrayLike):
+        # Docstring
+        """Append samples to the buffer
+        Parameters
+        ----------
+        chunk: ArrayLike
+            1-D array of new samples
+        """
+        #
+        chunk = np.asarray(chunk).ravel()
+        if self._skip > 0:
+            dropped = min(self._skip, len(chunk))
+            chunk = chunk[dropped:]
+            self._skip -= dropped
+        if self._end + len(chunk) > len(self._buffer):
+            # move the pending samples to the front, growing only if they do not fit
+            pending = self._buffer[self._start : self._end]
+            capacity = max(len(self._buffer), 2 * (len(pending) + len(chunk)))
+            if capacity > len(self._buffer):
+                self._buffer = np.empty(capacity, dtype=self._buffer.dtype)
+            self._buffer[: len(pending)] = pending
+            self._start, self._end = 0, len(pending)
+        self._buffer[self._end : self._end + len(chunk)] = chunk
+        self._end += len(chunk)
+
+    def ready(self, n_windows: int = 1) -> bool:
+        """Returns True if the next n_windows windows are complete"""
+        return self.available() >= self.window_samples + (n_windows - 1) * self.step_samples
+
+    def available(self) -> int:
+        """Returns the number of buffered samples"""
+        return self._end - self._start
+
+    def peek(self, n_samples: int) -> np.ndarray:
+        """Returns a copy of the first n_samples buffered samples without removing them"""
+        return self._buffer[self._start : self._start + n_samples].copy()
+
+    def advance(self, n_windows: int = 1):
+        # Docstring
+        """Drop the samples that are not needed after n_windows windows
+        Parameters
+        ----------
+        n_windows: int
+            Number of windows to advance
+        """
+        #
+        n_samples = n_windows * self.step_samples
+        dropped = min(n_samples, self.available())
+        self._start += dropped
+        self._skip += n_samples - dropped
+        self.n_windows += n_windows
+
+    def pop_window(self) -> np.ndarray:
+        # Docstring
+        """Return the next window and advance the buffer by one step
+        Returns
+        -------
+        window: np.ndarray
+            Read-only copy of the samples of the next window
+        """
+        #
+        if not self.ready():
+            raise ValueError("Not enough samples for a window")
+        window = self.peek(self.window_samples)
+        window.flags.writeable = False
+        self.advance()
+        return window
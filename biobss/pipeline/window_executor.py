@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+"""executors for running a function over signal windows"""
+
+EXECUTORS = ["serial", "thread", "process"]
+
+
+def check_executor(executor: str, n_workers: int = None, chunk_size: int = 1):
+    """Check the executor parameters
+
+    Parameters
+    ----------
+    executor: str
+        Execution backend. Should be one of 'serial', 'thread' or 'process'
+    n_workers: int
+        Number of workers of the pool. If None, the default of concurrent.futures is used
+    chunk_size: int
+        Number of windows sent to a worker at once. Only used by the 'process' executor
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {EXECUTORS}")
+    if n_workers is not None and (not isinstance(n_workers, int) or n_workers <= 0):
+        raise ValueError("n_workers must be a positive integer or None")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer")
+
+
+def run_windows(function, tasks: list, executor: str = "serial", n_workers: int = None, chunk_size: int = 1) -> list:
+    """Run a function for each window and return the results in window order
+
+    Parameters
+    ----------
+    function: callable
+        Function to run. Must be picklable if executor is 'process'
+    tasks: list
+        List of (args, kwargs) tuples, one for each window
+    executor: str
+        Execution backend. Should be one of 'serial', 'thread' or 'process'
+    n_workers: int
+        Number of workers of the pool
+    chunk_size: int
+        Number of windows sent to a worker at once
+
+    Returns
+    -------
+    results: list
+        Results of the function, in the same order as tasks
+    """
+    check_executor(executor, n_workers, chunk_size)
+    if executor == "serial" or len(tasks) < 2:
+        return [function(*args, **kwargs) for args, kwargs in tasks]
+    if executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=n_workers)
+    else:
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+    with pool:
+        # Executor.map yields results in submission order regardless of completion order
+        results = list(pool.map(_call, repeat(function), tasks, chunksize=chunk_size))
+    return results
+
+
+def _call(function, task):
+    args, kwargs = task
+    return function(*args, **kwargs)
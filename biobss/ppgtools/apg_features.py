@@ -1,7 +1,7 @@
 import numpy as np
 from numpy.typing import ArrayLike
 
-from biobss.ppgtools.ppg_peaks import correct_missing_duplicate_peaks
+from biobss.ppgtools.ppg_peaks import corrected_peaks, ppg_derivatives, ppg_waves
 
 # Time domain features
 FEATURES_APG = {
@@ -39,7 +39,13 @@ FEATURES_APG = {
 
 
 def get_apg_features(
-    apg_sig: ArrayLike, locs_O: ArrayLike, fiducials: dict, sampling_rate: float, prefix: str = "apg"
+    apg_sig: ArrayLike,
+    locs_O: ArrayLike,
+    fiducials: dict,
+    sampling_rate: float,
+    prefix: str = "apg",
+    context=None,
+    ppg_sig: ArrayLike = None,
 ) -> dict:
     """Calculates APG features.
 
@@ -63,14 +69,17 @@ def get_apg_features(
         a_be_a: Mean ratio of a_b - a_e to a wave amplitude
 
     Args:
-        apg_sig (ArrayLike): APG signal.
+        apg_sig (ArrayLike): APG signal. If None, it is calculated from ppg_sig.
         locs_O (ArrayLike): PPG signal onset locations.
-        fiducials (dict): APG fiducials.
+        fiducials (dict): APG fiducials. If None, they are detected from ppg_sig.
         sampling_rate (float): Sampling rate of the APG signal (Hz).
         prefix (str, optional): Prefix for the features. Defaults to 'apg'.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
+        ppg_sig (ArrayLike, optional): PPG signal, required if apg_sig or fiducials is None. Defaults to None.
 
     Raises:
         ValueError: If sampling rate is not greater than 0.
+        ValueError: If apg_sig or fiducials is None and ppg_sig is not provided.
 
     Returns:
         dict: APG features
@@ -79,6 +88,15 @@ def get_apg_features(
     if sampling_rate <= 0:
         raise ValueError("Sampling rate must be greater than 0.")
 
+    if apg_sig is None or fiducials is None:
+        if ppg_sig is None:
+            raise ValueError("PPG signal must be provided to calculate the APG signal or fiducials.")
+        # the derivatives and fiducials of the PPG window are shared with the other feature steps through context
+        if apg_sig is None:
+            apg_sig = ppg_derivatives(ppg_sig, sampling_rate, context=context)[1]
+        if fiducials is None:
+            fiducials = ppg_waves(ppg_sig, locs_O, sampling_rate, context=context)
+
     feature_list = FEATURES_APG.copy()
 
     fiducial_names = ["a_waves", "b_waves", "c_waves", "d_waves", "e_waves"]
@@ -94,19 +112,19 @@ def get_apg_features(
         a_features = ["a_a", "t_a", "a_b_a", "a_c_a", "a_d_a", "a_e_a", "a_cdb_a", "a_bcde_a", "a_bcd_a", "a_be_a"]
         [feature_list.pop(key, None) for key in a_features]
     else:
-        locs_a, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_a, peaks=apg_sig[locs_a])
+        locs_a = corrected_peaks(locs_O, locs_a, apg_sig)
 
     if len(locs_b) == 0:
         b_features = ["a_b", "t_b", "a_b_a", "a_cdb_a", "a_bcde_a", "a_bcd_a", "a_be_a"]
         [feature_list.pop(key, None) for key in b_features]
     else:
-        locs_b, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_b, peaks=apg_sig[locs_b])
+        locs_b = corrected_peaks(locs_O, locs_b, apg_sig)
 
     if len(locs_c) == 0:
         c_features = ["a_c", "t_c", "a_c_a", "a_cdb_a", "a_bcde_a", "a_bcd_a"]
         [feature_list.pop(key, None) for key in c_features]
     else:
-        locs_c, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_c, peaks=apg_sig[locs_c])
+        locs_c = corrected_peaks(locs_O, locs_c, apg_sig)
 
     if len(locs_d) == 0:
         d_features = [
@@ -119,13 +137,13 @@ def get_apg_features(
         ]
         [feature_list.pop(key, None) for key in d_features]
     else:
-        locs_d, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_d, peaks=apg_sig[locs_d])
+        locs_d = corrected_peaks(locs_O, locs_d, apg_sig)
 
     if len(locs_e) == 0:
         e_features = ["a_e", "t_e", "a_e_a", "a_bcde_a", "a_be_a"]
         [feature_list.pop(key, None) for key in e_features]
     else:
-        locs_e, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_e, peaks=apg_sig[locs_e])
+        locs_e = corrected_peaks(locs_O, locs_e, apg_sig)
 
     features = {}
     for key, func in feature_list.items():
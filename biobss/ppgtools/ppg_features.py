@@ -3,6 +3,7 @@ from typing import Callable
 from numpy.typing import ArrayLike
 
 from biobss.ppgtools.ppg_freqdomain import *
+from biobss.ppgtools.ppg_peaks import ppg_waves
 from biobss.ppgtools.ppg_statistical import *
 from biobss.ppgtools.ppg_timedomain import *
 
@@ -26,6 +27,8 @@ def get_ppg_features(
     input_types: list = ["cycle", "segment"],
     feature_domain: dict = {"cycle": ["Time", "Stat"], "segment": ["Stat", "Freq", "Time"]},
     prefix: str = "ppg",
+    detect_fiducials: bool = False,
+    context=None,
     **kwargs
 ) -> dict:
     """Calculates PPG features.
@@ -37,6 +40,8 @@ def get_ppg_features(
         input_types (list, optional): Input types. It can be a list of 'cycle' and 'segment'. Defaults to ['cycle', 'segment'].
         feature_domain (_type_, optional): Domain to calculate features. It should be provided for each input type seperately. Defaults to {'cycle':['Time','Stat'], 'segment':['Stat','Freq','Time']}.
         prefix (str, optional): Prefix for the features. Defaults to 'ppg'.
+        detect_fiducials (bool, optional): If True and fiducials is None, detects the fiducials for the cycle-based features. Defaults to False.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
 
     Raises:
         ValueError: If sampling rate is not greater than 0.
@@ -64,6 +69,8 @@ def get_ppg_features(
                 troughs_locs=kwargs["troughs_locs"],
                 feature_types=feature_domain["cycle"],
                 prefix=prefix,
+                detect_fiducials=detect_fiducials,
+                context=context,
             )
             features.update(features_cycle)
         else:
@@ -88,6 +95,8 @@ def from_cycles(
     fiducials: dict = None,
     feature_types: ArrayLike = ["Time", "Stat"],
     prefix: str = "ppg",
+    detect_fiducials: bool = False,
+    context=None,
 ) -> dict:
     """Calculates cycle-based PPG features.
 
@@ -99,6 +108,8 @@ def from_cycles(
         fiducials (dict, optional): PPG fiducials. Defaults to None.
         feature_types (ArrayLike, optional): Types of features to be calculated. Defaults to ['Time','Stat'].
         prefix (str, optional): Prefix for signal type. Defaults to 'signal'.
+        detect_fiducials (bool, optional): If True and fiducials is None, detects the fiducials with ppg_waves. Defaults to False.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
 
     Raises:
         ValueError: If elements of feature_types are not 'Time' or 'Stat'.
@@ -112,6 +123,10 @@ def from_cycles(
     if len(peaks_locs) != len(troughs_locs) - 1:
         raise ValueError("Lengths of peak and trough arrays do not match!")
 
+    if fiducials is None and detect_fiducials:
+        # the fiducials of the window are shared with the VPG and APG feature steps through context
+        fiducials = ppg_waves(sig, troughs_locs, sampling_rate, context=context)
+
     feature_types = [x.capitalize() for x in feature_types]
 
     valid_types = ["Time", "Stat"]
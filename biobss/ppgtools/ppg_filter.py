@@ -3,12 +3,15 @@ import warnings
 from numpy.typing import ArrayLike
 from scipy import signal
 
+from biobss.common.signal_dtype import as_float_dtype
+from biobss.common.signal_filter_design import butter_sos, register_filter_designs
+
 
 def filter_ppg(sig: ArrayLike, sampling_rate: float, method: str = "bandpass") -> ArrayLike:
     """Filters PPG signal using predefined filters.
 
     Args:
-        sig (ArrayLike): PPG signal to be filtered.
+        sig (ArrayLike): PPG signal to be filtered, or 2-D array of PPG signals (e.g. windows or channels) filtered along the last axis.
         sampling_rate (float): Sampling rate of the PPG signal.
         method (str, optional): Filtering method. Defaults to 'bandpass'.
 
@@ -31,20 +34,40 @@ def filter_ppg(sig: ArrayLike, sampling_rate: float, method: str = "bandpass") -
     else:
         raise ValueError(f"Undefined method: {method}.")
 
-    return filtered_sig
+    return as_float_dtype(filtered_sig, sig)
 
 
 def _filter_ppg_bandpass(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
 
     N = 2
-    btype = "bandpass"
-    W1 = 0.5 / (sampling_rate / 2)
-    W2 = 5 / (sampling_rate / 2)
     warnings.warn(
         f"Default parameters will be used for filtering. {N}th order bandpass filter with f1=0.5 Hz and f2=5 Hz."
     )
 
-    sos = signal.butter(N, [W1, W2], btype, output="sos")
-    filtered_sig = signal.sosfiltfilt(sos, sig)
+    sos = _ppg_bandpass_sos(sampling_rate)
+    filtered_sig = signal.sosfiltfilt(sos, sig, axis=-1)
 
     return filtered_sig
+
+
+def _ppg_bandpass_sos(sampling_rate: float):
+    """Returns the second-order sections of the predefined PPG bandpass filter."""
+
+    return butter_sos(2, [0.5, 5], "bandpass", sampling_rate)
+
+
+def _filter_ppg_designs(sampling_rate: float, method: str = "bandpass"):
+    """Designs the filters used by filter_ppg."""
+
+    if sampling_rate <= 0:
+        raise ValueError("Sampling rate must be greater than 0.")
+
+    method = method.lower()
+
+    if method == "bandpass":
+        _ppg_bandpass_sos(sampling_rate)
+    else:
+        raise ValueError(f"Undefined method: {method}.")
+
+
+register_filter_designs(filter_ppg, _filter_ppg_designs)
@@ -116,6 +116,7 @@ def ppg_waves(
     th_w: float = 0.5,
     th_y: float = 0.45,
     th_a: float = 0.45,
+    context=None,
 ) -> dict:
     """Detects fiducials of PPG, VPG and APG signals.
 
@@ -126,12 +127,34 @@ def ppg_waves(
         th_w (float, optional): Threshold to detect w waves. Defaults to 0.5.
         th_y (float, optional): Threshold to detect y waves. Defaults to 0.45.
         th_a (float, optional): Threshold to detect a waves. Defaults to 0.45.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
 
     Returns:
         dict: Dictionary of fiducial locations.
     """
-    vpg_sig = np.gradient(sig) / (1 / sampling_rate)
-    apg_sig = np.gradient(vpg_sig) / (1 / sampling_rate)
+    if context is not None:
+        fiducials = context.get_or_compute(
+            "fiducials",
+            (sig, locs_onsets, sampling_rate, th_w, th_y, th_a),
+            lambda: _ppg_waves(sig, locs_onsets, sampling_rate, th_w, th_y, th_a, context),
+        )
+        return dict(fiducials)
+
+    return _ppg_waves(sig, locs_onsets, sampling_rate, th_w, th_y, th_a)
+
+
+def _ppg_waves(
+    sig: ArrayLike,
+    locs_onsets: ArrayLike,
+    sampling_rate: float,
+    th_w: float = 0.5,
+    th_y: float = 0.45,
+    th_a: float = 0.45,
+    context=None,
+) -> dict:
+    """Detects fiducials of PPG, VPG and APG signals, with the derivatives shared through context."""
+
+    vpg_sig, apg_sig = ppg_derivatives(sig, sampling_rate, context=context)
 
     fiducials = {}
 
@@ -156,6 +179,34 @@ def ppg_waves(
     return fiducials
 
 
+def ppg_derivatives(sig: ArrayLike, sampling_rate: float, context=None) -> tuple:
+    """Calculates the first (VPG) and second (APG) derivatives of a PPG signal.
+
+    Args:
+        sig (ArrayLike): PPG signal.
+        sampling_rate (float): Sampling rate of the PPG signal (Hz).
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
+
+    Returns:
+        tuple: VPG and APG signals.
+    """
+    if context is not None:
+        vpg_sig = context.get_or_compute("vpg", (sig, sampling_rate), lambda: _derivative(sig, sampling_rate))
+        apg_sig = context.get_or_compute("apg", (vpg_sig, sampling_rate), lambda: _derivative(vpg_sig, sampling_rate))
+        return vpg_sig, apg_sig
+
+    vpg_sig = _derivative(sig, sampling_rate)
+    apg_sig = _derivative(vpg_sig, sampling_rate)
+
+    return vpg_sig, apg_sig
+
+
+def _derivative(sig: ArrayLike, sampling_rate: float) -> ArrayLike:
+    """Calculates the derivative of a signal."""
+
+    return np.gradient(sig) / (1 / sampling_rate)
+
+
 def vpg_delineate(vpg_sig: ArrayLike, sampling_rate: float, th_w: float = 0.5, th_y: float = 0.45) -> dict:
     """Detects fiducials of VPG signal.
 
@@ -642,6 +693,23 @@ def correct_missing_duplicate_peaks(locs_valleys: ArrayLike, locs_peaks: ArrayLi
     return np.array(loc_), amp_
 
 
+def corrected_peaks(locs_valleys: ArrayLike, locs_peaks: ArrayLike, sig: ArrayLike) -> ArrayLike:
+    """Returns the peak locations corrected by correct_missing_duplicate_peaks.
+
+    Args:
+        locs_valleys (ArrayLike): Array of valley locations.
+        locs_peaks (ArrayLike): Array of peak locations.
+        sig (ArrayLike): Signal the peaks are located on.
+
+    Returns:
+        ArrayLike: Corrected peak locations.
+    """
+
+    locs, _ = correct_missing_duplicate_peaks(locs_valleys=locs_valleys, locs_peaks=locs_peaks, peaks=sig[locs_peaks])
+
+    return locs
+
+
 def _generate_search_indices(w_len: int, sig_len: int) -> ArrayLike:
     """Generates search indices for fiducial search."""
     ind = []
@@ -179,9 +179,9 @@ def ppg_time_features(
                 locs_D = fiducials["D_waves"]
                 locs_N = fiducials["N_waves"]
 
-                locs_S, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_S, peaks=sig[locs_S])
-                locs_D, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_D, peaks=sig[locs_D])
-                locs_N, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_N, peaks=sig[locs_N])
+                locs_S = corrected_peaks(locs_O, locs_S, sig)
+                locs_D = corrected_peaks(locs_O, locs_D, sig)
+                locs_N = corrected_peaks(locs_O, locs_N, sig)
 
             else:
                 locs_O = kwargs["troughs_locs"]
@@ -189,7 +189,7 @@ def ppg_time_features(
                 locs_D = np.array([])
                 locs_N = np.array([])
 
-                locs_S, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_S, peaks=sig[locs_S])
+                locs_S = corrected_peaks(locs_O, locs_S, sig)
 
             if len(locs_O) == 0:
                 raise ValueError("PPG onset locations must be provided to calculate cycle-based features.")
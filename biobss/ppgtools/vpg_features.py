@@ -1,7 +1,7 @@
 import numpy as np
 from numpy.typing import ArrayLike
 
-from biobss.ppgtools.ppg_peaks import correct_missing_duplicate_peaks
+from biobss.ppgtools.ppg_peaks import corrected_peaks, ppg_derivatives, ppg_waves
 
 # Time domain features
 FEATURES_VPG = {
@@ -16,7 +16,13 @@ FEATURES_VPG = {
 
 
 def get_vpg_features(
-    vpg_sig: ArrayLike, locs_O: ArrayLike, fiducials: dict, sampling_rate: float, prefix: str = "vpg"
+    vpg_sig: ArrayLike,
+    locs_O: ArrayLike,
+    fiducials: dict,
+    sampling_rate: float,
+    prefix: str = "vpg",
+    context=None,
+    ppg_sig: ArrayLike = None,
 ) -> dict:
     """Calculates VPG features.
 
@@ -29,14 +35,17 @@ def get_vpg_features(
         a_y_w: Mean ratio of y wave amplitudes to w wave amplitudes
 
     Args:
-        vpg_sig (ArrayLike): VPG signal.
+        vpg_sig (ArrayLike): VPG signal. If None, it is calculated from ppg_sig.
         locs_O (ArrayLike): PPG signal onset locations.
-        fiducials (dict): VPG fiducials.
+        fiducials (dict): VPG fiducials. If None, they are detected from ppg_sig.
         sampling_rate (float): Sampling rate of the VPG signal (Hz).
         prefix (str, optional): Prefix for the features. Defaults to 'vpg'.
+        context (Feature_Context, optional): Intermediate results of the current window. Defaults to None.
+        ppg_sig (ArrayLike, optional): PPG signal, required if vpg_sig or fiducials is None. Defaults to None.
 
     Raises:
         ValueError: If sampling rate is not greater than 0.
+        ValueError: If vpg_sig or fiducials is None and ppg_sig is not provided.
 
     Returns:
         dict: VPG features
@@ -45,6 +54,15 @@ def get_vpg_features(
     if sampling_rate <= 0:
         raise ValueError("Sampling rate must be greater than 0.")
 
+    if vpg_sig is None or fiducials is None:
+        if ppg_sig is None:
+            raise ValueError("PPG signal must be provided to calculate the VPG signal or fiducials.")
+        # the derivatives and fiducials of the PPG window are shared with the other feature steps through context
+        if vpg_sig is None:
+            vpg_sig = ppg_derivatives(ppg_sig, sampling_rate, context=context)[0]
+        if fiducials is None:
+            fiducials = ppg_waves(ppg_sig, locs_O, sampling_rate, context=context)
+
     feature_list = FEATURES_VPG.copy()
 
     fiducial_names = ["w_waves", "y_waves", "z_waves"]
@@ -58,19 +76,19 @@ def get_vpg_features(
         w_features = ["a_w", "t_w", "a_y_w"]
         [feature_list.pop(key, None) for key in w_features]
     else:
-        locs_w, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_w, peaks=vpg_sig[locs_w])
+        locs_w = corrected_peaks(locs_O, locs_w, vpg_sig)
 
     if len(locs_y) == 0:
         y_features = ["a_y", "t_y", "a_y_w"]
         [feature_list.pop(key, None) for key in y_features]
     else:
-        locs_y, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_y, peaks=vpg_sig[locs_y])
+        locs_y = corrected_peaks(locs_O, locs_y, vpg_sig)
 
     if len(locs_z) == 0:
         z_features = ["a_z", "t_z"]
         [feature_list.pop(key, None) for key in z_features]
     else:
-        locs_z, _ = correct_missing_duplicate_peaks(locs_valleys=locs_O, locs_peaks=locs_z, peaks=vpg_sig[locs_z])
+        locs_z = corrected_peaks(locs_O, locs_z, vpg_sig)
 
     features = {}
     for key, func in feature_list.items():
@@ -63,6 +63,62 @@ def peak_detection(sig: ArrayLike, sampling_rate: float, method: str = "peakdet"
     return info
 
 
+class OnlinePeakDetector:
+    """Peak and trough detection with the peakdet method on a signal received chunk by chunk, e.g. from a device.
+
+    The state of peakdet is carried between chunks, so the peaks and troughs found in chunks of any size are the ones
+    that peak_detection finds on the whole signal, without missing or duplicated peaks at the chunk boundaries. A peak
+    is confirmed, and returned, once the signal has fallen by delta after it, which may be in a later chunk.
+    """
+
+    def __init__(self, delta: float):
+        """Creates a peak detector for a new signal.
+
+        Args:
+            delta (float): Required parameter of the peakdet method. See https://gist.github.com/endolith/250860.
+
+        Raises:
+            ValueError: If delta is not a positive scalar.
+        """
+
+        if not np.isscalar(delta) or delta <= 0:
+            raise ValueError("Delta must be a positive scalar.")
+
+        self.delta = delta
+        self.reset()
+
+    def update(self, chunk: ArrayLike) -> dict:
+        """Detects the peaks and troughs confirmed by the next chunk of the signal.
+
+        Args:
+            chunk (ArrayLike): Next samples of the signal.
+
+        Raises:
+            ValueError: If chunk is not one-dimensional.
+
+        Returns:
+            dict: Dictionary of the locations of the confirmed peaks and troughs, as sample indices of the whole signal.
+        """
+
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 1:
+            raise ValueError("Chunk must be one-dimensional.")
+
+        candidates = _peakdet_candidates(chunk, self.delta)
+        max_locs, _, min_locs, _, self.state = _peakdet_scan(
+            chunk[candidates], candidates + self.n_samples, self.delta, self.state
+        )
+        self.n_samples += len(chunk)
+
+        return {"Peak_locs": max_locs.astype(int), "Trough_locs": min_locs.astype(int)}
+
+    def reset(self):
+        """Resets the detector, so that the next chunk is processed as the start of a new signal."""
+
+        self.state = PEAKDET_INITIAL_STATE
+        self.n_samples = 0
+
+
 def _peakdetection_peakdet(v: ArrayLike, delta: float, x: ArrayLike = None) -> ArrayLike:
     """Detects signal peaks using the method 'peakdet'.
     Reference: https://gist.github.com/endolith/250860
@@ -91,13 +147,11 @@ def _peakdetection_peakdet(v: ArrayLike, delta: float, x: ArrayLike = None) -> A
 
     """
 
-    maxtab = []
-    mintab = []
-
     if x is None:
         x = np.arange(len(v))
 
     v = np.asarray(v)
+    x = np.asarray(x)
 
     if len(v) != len(x):
         sys.exit("Input vectors v and x must have same length")
@@ -108,34 +162,222 @@ def _peakdetection_peakdet(v: ArrayLike, delta: float, x: ArrayLike = None) -> A
     if delta <= 0:
         sys.exit("Input argument delta must be positive")
 
-    mn, mx = np.Inf, -np.Inf
-    mnpos, mxpos = np.NaN, np.NaN
+    candidates = _peakdet_candidates(v, delta)
+    max_locs, max_values, min_locs, min_values, _ = _peakdet_scan(v[candidates], candidates, delta)
+
+    return _peakdet_table(max_locs, max_values, x, v), _peakdet_table(min_locs, min_values, x, v)
+
 
-    lookformax = True
+PEAKDET_INITIAL_STATE = (np.inf, -np.inf, np.nan, np.nan, True)  # mn, mx, mnpos, mxpos, lookformax
+MIN_RUN = 8  # shortest run of alternating extrema that _peakdet_scan emits without the loop
 
-    for i in np.arange(len(v)):
-        this = v[i]
+
+def _peakdet_candidates(v: ArrayLike, delta: float = None) -> ArrayLike:
+    """Returns the indices of the samples that can change the state of peakdet: the turning points of the signal (the
+    first sample of each top or bottom), the first sample of the last flat part and the first and last samples.
+    NaN samples never change the state and are excluded. Between two candidates the signal is monotonic, so peakdet
+    finds the same peaks and troughs on the candidates. If delta is given, the turning points are reduced with
+    _peakdet_reduce."""
+
+    index = None
+    if v.dtype.kind == "f":
+        missing = np.isnan(v)
+        if missing.any():
+            index = np.flatnonzero(~missing)
+            v = v[index]
+    if len(v) < 3:
+        candidates = np.arange(len(v))
+    else:
+        up = v[1:] > v[:-1]
+        flat = v[1:] == v[:-1]
+        if flat.all():
+            candidates = np.array([0, len(v) - 1])
+        else:
+            if flat.any():
+                # the turning point of a flat top or bottom is its first sample
+                steps = np.flatnonzero(~flat)
+                rising = up[steps]
+                turning = steps[:-1][rising[1:] != rising[:-1]] + 1
+                last_step = steps[-1]
+            else:
+                turning = np.flatnonzero(up[1:] != up[:-1]) + 1
+                last_step = len(v) - 2
+            if delta is not None:
+                turning = _peakdet_reduce(v, turning, delta)
+            candidates = np.concatenate(([0], turning, [last_step + 1, len(v) - 1]))
+            candidates = candidates[np.concatenate(([True], np.diff(candidates) > 0))]
+    return candidates if index is None else index[candidates]
+
+
+def _peakdet_reduce(w: ArrayLike, turning: ArrayLike, delta: float) -> ArrayLike:
+    """Removes the oscillations of the turning points that cannot change the peaks and troughs found by peakdet.
+
+    A trough followed by a peak is removed if the peak is not higher than the previous peak, rises by at most delta
+    and the next trough is lower, i.e. a small oscillation of a falling signal (and symmetrically for a rising
+    signal). Whatever the state of peakdet, processing the two samples does not emit anything that the next
+    turning point would not emit, and the next turning point takes the running extremum over. The removable
+    pairs are removed together, in passes until no pair is removed. Only float64 signals are reduced, since the
+    comparisons must round like the scalar comparisons of the peakdet loop.
+    """
+
+    if w.dtype != np.float64:
+        return turning
+
+    delta = float(delta)
+    u = w[turning]
+    while len(turning) >= 4:
+        # turning points alternate, so the quadruples (a0, a, b, b1) starting with a peak and a trough alternate
+        remove = np.empty(len(u) - 3, dtype=bool)
+        for first in (0, 1):
+            a0, a, b, b1 = u[first:-3:2], u[first + 1 : -2 : 2], u[first + 2 : -1 : 2], u[first + 3 :: 2]
+            if u[first + 1] < u[first]:
+                remove[first::2] = (b <= a0) & (b1 < a) & ~(b > a + delta)
+            else:
+                remove[first::2] = (b >= a0) & (b1 > a) & ~(b < a - delta)
+        if not remove.any():
+            break
+        # a falling and a rising oscillation cannot share a turning point, so the removable pairs do not overlap
+        keep = np.ones(len(turning), dtype=bool)
+        keep[1:-2] = ~remove
+        keep[2:-1] &= ~remove
+        turning = turning[keep]
+        u = u[keep]
+
+    return turning
+
+
+def _peakdet_scan(values: ArrayLike, locs: ArrayLike, delta: float, state: tuple = None) -> tuple:
+    """Runs the peakdet hysteresis on a sequence of samples.
+
+    Runs of at least MIN_RUN alternating extrema in which every rise and fall is larger than delta, such as the reduced
+    candidates of a filtered signal, are emitted without the loop once peakdet holds the first extremum of the run.
+
+    Args:
+        values (ArrayLike): Sample values, e.g. the candidates of _peakdet_candidates.
+        locs (ArrayLike): Locations of the samples.
+        delta (float): Required parameter of the peakdet method.
+        state (tuple, optional): State (mn, mx, mnpos, mxpos, lookformax) after the previous samples. Defaults to the initial state.
+
+    Returns:
+        tuple: Peak locations, peak values, trough locations, trough values and the state after the last sample.
+    """
+
+    state = PEAKDET_INITIAL_STATE if state is None else state
+    values = np.asarray(values)
+    locs = np.asarray(locs)
+    runs = []
+    if values.dtype == np.float64:
+        delta = float(delta)
+        runs = _peakdet_runs(values, delta)
+
+    chunks = []
+    start = 0
+    for run_start, run_end in runs:
+        # emit the run from the first extremum that peakdet holds
+        for first in range(max(run_start, start - 1), run_end - MIN_RUN + 1):
+            if first >= start:
+                *tables, state = _peakdet_loop(values[start : first + 1], locs[start : first + 1], delta, state)
+                chunks.append(tables)
+                start = first + 1
+            mn, mx, mnpos, mxpos, lookformax = state
+            held = (mx, mxpos) if lookformax else (mn, mnpos)
+            if lookformax == (values[first + 1] < values[first]) and held == (values[first], locs[first]):
+                *tables, state = _peakdet_emit(values, locs, first, run_end)
+                chunks.append(tables)
+                start = run_end + 1
+                break
+
+    *tables, state = _peakdet_loop(values[start:], locs[start:], delta, state)
+    chunks.append(tables)
+
+    return tuple(_concatenate([chunk[i] for chunk in chunks]) for i in range(4)) + (state,)
+
+
+def _peakdet_runs(values: ArrayLike, delta: float) -> list:
+    """Returns the (first, last) sample indices of the runs of at least MIN_RUN alternating extrema in which each
+    sample makes peakdet emit the previous one."""
+
+    if len(values) < MIN_RUN + 1:
+        return []
+    falls = values[1:] < values[:-1] - delta
+    rises = values[1:] > values[:-1] + delta
+    alternating = np.concatenate(([False], (falls[:-1] & rises[1:]) | (rises[:-1] & falls[1:]), [False]))
+    edges = np.flatnonzero(alternating[1:] != alternating[:-1])
+    # alternating[i + 1] links the steps i and i + 1, a run of links from i to j - 1 spans the samples i to j + 1
+    first, last = edges[::2], edges[1::2] + 1
+    long = last - first >= MIN_RUN
+    return list(zip(first[long].tolist(), last[long].tolist()))
+
+
+def _peakdet_loop(values: ArrayLike, locs: ArrayLike, delta: float, state: tuple) -> tuple:
+    """Runs the peakdet loop sample by sample."""
+
+    mn, mx, mnpos, mxpos, lookformax = state
+    if values.dtype == np.float64:
+        # python floats compare and subtract exactly like float64 scalars, and much faster
+        values = values.tolist()
+    locs = locs.tolist()
+
+    max_locs, max_values, min_locs, min_values = [], [], [], []
+
+    for this, loc in zip(values, locs):
         if this > mx:
             mx = this
-            mxpos = x[i]
+            mxpos = loc
         if this < mn:
             mn = this
-            mnpos = x[i]
+            mnpos = loc
 
         if lookformax:
             if this < mx - delta:
-                maxtab.append((mxpos, mx))
+                max_locs.append(mxpos)
+                max_values.append(mx)
                 mn = this
-                mnpos = x[i]
+                mnpos = loc
                 lookformax = False
         else:
             if this > mn + delta:
-                mintab.append((mnpos, mn))
+                min_locs.append(mnpos)
+                min_values.append(mn)
                 mx = this
-                mxpos = x[i]
+                mxpos = loc
                 lookformax = True
 
-    return np.array(maxtab), np.array(mintab)
+    return max_locs, max_values, min_locs, min_values, (mn, mx, mnpos, mxpos, lookformax)
+
+
+def _peakdet_emit(values: ArrayLike, locs: ArrayLike, first: int, last: int) -> tuple:
+    """Emits the alternating extrema values[first:last] held by peakdet and returns them with the state after
+    values[last]."""
+
+    peak = first if values[first + 1] < values[first] else first + 1
+    trough = first + 1 if peak == first else first
+    tables = locs[peak:last:2], values[peak:last:2], locs[trough:last:2], values[trough:last:2]
+    held = values[last - 1 : last + 1].tolist(), locs[last - 1 : last + 1].tolist()
+    if values[last] < values[last - 1]:
+        return tables + ((held[0][1], held[0][0], held[1][1], held[1][0], False),)
+    return tables + ((held[0][0], held[0][1], held[1][0], held[1][1], True),)
+
+
+def _concatenate(chunks: list) -> ArrayLike:
+    """Concatenates the non-empty lists and arrays of chunks."""
+
+    chunks = [chunk for chunk in chunks if len(chunk) > 0]
+    if len(chunks) == 0:
+        return np.array([])
+    return chunks[0] if len(chunks) == 1 and isinstance(chunks[0], np.ndarray) else np.concatenate(chunks)
+
+
+def _peakdet_table(locs: ArrayLike, values: ArrayLike, x: ArrayLike, v: ArrayLike) -> ArrayLike:
+    """Returns the (location, value) rows of peakdet with the dtype of the original list of tuples."""
+
+    if len(values) == 0:
+        return np.array([])
+    dtype = np.array([(x[0], v[0])]).dtype
+    table = np.empty((len(values), 2), dtype=dtype)
+    table[:, 0] = x[locs]
+    table[:, 1] = values
+    return table
 
 
 def _peakdetection_heartpy(sig: ArrayLike, sampling_rate: float) -> Any:
@@ -1,10 +1,17 @@
+import numpy as np
 from numpy.typing import ArrayLike
 from scipy import signal
 
+from biobss.common.signal_dtype import as_float_dtype
+from biobss.common.signal_filter_design import butter_sos, notch_ba, precompute_filter_designs, register_filter_designs
 from biobss.ecgtools.ecg_filter import *
+from biobss.ecgtools.ecg_filter import _ecg_bandpass_sos, _filter_ecg_designs
 from biobss.edatools.eda_filter import *
+from biobss.edatools.eda_filter import _eda_lowpass_sos
 from biobss.imutools.acc_filter import *
+from biobss.imutools.acc_filter import _acc_lowpass_sos
 from biobss.ppgtools.ppg_filter import *
+from biobss.ppgtools.ppg_filter import _ppg_bandpass_sos
 
 
 def filter_signal(
@@ -22,7 +29,7 @@ def filter_signal(
     """Filters a signal using a N-th order Butterworth filter unless signal_type is specified. If signal_type is specified, predefined filter parameters are used.
 
     Args:
-        sig (ArrayLike): Signal to be filtered.
+        sig (ArrayLike): Signal to be filtered. 2-D arrays of signals (e.g. windows or channels) are filtered in a single call. Predefined filters are applied along the last axis.
         sampling_rate (float): The sampling frequency of the signal (Hz).
         signal_type (str, optional): Type of the input signal. If None, a Butterworth filter is used and the filter parameters should be defined. If a value is passed, the predefined filter parameters for each signal type (most common in the literature) are used for filtering. Defaults to None.
         method (str, optional): Filtering method for the selected signal_type. Defaults to None.
@@ -30,7 +37,7 @@ def filter_signal(
         N (int, optional): Order of the filter. Defaults to None.
         f_lower (float, optional): Lower cutoff frequency (Hz). Defaults to None.
         f_upper (float, optional): Upper cutoff frequency (Hz). Defaults to None.
-        axis (int, optional): The axis alongh which filtering is applied. Defaults to 0.
+        axis (int, optional): The axis along which the Butterworth filter is applied. Pass -1 to filter 2-D arrays of windows or channels row by row. Defaults to 0.
 
     Raises:
         ValueError: If sampling rate is less than or equal to zero.
@@ -51,44 +58,8 @@ def filter_signal(
     valid_types = ["ECG", "ACC", "EDA", "PPG"]
 
     if signal_type is None:
-
-        if filter_type == "lowpass":
-            if f_upper is not None:
-                if f_upper < 0:
-                    raise ValueError("Cut-off frequency must be greater than 0.")
-                W2 = f_upper / (sampling_rate / 2)  # normalized frequency
-                btype = "lowpass"
-                sos2 = signal.butter(N, W2, btype, output="sos")
-                filtered_sig = signal.sosfiltfilt(sos2, sig, axis=axis)
-            else:
-                raise ValueError("Upper cutoff frequency is required for lowpass filtering.")
-
-        elif filter_type == "highpass":
-            if f_lower is not None:
-                if f_lower < 0:
-                    raise ValueError("Cut-off frequency must be greater than 0.")
-                W1 = f_lower / (sampling_rate / 2)  # normalized frequency
-                btype = "highpass"
-                sos1 = signal.butter(N, W1, btype, output="sos")
-                filtered_sig = signal.sosfiltfilt(sos1, sig, axis=axis)
-            else:
-                raise ValueError("Lower cutoff frequency is required for highpass filtering.")
-
-        elif filter_type == "bandpass":
-            if f_lower is not None and f_upper is not None:
-                if f_lower < 0 or f_upper < 0:
-                    raise ValueError("Cut-off frequencies must be greater than 0.")
-
-                W1 = f_lower / (sampling_rate / 2)  # normalized frequency
-                W2 = f_upper / (sampling_rate / 2)  # normalized frequency
-                btype = "bandpass"
-                sos = signal.butter(N, [W1, W2], btype, output="sos")
-                filtered_sig = signal.sosfiltfilt(sos, sig, axis=axis)
-            else:
-                raise ValueError("Both lower and upper cutoff frequencies are required for bandpass filtering.")
-
-        else:
-            raise ValueError("Filter type should be one of 'lowpass', 'highpass' or 'bandpass'.")
+        sos = _butter_filter_sos(sampling_rate, filter_type, N, f_lower, f_upper)
+        filtered_sig = signal.sosfiltfilt(sos, sig, axis=axis)
 
     else:
         signal_type = signal_type.upper()
@@ -110,4 +81,201 @@ def filter_signal(
         else:
             raise ValueError(f"Signal type should be one of {valid_types}.")
 
-    return filtered_sig
+    return as_float_dtype(filtered_sig, sig)
+
+
+class StreamingFilter:
+    """Causal filter applied to a signal chunk by chunk, e.g. to samples received from a device.
+
+    The filter state is carried between chunks, so filtering a signal in chunks of any size gives the same output as
+    filtering it in a single scipy.signal.sosfilt call. Unlike filter_signal, the filter is not zero-phase: the output
+    is delayed by the group delay of the filter.
+    """
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        signal_type: str = None,
+        method: str = None,
+        filter_type: str = None,
+        N: int = None,
+        f_lower: float = None,
+        f_upper: float = None,
+        steady_state: bool = False,
+        **kwargs,
+    ):
+        """Designs a streaming filter from the parameters of filter_signal.
+
+        Args:
+            sampling_rate (float): The sampling frequency of the signal (Hz).
+            signal_type (str, optional): Type of the input signal. If None, a Butterworth filter is used and the filter parameters should be defined. If a value is passed, the predefined filter of the signal type and method is used. Defaults to None.
+            method (str, optional): Filtering method for the selected signal_type: 'notch', 'pantompkins', 'hamilton' or 'elgendi' for ECG, 'bandpass' for PPG, 'lowpass' for ACC and 'neurokit' for EDA. Defaults to the default method of filter_ppg, filter_acc and filter_eda.
+            filter_type (str, optional): Type of the filter. Can be 'lowpass', 'highpass' or 'bandpass'. Defaults to None.
+            N (int, optional): Order of the filter. Defaults to None.
+            f_lower (float, optional): Lower cutoff frequency (Hz). Defaults to None.
+            f_upper (float, optional): Upper cutoff frequency (Hz). Defaults to None.
+            steady_state (bool, optional): If True, the filter starts in the steady state of a constant signal equal to the first sample, which removes the initial transient. Defaults to False, which matches sosfilt without initial conditions.
+
+        Kwargs:
+            f_notch (float) : Center frequency of the ECG notch filter (Hz).
+            quality_factor (float): Quality factor of the ECG notch filter.
+
+        Raises:
+            ValueError: If sampling rate is less than or equal to zero.
+            ValueError: If the filter parameters are invalid, see filter_signal.
+            ValueError: If signal type or method is not one of valid types.
+        """
+
+        if sampling_rate <= 0:
+            raise ValueError("Sampling rate must be greater than 0.")
+
+        self.sampling_rate = sampling_rate
+        self.steady_state = steady_state
+        self.sos = _streaming_sos(sampling_rate, signal_type, method, filter_type, N, f_lower, f_upper, **kwargs)
+        self.zi = None
+
+    def filter(self, chunk: ArrayLike) -> ArrayLike:
+        """Filters the next chunk of the signal.
+
+        Args:
+            chunk (ArrayLike): Next samples of the signal, or 2-D array (n_channels, n_samples) with the next samples of several signals filtered along the last axis. The leading shape must not change between chunks.
+
+        Raises:
+            ValueError: If the leading shape of the chunk does not match the previous chunks.
+
+        Returns:
+            ArrayLike: Filtered chunk, with the same shape as chunk.
+        """
+
+        chunk_ = np.asarray(chunk)
+        if self.sos is None or chunk_.shape[-1] == 0:
+            return as_float_dtype(np.array(chunk_, dtype=np.float64), chunk_)
+
+        if self.zi is None:
+            # initial conditions of shape (n_sections, ..., 2), one state for each signal
+            zi = signal.sosfilt_zi(self.sos).reshape((len(self.sos),) + (1,) * (chunk_.ndim - 1) + (2,))
+            zi = np.broadcast_to(zi, (len(self.sos),) + chunk_.shape[:-1] + (2,))
+            if self.steady_state:
+                self.zi = zi * chunk_[..., :1].astype(np.float64)
+            else:
+                self.zi = np.zeros(zi.shape)
+        elif self.zi.shape[1:-1] != chunk_.shape[:-1]:
+            raise ValueError("The leading shape of the chunks must not change between chunks.")
+
+        filtered_sig, self.zi = signal.sosfilt(self.sos, chunk_, axis=-1, zi=self.zi)
+
+        return as_float_dtype(filtered_sig, chunk_)
+
+    def reset(self):
+        """Resets the filter state, so that the next chunk is filtered as the start of a new signal."""
+
+        self.zi = None
+
+
+def _butter_filter_sos(
+    sampling_rate: float, filter_type: str, N: int, f_lower: float = None, f_upper: float = None
+) -> ArrayLike:
+    """Checks the parameters of a Butterworth filter and returns its second-order sections."""
+
+    if filter_type == "lowpass":
+        if f_upper is not None:
+            if f_upper < 0:
+                raise ValueError("Cut-off frequency must be greater than 0.")
+            return butter_sos(N, f_upper, "lowpass", sampling_rate)
+        else:
+            raise ValueError("Upper cutoff frequency is required for lowpass filtering.")
+
+    elif filter_type == "highpass":
+        if f_lower is not None:
+            if f_lower < 0:
+                raise ValueError("Cut-off frequency must be greater than 0.")
+            return butter_sos(N, f_lower, "highpass", sampling_rate)
+        else:
+            raise ValueError("Lower cutoff frequency is required for highpass filtering.")
+
+    elif filter_type == "bandpass":
+        if f_lower is not None and f_upper is not None:
+            if f_lower < 0 or f_upper < 0:
+                raise ValueError("Cut-off frequencies must be greater than 0.")
+            return butter_sos(N, [f_lower, f_upper], "bandpass", sampling_rate)
+        else:
+            raise ValueError("Both lower and upper cutoff frequencies are required for bandpass filtering.")
+
+    else:
+        raise ValueError("Filter type should be one of 'lowpass', 'highpass' or 'bandpass'.")
+
+
+def _filter_signal_designs(
+    sampling_rate: float,
+    signal_type: str = None,
+    method: str = None,
+    filter_type: str = None,
+    N: int = None,
+    f_lower: float = None,
+    f_upper: float = None,
+    **kwargs,
+):
+    """Designs the filters used by filter_signal."""
+
+    if sampling_rate <= 0:
+        raise ValueError("Sampling rate must be greater than 0.")
+
+    if signal_type is None:
+        _butter_filter_sos(sampling_rate, filter_type, N, f_lower, f_upper)
+    else:
+        signal_type = signal_type.upper()
+        if method is not None:
+            method = method.lower()
+        # EDA filters are designed by neurokit
+        filters = {"ECG": filter_ecg, "PPG": filter_ppg, "ACC": filter_acc}
+        if signal_type in filters:
+            precompute_filter_designs(filters[signal_type], sampling_rate, method=method, **kwargs)
+        elif signal_type != "EDA":
+            raise ValueError("Signal type should be one of ['ECG', 'ACC', 'EDA', 'PPG'].")
+
+
+register_filter_designs(filter_signal, _filter_signal_designs)
+
+
+def _streaming_sos(
+    sampling_rate: float,
+    signal_type: str = None,
+    method: str = None,
+    filter_type: str = None,
+    N: int = None,
+    f_lower: float = None,
+    f_upper: float = None,
+    **kwargs,
+) -> ArrayLike:
+    """Returns the second-order sections of a streaming filter, or None if the signal is passed unchanged."""
+
+    if signal_type is None:
+        return _butter_filter_sos(sampling_rate, filter_type, N, f_lower, f_upper)
+
+    signal_type = signal_type.upper()
+    if method is not None:
+        method = method.lower()
+
+    if signal_type == "ECG":
+        if method == "notch":
+            _filter_ecg_designs(sampling_rate, method, **kwargs)
+            return signal.tf2sos(*notch_ba(kwargs["f_notch"], kwargs["quality_factor"], sampling_rate))
+        elif method in ECG_BANDPASS_PRESETS:
+            return _ecg_bandpass_sos(method, sampling_rate)
+
+    elif signal_type == "PPG":
+        if method in (None, "bandpass"):
+            return _ppg_bandpass_sos(sampling_rate)
+
+    elif signal_type == "ACC":
+        if method in (None, "lowpass"):
+            return _acc_lowpass_sos(sampling_rate)
+
+    elif signal_type == "EDA":
+        if method in (None, "neurokit"):
+            return _eda_lowpass_sos(sampling_rate)
+
+    else:
+        raise ValueError("Signal type should be one of ['ECG', 'ACC', 'EDA', 'PPG'].")
+
+    raise ValueError(f"Undefined streaming method for {signal_type}: {method}.")
@@ -2,12 +2,13 @@ import numpy as np
 from numpy.typing import ArrayLike
 
 
-def normalize_signal(signal: ArrayLike, method: str = "zscore") -> ArrayLike:
+def normalize_signal(signal: ArrayLike, method: str = "zscore", axis: int = None) -> ArrayLike:
     """Normalizes a signal.
 
     Args:
         signal (ArrayLike): Input signal.
         method (str, optional): Normalization method. Defaults to 'zscore'.
+        axis (int, optional): Axis along which the signal is normalized. If None, the whole array is normalized. Use -1 to normalize each window of a (n_windows, n_samples) array independently. Defaults to None.
 
     Raises:
         ValueError: If method is not 'zscore' or 'minmax'.
@@ -18,8 +19,12 @@ def normalize_signal(signal: ArrayLike, method: str = "zscore") -> ArrayLike:
     # Need to add signal check
     epsilon = 1e-100
     if method == "zscore":
-        return (signal - np.mean(signal)) / (np.std(signal) + epsilon)
+        return (signal - np.mean(signal, axis=axis, keepdims=True)) / (
+            np.std(signal, axis=axis, keepdims=True) + epsilon
+        )
     elif method == "minmax":
-        return (signal - signal.min()) / (signal.max() - signal.min() + epsilon)
+        sig_min = np.min(signal, axis=axis, keepdims=True)
+        sig_max = np.max(signal, axis=axis, keepdims=True)
+        return (signal - sig_min) / (sig_max - sig_min + epsilon)
     else:
         raise ValueError(f"Unknown method '{method}', available values are [zscore, minmax].")
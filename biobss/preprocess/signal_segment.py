@@ -1,11 +1,18 @@
 from collections.abc import Iterable
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from numpy.typing import ArrayLike
 
 
 def segment_signal(
-    signal: ArrayLike, sampling_rate: float, window_size: float, step_size=float, is_event=False
+    signal: ArrayLike,
+    sampling_rate: float,
+    window_size: float,
+    step_size=float,
+    is_event=False,
+    as_view=False,
+    dtype=None,
 ) -> ArrayLike:
     """Generates segments from input signal.
 
@@ -14,6 +21,8 @@ def segment_signal(
         sampling_rate (float): Sampling rate of the signal.
         window_size (float): Size of signal windows in seconds.
         step_size (_type_, optional): Step Size in seconds.
+        as_view (bool, optional): If True, a read-only strided view over the input buffer is returned instead of a new array. No memory is allocated and the signal keeps its dtype. Defaults to False.
+        dtype (optional): Data type of the windows when as_view is False, e.g. np.float32 to halve the memory of the windows. Defaults to float64.
 
     Raises:
         ValueError: If sampling rate is not greater than 0.
@@ -45,8 +54,11 @@ def segment_signal(
     window_size = int(window_size * sampling_rate)
     step_size = int(step_size * sampling_rate)
     num_frames = int(np.floor((len(signal) - window_size) / step_size) + 1)
+    if as_view:
+        # Windows overlap in memory, so the view is read-only
+        return sliding_window_view(np.asarray(signal), window_size)[::step_size][:num_frames]
     # Initialize the output signal
-    signal_out = np.zeros((num_frames, window_size))
+    signal_out = np.zeros((num_frames, window_size), dtype=np.float64 if dtype is None else dtype)
     # Sliding window operation
     for i in range(num_frames):
         signal_out[i] = signal[i * step_size : i * step_size + window_size]
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biobss.pipeline.batch_runner import run_batch
+from biobss.pipeline.bio_channel import Channel
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.ppgtools.ppg_features import from_segment
+from biobss.preprocess.signal_normalize import normalize_signal
+
+
+def _load_recording(path):
+    return Channel(np.load(path), name="ecg", sampling_rate=256)
+
+
+def _build_pipeline():
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    normalize = Bio_Process(normalize_signal, process_name="normalize")
+    pipeline.process_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_normalized"])
+    features = Feature("segment", from_segment, sampling_rate=256, feature_types=["Time"])
+    pipeline.add_feature_step(features, input_signals=["ecg_normalized"], feature_prefix="ecg")
+    return pipeline
+
+
+@pytest.fixture()
+def recordings(sample_ecg_array, tmp_path):
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"subject_{i}.npy")
+        np.save(path, np.asarray(sample_ecg_array, dtype=float).ravel() * (i + 1))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_a_run_batch(recordings, tmp_path, executor):
+    output_dir = str(tmp_path / "features")
+    summary = run_batch(_build_pipeline(), recordings, output_dir, loader=_load_recording, executor=executor)
+    assert list(summary["name"]) == ["subject_0", "subject_1", "subject_2"]
+    assert (summary["status"] == "done").all()
+
+    expected = _build_pipeline()
+    expected.set_input(_load_recording(recordings[1]))
+    expected.run_pipeline()
+    expected.extract_features()
+    features = pd.read_csv(os.path.join(output_dir, "subject_1.csv"), index_col=0)
+    np.testing.assert_allclose(features.values, expected.get_features().values)
+
+
+def test_b_resume(recordings, tmp_path):
+    output_dir = str(tmp_path / "features")
+    run_batch(_build_pipeline(), recordings[:2], output_dir, loader=_load_recording, executor="serial")
+    # a missing recording fails without stopping the batch
+    summary = run_batch(
+        _build_pipeline(), recordings + [str(tmp_path / "missing.npy")], output_dir, loader=_load_recording
+    )
+    assert list(summary["status"]) == ["skipped", "skipped", "done", "failed"]
+    assert "missing.npy" in summary.loc[3, "error"]
+    assert sorted(os.listdir(output_dir)) == ["subject_0.csv", "subject_1.csv", "subject_2.csv"]
+
+    with pytest.raises(RuntimeError):
+        run_batch(_build_pipeline(), [str(tmp_path / "missing.npy")], output_dir, _load_recording, on_error="raise")
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.pipeline.pipeline_export import export_pipeline, import_pipeline
+from biobss.pipeline.result_cache import Result_Cache, make_key
+from biobss.preprocess.signal_normalize import normalize_signal
+
+
+def _window_stats(sig):
+    return {"mean": np.mean(sig), "std": np.std(sig)}
+
+
+def _build_pipeline(ref_ecg_channel, cache, method="zscore"):
+    pipeline = Bio_Pipeline()
+    pipeline.set_input(ref_ecg_channel)
+    pipeline.set_cache(cache)
+    normalize = Bio_Process(normalize_signal, process_name="normalize", method=method)
+    pipeline.process_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_normalized"])
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_normalized"])
+    return pipeline
+
+
+def test_a_make_key():
+    signal = np.arange(10.0)
+    assert make_key(signal, 256, normalize_signal) == make_key(signal.copy(), 256, normalize_signal)
+    assert make_key(signal, 256, normalize_signal) != make_key(signal, 128, normalize_signal)
+    assert make_key(signal, {"method": "zscore"}) != make_key(signal, {"method": "minmax"})
+    assert make_key(lambda x: x + 1) != make_key(lambda x: x + 2)
+
+
+def test_b_pipeline_cache(ref_ecg_channel):
+    cache = Result_Cache()
+    first = _build_pipeline(ref_ecg_channel, cache)
+    first.run_pipeline()
+    first.extract_features()
+    assert cache.hits == 0 and cache.misses == 2
+
+    second = _build_pipeline(ref_ecg_channel, cache)
+    second.run_pipeline()
+    second.extract_features()
+    assert cache.hits == 2
+    assert first.get_data() == second.get_data()
+    assert first.get_features().equals(second.get_features())
+
+    third = _build_pipeline(ref_ecg_channel, cache, method="minmax")
+    third.run_pipeline()
+    assert cache.misses == 3
+
+
+def test_c_lru_eviction():
+    cache = Result_Cache(max_size=3 * 80)
+    for i in range(4):
+        cache.set(str(i), np.zeros(10))
+    assert cache.get("0") is None
+    assert cache.get("3") is not None
+    assert cache.stats()["entries"] == 3
+
+
+def test_d_disk_tier(tmp_path):
+    cache = Result_Cache(max_size=0, cache_dir=str(tmp_path))
+    cache.set("a", np.arange(5))
+    assert np.array_equal(Result_Cache(cache_dir=str(tmp_path)).get("a"), np.arange(5))
+    cache.get("a")
+    assert cache.disk_hits == 1
+
+
+def _key_items():
+    from biobss.hrvtools.hrv_features import get_hrv_features
+    from biobss.ppgtools.ppg_peaks import ppg_waves
+
+    return ppg_waves, get_hrv_features, _set_filter
+
+
+def _set_filter(values):
+    return [v for v in values if v in {"a", "b"}]
+
+
+def test_e_key_across_processes():
+    # functions with nested code objects and set constants must have the same key in every process
+    script = "from tests.pipeline.test_cache import _key_items, make_key; print(make_key(*_key_items()))"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONHASHSEED="1")
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, env=env, capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == make_key(*_key_items())
+
+
+def _scaled(sig, factor=2):
+    return sig * factor
+
+
+def test_f_key_defaults():
+    key = make_key(_scaled)
+    _scaled.__defaults__ = (3,)
+    try:
+        assert make_key(_scaled) != key
+    finally:
+        _scaled.__defaults__ = (2,)
+
+
+def test_g_pickle_export(ref_ecg_channel, tmp_path):
+    cache = Result_Cache(cache_dir=str(tmp_path / "cache"))
+    pipeline = _build_pipeline(ref_ecg_channel, cache)
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+
+    export_pipeline(pipeline, str(tmp_path / "pipeline.pkl"))
+    second = import_pipeline(str(tmp_path / "pipeline.pkl"))
+    imported_cache = second.process_queue.cache
+    assert len(imported_cache._memory) == 0
+
+    # the imported cache is usable and shares the on-disk tier
+    second.set_input(ref_ecg_channel)
+    second.run_pipeline()
+    second.extract_features()
+    assert imported_cache.disk_hits == 2
+    pd.testing.assert_frame_equal(second.get_features(), pipeline.get_features())
@@ -1,8 +1,11 @@
+import tracemalloc
+
 import numpy as np
 import pytest
 
 from biobss.pipeline.bio_channel import Channel
 from biobss.pipeline.bio_data import Bio_Data
+from biobss.pipeline.channel_input import convert_channel
 
 
 def test_a_creation(sample_ecg_array):
@@ -23,3 +26,75 @@ def test_c_content(sample_ecg_array):
 def test_d_content_windowed(sample_windowed):
     channel = Channel(sample_windowed, name="ecg", sampling_rate=256)
     assert np.all(channel.channel == sample_windowed)
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_e_from_npy_file(sample_ecg_array, tmp_path):
+    filename = tmp_path / "ecg.npy"
+    np.save(filename, sample_ecg_array)
+    channel = Channel.from_file(str(filename), name="ecg", sampling_rate=256)
+    assert _is_mapped(channel.channel)
+    assert not channel.channel.flags.writeable
+    assert np.array_equal(channel.channel, sample_ecg_array)
+
+    # copies and Bio_Data share the mapped pages
+    data = Bio_Data()
+    data.add_channel(channel)
+    assert _is_mapped(data["ecg"].channel)
+
+
+def test_f_from_raw_file(tmp_path):
+    acc = np.arange(3000, dtype="<i2").reshape(-1, 3)
+    filename = tmp_path / "acc.bin"
+    with open(filename, "wb") as f:
+        f.write(b"\0" * 16)
+        f.write(acc.tobytes())
+    channel = Channel.from_file(str(filename), name="acc", sampling_rate=32, dtype="<i2", offset=16, shape=(1000, 3))
+    assert np.array_equal(channel.channel, acc)
+
+    with pytest.raises(ValueError):
+        Channel.from_file(str(filename), name="acc", sampling_rate=32)
+
+    # a single axis of an interleaved recording is a strided read-only view of the file
+    mapped = np.memmap(filename, dtype="<i2", mode="r", offset=16, shape=(1000, 3))
+    data = Bio_Data()
+    data.add_channel(mapped[:, 0], channel_name="acc_x", sampling_rate=32)
+    assert _is_mapped(data["acc_x"].channel)
+    assert not data["acc_x"].channel.flags.writeable
+    assert np.array_equal(data["acc_x"].channel, acc[:, 0])
+
+    # writable maps are copied, later writes to the file are not visible to the channel
+    for mode in ["r+", "c"]:
+        mapped = np.memmap(filename, dtype="<i2", mode=mode, offset=16, shape=(1000, 3))
+        channel = Channel(mapped[:, 0], name="acc_x", sampling_rate=32)
+        mapped[:, 0] = -1
+        assert not _is_mapped(channel.channel)
+        assert not channel.channel.flags.writeable
+        assert np.array_equal(channel.channel, acc[:, 0])
+        mapped[:, 0] = acc[:, 0]
+        mapped.flush()
+
+
+@pytest.mark.parametrize("source", ["list", "dict", "tuple"])
+def test_g_single_copy(source):
+    n_samples = 500000
+    values = np.arange(n_samples, dtype=np.float64).tolist()
+    tracemalloc.start()
+    if source == "list":
+        channel = Channel(values, name="ecg", sampling_rate=256)
+    else:
+        signal = {"ecg": values} if source == "dict" else (values,)
+        channel = convert_channel(signal, sampling_rate=256, name="ecg")["ecg"]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # the signal is converted into a single array, that is stored without a second copy
+    assert peak < 1.5 * n_samples * 8
+    assert not channel.channel.flags.writeable
+    assert np.array_equal(channel.channel, np.arange(n_samples))
@@ -99,3 +99,19 @@ def test_j_from_windowed(sample_windowed):
         assert result == other_bd
     except AssertionError as e:
         pytest.fail("Test 11 (from_windowed) failed: {}".format(e))
+
+
+def test_k_copy_shares_buffers(ref_bio_data):
+    copied = ref_bio_data.copy()
+    assert copied == ref_bio_data
+    assert copied["ecg"] is not ref_bio_data["ecg"]
+    assert np.shares_memory(copied["ecg"].channel, ref_bio_data["ecg"].channel)
+    assert not copied["ecg"].channel.flags.writeable
+
+
+def test_l_channel_copies_writable_input(sample_ecg_array):
+    signal = np.array(sample_ecg_array)
+    channel = Channel(signal, name="ecg", sampling_rate=256)
+    signal[0] += 1
+    assert not np.shares_memory(signal, channel.channel)
+    assert channel.channel[0] == sample_ecg_array[0]
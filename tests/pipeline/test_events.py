@@ -1,3 +1,5 @@
+import pickle
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -52,3 +54,61 @@ def test_e_data_frame_input(sample_peaks, ref_peak_bio_data):
     sample_data_frame = pd.DataFrame(np.transpose([sample_peaks]), columns=["ecg_peaks"])
     b_data = convert_event(sample_data_frame, sampling_rate=256, name="ecg_peaks")
     assert b_data == ref_peak_bio_data
+
+
+def test_f_windowed_layout():
+    windows = [np.array([3, 10]), np.array([], dtype=int), [7], np.array([1, 2, 5])]
+    channel = Event_Channel(windows, name="peaks", sampling_rate=100)
+    assert channel.n_windows == 4
+    assert channel.indices.dtype == np.int64
+    np.testing.assert_array_equal(channel.offsets, [0, 2, 2, 3, 6])
+    np.testing.assert_array_equal(channel.window_counts, [2, 0, 1, 3])
+    for i, window in enumerate(windows):
+        np.testing.assert_array_equal(channel.get_window(i), window)
+        np.testing.assert_array_equal(channel.channel[i], window)
+    assert not channel.indices.flags.writeable
+    # windows are views of the flat array
+    assert np.shares_memory(channel.get_window(3), channel.indices)
+
+    copied = channel.copy()
+    assert copied == channel
+    assert copied.indices is channel.indices
+
+    restored = pickle.loads(pickle.dumps(channel))
+    assert restored == channel
+    assert restored.channel[2].tolist() == [7]
+
+
+def test_g_single_event_windows():
+    # windows with a single event are squeezed to scalars by convert_event
+    b_data = convert_event([np.array([4]), np.array([1, 8])], name="peaks", sampling_rate=100, n_windows=2)
+    np.testing.assert_array_equal(b_data["peaks"].offsets, [0, 1, 3])
+    assert b_data["peaks"].n_windows == 2
+
+
+def test_h_segment_and_absolute():
+    peaks = np.array([5, 120, 180, 260, 390, 410, 600])
+    channel = Event_Channel(peaks, name="peaks", sampling_rate=100)
+    windowed = channel.segment(window_size=2, step_size=1)
+    starts = np.arange(windowed.n_windows) * 100
+    for i, start in enumerate(starts):
+        expected = peaks[(peaks >= start) & (peaks < start + 200)] - start
+        np.testing.assert_array_equal(windowed.get_window(i), expected)
+
+    absolute = windowed.to_absolute(step_size=1)
+    np.testing.assert_array_equal(absolute, np.concatenate([windowed.get_window(i) + s for i, s in enumerate(starts)]))
+    # like segment_signal, the windows end before the end of the recording
+    np.testing.assert_array_equal(np.unique(absolute), peaks[peaks < starts[-1] + 200])
+
+    padded = channel.segment(window_size=2, step_size=1, n_windows=10)
+    assert padded.n_windows == 10
+    assert len(padded.get_window(9)) == 0
+
+
+def test_i_equality():
+    a = Event_Channel([1, 2, 3], name="peaks", sampling_rate=100)
+    b = Event_Channel(np.array([1, 2, 3]), name="peaks", sampling_rate=100)
+    windowed = Event_Channel.from_windows([[1, 2, 3]], name="peaks", sampling_rate=100)
+    assert a == b
+    assert not a == windowed
+    assert windowed.n_windows == 1
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.pipeline.window_executor import run_windows
+from biobss.preprocess.signal_normalize import normalize_signal
+
+
+def _window_stats(sig):
+    return {"mean": np.mean(sig), "std": np.std(sig)}
+
+
+def _build_pipeline(ref_ecg_channel):
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    pipeline.set_input(ref_ecg_channel)
+    normalize = Bio_Process(normalize_signal, process_name="normalize", method="minmax")
+    pipeline.process_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_normalized"])
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_normalized"])
+    return pipeline
+
+
+def test_a_run_windows_order():
+    tasks = [((i,), {}) for i in range(20)]
+    for executor in ["serial", "thread", "process"]:
+        assert run_windows(abs, tasks, executor=executor, n_workers=2, chunk_size=3) == list(range(20))
+
+
+def test_b_invalid_executor():
+    with pytest.raises(ValueError):
+        run_windows(abs, [((1,), {})], executor="gpu")
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_c_pipeline_executor(ref_ecg_channel, executor):
+    serial = _build_pipeline(ref_ecg_channel)
+    serial.run_pipeline()
+    serial.extract_features()
+    parallel = _build_pipeline(ref_ecg_channel)
+    parallel.run_pipeline(executor=executor, n_workers=2, chunk_size=4)
+    parallel.extract_features(executor=executor, n_workers=2, chunk_size=4)
+    assert serial.get_data() == parallel.get_data()
+    assert serial.get_features().equals(parallel.get_features())
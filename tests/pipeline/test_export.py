@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.pipeline.pipeline_export import (
+    FORMAT_VERSION,
+    export_pipeline,
+    import_pipeline,
+    pipeline_from_dict,
+    pipeline_to_dict,
+)
+from biobss.ppgtools.ppg_features import from_segment
+from biobss.preprocess.signal_normalize import normalize_signal
+
+
+def _build_pipeline():
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    normalize = Bio_Process(normalize_signal, process_name="normalize", method="minmax")
+    pipeline.process_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_normalized"])
+    features = Feature("segment", from_segment, sampling_rate=256, feature_types=["Time"])
+    pipeline.add_feature_step(features, input_signals=["ecg_normalized"], feature_prefix="ecg")
+    return pipeline
+
+
+def _run(pipeline, channel):
+    pipeline.set_input(channel)
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    return pipeline.get_features()
+
+
+@pytest.mark.parametrize("extension", [".json", ".yaml"])
+def test_a_definition_roundtrip(ref_ecg_channel, tmp_path, extension):
+    filename = str(tmp_path / ("pipeline" + extension))
+    export_pipeline(_build_pipeline(), filename)
+    imported = import_pipeline(filename)
+    assert pipeline_to_dict(imported) == pipeline_to_dict(_build_pipeline())
+    assert imported.process_queue.process_list[0].process_method is normalize_signal
+    pd.testing.assert_frame_equal(_run(imported, ref_ecg_channel), _run(_build_pipeline(), ref_ecg_channel))
+
+
+def test_b_definition_content():
+    definition = pipeline_to_dict(_build_pipeline())
+    assert definition["version"] == FORMAT_VERSION
+    assert definition["processes"][0]["function"] == "biobss.preprocess.signal_normalize.normalize_signal"
+    assert definition["processes"][0]["kwargs"] == {"method": "minmax"}
+    assert definition["features"][0]["prefix"] == "ecg"
+
+    definition["version"] = FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        pipeline_from_dict(definition)
+
+
+def test_c_unexportable_steps(tmp_path):
+    pipeline = Bio_Pipeline()
+    pipeline.add_feature_step(Feature("mean", lambda x: np.mean(x)), input_signals="ecg")
+    with pytest.raises(ValueError):
+        export_pipeline(pipeline, str(tmp_path / "pipeline.json"))
+    with pytest.raises(ValueError):
+        export_pipeline(_build_pipeline(), str(tmp_path / "pipeline.json"), include_data=True)
+
+
+def test_d_pickle_keeps_data(ref_ecg_channel, tmp_path):
+    pipeline = _build_pipeline()
+    features = _run(pipeline, ref_ecg_channel)
+    export_pipeline(pipeline, str(tmp_path / "pipeline.pkl"))
+    imported = import_pipeline(str(tmp_path / "pipeline.pkl"))
+    assert imported.input is None and imported.features is None
+    # the features of the steps are not exported, and the imported pipeline extracts them again
+    assert imported._feature_results == {} and imported.feature_list.feature_set.empty
+    pd.testing.assert_frame_equal(pipeline.get_features(), features)
+    assert pipeline.feature_list.processed_index == 1
+    pd.testing.assert_frame_equal(_run(imported, ref_ecg_channel), features)
+
+
+def test_e_tuple_parameters(tmp_path):
+    pipeline = _build_pipeline()
+    pipeline.feature_list.extraction_list[0].kwargs["feature_types"] = ("Time",)
+    export_pipeline(pipeline, str(tmp_path / "pipeline.json"))
+    imported = import_pipeline(str(tmp_path / "pipeline.json"))
+    assert imported.feature_list.extraction_list[0].kwargs["feature_types"] == ("Time",)
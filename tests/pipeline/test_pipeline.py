@@ -9,7 +9,10 @@ from biobss.pipeline.bio_channel import Channel
 from biobss.pipeline.bio_data import Bio_Data
 from biobss.pipeline.bio_process import Bio_Process
 from biobss.pipeline.channel_input import *
+from biobss.pipeline.feature_extraction import Feature
 from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.common.signal_filter_design import clear_filter_cache, filter_cache_info
+from biobss.preprocess.signal_filter import filter_signal
 from biobss.preprocess.signal_normalize import normalize_signal
 
 
@@ -162,3 +165,330 @@ def test_q_multiple_process_eda_windowed(sample_eda_channel):
     pipeline.run_pipeline()
 
     assert True
+
+
+def _window_stats(sig):
+    return {"mean": np.mean(sig), "std": np.std(sig), "float64": float(sig.dtype == np.float64)}
+
+
+def _run_dtype_pipeline(channel, dtype):
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5, dtype=dtype)
+    pipeline.set_input(channel)
+    pipeline.process_queue.add_process(
+        Bio_Process(filter_signal, process_name="filter"),
+        input_signals=["ecg"],
+        output_signals=["ecg_filtered"],
+        sampling_rate=256,
+        signal_type="ECG",
+        method="pantompkins",
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"),
+        input_signals=["ecg_filtered"],
+        output_signals=["ecg_normalized"],
+    )
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_normalized"])
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    return pipeline
+
+
+def test_r_dtype_policy(ref_ecg_channel):
+    reference = _run_dtype_pipeline(ref_ecg_channel, None)
+    pipeline = _run_dtype_pipeline(ref_ecg_channel, "float32")
+
+    assert reference.data["ecg"].channel.dtype == np.float64
+    for name in ["ecg", "ecg_filtered", "ecg_normalized"]:
+        assert pipeline.data[name].channel.dtype == np.float32
+        assert pipeline.data[name].channel.nbytes * 2 == reference.data[name].channel.nbytes
+
+    features = pipeline.get_features()
+    # feature steps receive float64 windows
+    assert (features["float64"] == 1).all()
+    assert np.allclose(features["mean"], reference.get_features()["mean"], atol=1e-4)
+    assert np.allclose(features["std"], reference.get_features()["std"], rtol=1e-4)
+
+
+def test_s_memory_mapped_input(ref_ecg_channel, tmp_path):
+    filename = tmp_path / "ecg.npy"
+    np.save(filename, ref_ecg_channel.channel)
+    results = []
+    for channel in [ref_ecg_channel, Channel.from_file(str(filename), name="ecg", sampling_rate=256)]:
+        pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=2, window_view=True)
+        pipeline.set_input(channel)
+        pipeline.process_queue.add_process(
+            Bio_Process(normalize_signal, process_name="normalize"),
+            input_signals=["ecg"],
+            output_signals=["ecg_normalized"],
+        )
+        pipeline.run_pipeline()
+        results.append(pipeline.data)
+
+    # the windows of the mapped input are views of the file
+    assert results[1]["ecg"].is_view
+    assert np.array_equal(results[1]["ecg_normalized"].channel, results[0]["ecg_normalized"].channel)
+
+
+def test_t_lazy_evaluation(ref_ecg_channel):
+    from biobss.pipeline.step_profiler import Step_Profiler
+
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=2)
+    pipeline.set_input(ref_ecg_channel)
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"), input_signals=["ecg"], output_signals=["ecg_norm"]
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="branch", method="minmax"),
+        input_signals=["ecg"],
+        output_signals=["ecg_branch"],
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="branch_minmax", method="minmax"),
+        input_signals=["ecg_branch"],
+        output_signals=["ecg_branch_minmax"],
+    )
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_norm"], feature_prefix="norm")
+    profiler = Step_Profiler(trace_memory=False)
+    pipeline.set_profiler(profiler)
+
+    pipeline.run_pipeline(lazy=True)
+    assert pipeline.data.get_channel_names() == ["ecg"]
+    pipeline.extract_features()
+    # only the process used by the feature step is run
+    assert profiler.report().query("queue == 'process'")["step"].tolist() == ["normalize"]
+    assert pipeline.data.get_channel_names() == ["ecg", "ecg_norm"]
+
+    pipeline.add_feature_step(
+        Feature("stats", _window_stats), input_signals=["ecg_branch_minmax"], feature_prefix="branch"
+    )
+    pipeline.extract_features()
+    processes = profiler.report().query("queue == 'process'")["step"].tolist()
+    assert processes == ["normalize", "branch", "branch_minmax"]
+    assert pipeline.compute() == []
+
+    eager = Bio_Pipeline(windowed_process=True, window_size=4, step_size=2)
+    eager.set_input(ref_ecg_channel)
+    eager.process_queue = pipeline.process_queue
+    eager.set_profiler(None)
+    eager.run_pipeline()
+    assert eager.data == pipeline.data
+    assert np.allclose(pipeline.get_features()["norm_std"], 1)
+
+
+def _incremental_pipeline(channel):
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=2)
+    pipeline.set_input(channel)
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"), input_signals=["ecg"], output_signals=["ecg_norm"]
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="scale"), input_signals=["ecg_norm"], output_signals=["ecg_scaled"]
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="minmax", method="minmax"),
+        input_signals=["ecg"],
+        output_signals=["ecg_minmax"],
+    )
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_scaled"], feature_prefix="scaled")
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_minmax"], feature_prefix="minmax")
+    return pipeline
+
+
+def test_u_incremental_execution(ref_ecg_channel):
+    from biobss.pipeline.step_profiler import Step_Profiler
+
+    pipeline = _incremental_pipeline(ref_ecg_channel)
+    profiler = Step_Profiler(trace_memory=False)
+    pipeline.set_profiler(profiler)
+    pipeline.run_pipeline(incremental=True)
+    pipeline.extract_features(incremental=True)
+    assert len(profiler.report()) == 5
+
+    # nothing changed
+    profiler.clear()
+    pipeline.run_pipeline(incremental=True)
+    pipeline.extract_features(incremental=True)
+    assert len(profiler.report()) == 0
+
+    # a parameter change reruns the step, the steps downstream of it and the features using them
+    profiler.clear()
+    pipeline.process_queue.update_process("scale", method="minmax")
+    pipeline.run_pipeline(incremental=True)
+    pipeline.extract_features(incremental=True)
+    assert profiler.report()["step"].tolist() == ["scale", "stats"]
+    assert profiler.report()["index"].tolist() == [1, 0]
+
+    # a new feature step only runs itself
+    profiler.clear()
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_norm"], feature_prefix="norm")
+    pipeline.extract_features(incremental=True)
+    assert profiler.report()["index"].tolist() == [2]
+
+    reference = _incremental_pipeline(ref_ecg_channel)
+    reference.process_queue.update_process("scale", method="minmax")
+    reference.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_norm"], feature_prefix="norm")
+    reference.run_pipeline()
+    reference.extract_features()
+    assert reference.data == pipeline.data
+    pd.testing.assert_frame_equal(reference.get_features(), pipeline.get_features())
+    assert np.allclose(pipeline.get_features()["scaled_mean"], 0.5, atol=0.5)
+
+    # a new input runs everything again
+    profiler.clear()
+    pipeline.set_input(Channel(ref_ecg_channel.channel * 2, name="ecg", sampling_rate=256))
+    pipeline.run_pipeline(incremental=True)
+    assert len(profiler.report()) == 3
+
+
+def _block_pipeline():
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=3)
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"), input_signals=["ecg"], output_signals=["ecg_norm"]
+    )
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg"], feature_prefix="raw")
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_norm"], feature_prefix="norm")
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["acc"], feature_prefix="acc")
+    return pipeline
+
+
+def test_v_block_processing(tmp_path):
+    rng = np.random.default_rng(0)
+    ecg = rng.normal(size=256 * 95)
+    acc = rng.normal(size=32 * 95)
+    reference = _block_pipeline()
+    data = Bio_Data()
+    data.add_channel(ecg, channel_name="ecg", sampling_rate=256)
+    data.add_channel(acc, channel_name="acc", sampling_rate=32)
+    reference.set_input(data)
+    reference.run_pipeline()
+    reference.extract_features()
+    expected = reference.get_features()
+
+    # chunks of irregular sizes, block boundaries in the middle of windows and a last block of a single window
+    splits = {"ecg": np.cumsum(rng.integers(100, 3000, size=40)), "acc": np.cumsum(rng.integers(10, 400, size=40))}
+    source = {
+        name: np.split(signal, splits[name][splits[name] < len(signal)])
+        for name, signal in [("ecg", ecg), ("acc", acc)]
+    }
+    for block_windows in [1, 5, 30, 1000]:
+        output = tmp_path / f"features_{block_windows}.csv"
+        pipeline = _block_pipeline()
+        n_windows = pipeline.run_blocks(
+            source, str(output), sampling_rate={"ecg": 256, "acc": 32}, block_windows=block_windows
+        )
+        assert n_windows == len(expected)
+        features = pd.read_csv(output, index_col=0)
+        pd.testing.assert_frame_equal(features, expected, check_dtype=False)
+
+    # file-backed channels are read one block at a time
+    np.save(tmp_path / "ecg.npy", ecg)
+    np.save(tmp_path / "acc.npy", acc)
+    mapped = Bio_Data()
+    mapped.add_channel(Channel.from_file(str(tmp_path / "ecg.npy"), name="ecg", sampling_rate=256))
+    mapped.add_channel(Channel.from_file(str(tmp_path / "acc.npy"), name="acc", sampling_rate=32))
+    output = tmp_path / "features_mapped.csv"
+    _block_pipeline().run_blocks(mapped, str(output), block_windows=7)
+    pd.testing.assert_frame_equal(pd.read_csv(output, index_col=0), expected, check_dtype=False)
+
+
+def test_v_block_processing_keeps_state(tmp_path):
+    rng = np.random.default_rng(0)
+    data = Bio_Data()
+    data.add_channel(rng.normal(size=256 * 95), channel_name="ecg", sampling_rate=256)
+    data.add_channel(rng.normal(size=32 * 95), channel_name="acc", sampling_rate=32)
+    pipeline = _block_pipeline()
+    pipeline.set_input(data)
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    expected_data = pipeline.get_data()
+    expected = pipeline.get_features()
+
+    # the data and features of the pipeline are kept by run_blocks
+    pipeline.run_blocks(data, str(tmp_path / "features.csv"), block_windows=7)
+    pipeline.extract_features()
+    pd.testing.assert_frame_equal(pipeline.get_features(), expected)
+    pipeline.run_pipeline(incremental=True)
+    assert pipeline.get_data()["ecg_norm"].channel.shape == expected_data["ecg_norm"].channel.shape
+    assert pipeline.get_data() == expected_data
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    pd.testing.assert_frame_equal(pipeline.get_features(), expected)
+
+
+def _late_stats(x):
+    # the max is only a feature of the windows of the second half of the ramp below
+    features = {"mean": np.mean(x)}
+    if np.mean(x) > 0.5:
+        features["max"] = np.max(x)
+    return features
+
+
+def test_v_block_processing_new_columns(tmp_path):
+    ecg = np.linspace(0, 1, 256 * 60)
+    reference = Bio_Pipeline(windowed_process=True, window_size=4, step_size=3)
+    reference.add_feature_step(Feature("late", _late_stats), input_signals=["ecg"], feature_prefix="ecg")
+    reference.set_input(ecg, sampling_rate=256, name="ecg")
+    reference.run_pipeline()
+    reference.extract_features()
+    expected = reference.get_features()
+    assert expected["ecg_max"].isna().any() and expected["ecg_max"].notna().any()
+
+    for block_windows in [1, 4, 1000]:
+        output = tmp_path / f"features_{block_windows}.csv"
+        pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=3)
+        pipeline.add_feature_step(Feature("late", _late_stats), input_signals=["ecg"], feature_prefix="ecg")
+        pipeline.run_blocks({"ecg": [ecg]}, str(output), sampling_rate={"ecg": 256}, block_windows=block_windows)
+        pd.testing.assert_frame_equal(pd.read_csv(output, index_col=0), expected, check_dtype=False)
+
+
+def test_w_precompute_filters(ref_ecg_channel):
+    clear_filter_cache()
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    pipeline.set_input(ref_ecg_channel)
+    pipeline.process_queue.add_process(
+        Bio_Process(filter_signal, process_name="filter"),
+        input_signals=["ecg"],
+        output_signals=["ecg_filtered"],
+        sampling_rate=256,
+        signal_type="ECG",
+        method="pantompkins",
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(filter_signal, process_name="lowpass", sampling_rate=256, filter_type="lowpass", N=2),
+        input_signals=["ecg_filtered"],
+        output_signals=["ecg_lowpass"],
+        f_upper=20,
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"),
+        input_signals=["ecg_lowpass"],
+        output_signals=["ecg_normalized"],
+    )
+
+    assert pipeline.precompute_filters() == 2
+    assert filter_cache_info()["misses"] == 2
+    pipeline.run_pipeline()
+    n_windows = pipeline.data["ecg"].n_windows
+    info = filter_cache_info()
+    assert info["misses"] == 2
+    assert info["hits"] == 2 * n_windows
+
+
+def test_x_batched_filter(ref_ecg_channel):
+    outputs = {}
+    for batch in [False, True]:
+        pipeline = Bio_Pipeline(windowed_process=True, window_size=4, step_size=2)
+        pipeline.set_input(ref_ecg_channel)
+        pipeline.process_queue.add_process(
+            Bio_Process(filter_signal, process_name="filter", batch=batch),
+            input_signals=["ecg"],
+            output_signals=["ecg_filtered"],
+            sampling_rate=256,
+            signal_type="ECG",
+            method="pantompkins",
+        )
+        pipeline.run_pipeline()
+        outputs[batch] = pipeline.data["ecg_filtered"].channel
+
+    assert outputs[True].ndim == 2 and outputs[True].shape == outputs[False].shape
+    assert np.allclose(outputs[True], outputs[False], rtol=1e-12, atol=1e-12)
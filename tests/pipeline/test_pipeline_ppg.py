@@ -9,6 +9,7 @@ from biobss.pipeline.bio_data import Bio_Data
 from biobss.pipeline.bio_process import Bio_Process
 from biobss.pipeline.channel_input import *
 from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.feature_queue import Feature_Queue
 from biobss.pipeline.pipeline import Bio_Pipeline
 from biobss.ppgtools.ppg_features import *
 from biobss.ppgtools.ppg_freqdomain import *
@@ -213,3 +214,208 @@ def test_p_feature_process(gold_channel):
     pipeline.extract_features()
 
     assert True
+
+
+def test_q_window_view(gold_channel):
+    results = []
+    for window_view in [False, True]:
+        normalize = Bio_Process(normalize_signal, process_name="normalize")
+        pipeline = Bio_Pipeline(windowed_process=True, window_size=5, step_size=1, window_view=window_view)
+        pipeline.set_input(gold_channel)
+        pipeline.process_queue.add_process(
+            normalize, input_signals=["ppg"], output_signals=["ppg_normalized"], sampling_rate=64
+        )
+        pipeline.run_pipeline()
+        results.append(pipeline.get_data())
+
+    assert results[1]["ppg"].is_view
+    assert results[0] == results[1]
+
+
+def test_r_columnar_features(gold_channel):
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=5, step_size=1)
+    pipeline.set_input(gold_channel)
+    segment_features = Feature(name="segment_features", function=from_segment, feature_types=["Stat"], sampling_rate=64)
+    pipeline.add_feature_step(segment_features, feature_prefix="ppg_segment", input_signals=["ppg"])
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+    features = pipeline.get_features()
+
+    windows = pipeline.get_data()["ppg"].channel
+    expected = pd.concat([pd.DataFrame([from_segment(w, 64, feature_types=["Stat"])]) for w in windows])
+    expected.columns = ["ppg_segment_" + c for c in expected.columns]
+    expected.index = range(len(windows))
+
+    pd.testing.assert_frame_equal(features, expected)
+
+
+def _concatenated_rows(rows):
+    # per-window data frames concatenated like the feature queue did before the column store
+    frame = pd.concat([pd.DataFrame([row]) for row in rows])
+    frame.index = range(len(rows))
+    return frame
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        # an integer column that first appears after the first window
+        [{"mean": 0.5}, {"mean": 1.5, "count": 3}, {"mean": 2.5, "count": 4}],
+        # a string feature next to float features
+        [{"mean": 0.5, "label": "a"}, {"mean": 1.5, "label": "b"}],
+        # a column mixing strings and floats, an integer and a boolean column with missing windows
+        [{"x": 1.0, "n": 2**62 + 1, "flag": True}, {"x": "nan", "n": 7}, {"x": 2.0, "flag": False}],
+        [{"n": 2**62 + 1}, {"n": 2**62 + 3}],
+        [{"v": 1}, {"v": 2.5}, {"v": True}],
+    ],
+)
+def test_r_columnar_feature_dtypes(rows):
+    features = Feature_Queue()._to_columns(rows)
+
+    pd.testing.assert_frame_equal(features, _concatenated_rows(rows))
+
+
+_GRADIENT_CALLS = []
+
+
+def _shared_gradient(sig, context):
+    def compute():
+        _GRADIENT_CALLS.append(1)
+        return np.gradient(sig)
+
+    return context.get_or_compute("vpg", sig, compute)
+
+
+def _gradient_mean(sig, context=None):
+    return {"mean": np.mean(_shared_gradient(sig, context))}
+
+
+def _gradient_std(sig, context=None):
+    return {"std": np.std(_shared_gradient(sig, context))}
+
+
+def test_s_shared_context(gold_channel):
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=5, step_size=1)
+    pipeline.set_input(gold_channel)
+    pipeline.add_feature_step(Feature(name="mean", function=_gradient_mean), feature_prefix="vpg", input_signals="ppg")
+    pipeline.add_feature_step(Feature(name="std", function=_gradient_std), feature_prefix="vpg", input_signals="ppg")
+    pipeline.run_pipeline()
+    _GRADIENT_CALLS.clear()
+    pipeline.extract_features()
+    features = pipeline.get_features()
+
+    windows = pipeline.get_data()["ppg"].channel
+    # the gradient of each window is computed once and reused by the second step
+    assert len(_GRADIENT_CALLS) == len(windows)
+    expected = pd.DataFrame(
+        {
+            "vpg_mean": [np.mean(np.gradient(w)) for w in windows],
+            "vpg_std": [np.std(np.gradient(w)) for w in windows],
+        }
+    )
+    pd.testing.assert_frame_equal(features, expected)
+
+
+def _synthetic_ppg(sampling_rate=64, seconds=30):
+    # systolic and diastolic waves of 1 s cycles, delineated without missing or duplicate fiducials
+    phase = np.arange(seconds * sampling_rate) / sampling_rate % 1
+    return np.exp(-((phase - 0.3) ** 2) / 0.02) + 0.4 * np.exp(-((phase - 0.5) ** 2) / 0.02)
+
+
+def test_t_shared_ppg_waves(monkeypatch):
+    from biobss.ppgtools import ppg_peaks
+    from biobss.ppgtools.apg_features import get_apg_features
+    from biobss.ppgtools.vpg_features import get_vpg_features
+
+    calls = {"waves": 0, "derivative": 0}
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(ppg_peaks, "_ppg_waves", counted("waves", ppg_peaks._ppg_waves))
+    monkeypatch.setattr(ppg_peaks, "_derivative", counted("derivative", ppg_peaks._derivative))
+
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    pipeline.set_input(Channel(_synthetic_ppg(), name="ppg", sampling_rate=64))
+    pipeline.process_queue.add_process(
+        Bio_Process(normalize_signal, process_name="normalize"),
+        input_signals=["ppg"],
+        output_signals=["ppg_normalized"],
+        sampling_rate=64,
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(ppg_detectpeaks, process_name="find_peaks", return_index="Peak_locs"),
+        input_signals=["ppg_normalized"],
+        output_signals=["ppg_beats"],
+        sampling_rate=64,
+        delta=0.01,
+        is_event=True,
+    )
+    pipeline.process_queue.add_process(
+        Bio_Process(peak_control, process_name="correct_peaks"),
+        input_signals=["ppg_normalized", "ppg_beats_Peak_locs", "ppg_beats_Trough_locs"],
+        output_signals=["beats"],
+        sampling_rate=64,
+        is_event=True,
+    )
+    pipeline.run_pipeline()
+
+    cycle_features = Feature(
+        name="cycle_features", function=from_cycles, feature_types=["Time"], sampling_rate=64, detect_fiducials=True
+    )
+    vpg_features = Feature(
+        name="vpg_features", function=get_vpg_features, vpg_sig=None, fiducials=None, sampling_rate=64
+    )
+    apg_features = Feature(
+        name="apg_features", function=get_apg_features, apg_sig=None, fiducials=None, sampling_rate=64
+    )
+    pipeline.add_feature_step(
+        cycle_features,
+        feature_prefix="ppg",
+        input_signals={"sig": "ppg_normalized", "peaks_locs": "beats_Peak_locs", "troughs_locs": "beats_Trough_locs"},
+    )
+    for feature, prefix in [(vpg_features, "vpg"), (apg_features, "apg")]:
+        pipeline.add_feature_step(
+            feature, feature_prefix=prefix, input_signals={"ppg_sig": "ppg_normalized", "locs_O": "beats_Trough_locs"}
+        )
+    pipeline.extract_features()
+    features = pipeline.get_features()
+
+    data = pipeline.get_data()
+    windows = data["ppg_normalized"].channel
+    assert not features.isna().any().any()
+    # the fiducials of each window are detected once and the VPG and APG signals calculated once, for all three steps
+    assert calls == {"waves": len(windows), "derivative": 2 * len(windows)}
+
+    expected = []
+    for sig, peaks, onsets in zip(windows, data["beats_Peak_locs"].channel, data["beats_Trough_locs"].channel):
+        fiducials = ppg_peaks.ppg_waves(sig, onsets, 64)
+        vpg_sig = np.gradient(sig) * 64
+        apg_sig = np.gradient(vpg_sig) * 64
+        row = {}
+        for prefix, result in [
+            ("ppg", from_cycles(sig, peaks, onsets, 64, fiducials=fiducials, feature_types=["Time"])),
+            ("vpg", get_vpg_features(vpg_sig, onsets, fiducials, 64)),
+            ("apg", get_apg_features(apg_sig, onsets, fiducials, 64)),
+        ]:
+            row.update({prefix + "_" + key: value for key, value in result.items()})
+        expected.append(row)
+    pd.testing.assert_frame_equal(features, pd.DataFrame(expected), check_dtype=False)
+
+
+def test_u_read_only_context():
+    from biobss.pipeline.feature_context import Feature_Context
+    from biobss.ppgtools.ppg_peaks import ppg_derivatives
+
+    context = Feature_Context()
+    sig = np.sin(np.arange(640) / 64)
+    vpg_sig, apg_sig = ppg_derivatives(sig, 64, context=context)
+    # the shared derivatives cannot be modified in place by a feature step
+    assert not vpg_sig.flags.writeable and not apg_sig.flags.writeable
+    assert ppg_derivatives(sig, 64, context=context)[1] is apg_sig
+    with pytest.raises(ValueError):
+        vpg_sig[0] = 0
@@ -69,3 +69,113 @@ def test_f_queue_results(sample_ecg_array, gold_bio_data):
     test_data = deepcopy(gold_bio_data)
     test_data.add_channel(test_channel)
     assert test_data == results
+
+
+def test_g_batch_process(gold_bio_data, sample_windowed):
+    windowed_data = Bio_Data()
+    windowed_data.add_channel(Channel(sample_windowed, name="ecg", sampling_rate=256))
+    looped = Bio_Process(normalize_signal, process_name="normalize", axis=-1)
+    batched = Bio_Process(normalize_signal, process_name="normalize", batch=True, axis=-1)
+    loop_queue = Process_List()
+    loop_queue.add_process(looped, input_signals=["ecg"], output_signals=["ecg_norm"])
+    batch_queue = Process_List()
+    batch_queue.add_process(batched, input_signals=["ecg"], output_signals=["ecg_norm"])
+    loop_results = loop_queue.run_process_queue(windowed_data)
+    batch_results = batch_queue.run_process_queue(windowed_data)
+    assert batch_results["ecg_norm"].n_windows == sample_windowed.shape[0]
+    assert np.allclose(loop_results["ecg_norm"].channel, batch_results["ecg_norm"].channel)
+
+
+def _multi_queue():
+    normalize = Bio_Process(normalize_signal, process_name="normalize")
+    minmax = Bio_Process(normalize_signal, process_name="minmax", method="minmax")
+    test_queue = Process_List()
+    test_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_norm"])
+    test_queue.add_process(minmax, input_signals=["ecg2"], output_signals=["ecg2_minmax"])
+    test_queue.add_process(minmax, input_signals=["ecg_norm"], output_signals=["ecg_norm_minmax"])
+    return test_queue
+
+
+def test_h_dependency_graph():
+    test_queue = _multi_queue()
+    dependencies, producers = test_queue.get_dependencies(["ecg", "ecg2"])
+    assert dependencies == [set(), set(), {0}]
+    assert producers == {"ecg_norm": 0, "ecg2_minmax": 1, "ecg_norm_minmax": 2}
+    assert test_queue.get_levels([0, 1, 2], dependencies) == [[0, 1], [2]]
+    assert test_queue.get_required_steps(["ecg_norm_minmax"], ["ecg", "ecg2"]) == [0, 2]
+
+
+def test_i_graph_schedule(gold_bio_data, gold_channel):
+    test_data = gold_bio_data.copy()
+    test_data.add_channel(gold_channel, channel_name="ecg2")
+    sequential = _multi_queue().run_process_queue(test_data)
+    graph = _multi_queue().run_process_queue(test_data, schedule="graph")
+    pruned = _multi_queue().run_process_queue(test_data, schedule="graph", required_signals=["ecg_norm_minmax"])
+    assert sequential == graph
+    assert pruned.get_channel_names() == ["ecg", "ecg2", "ecg_norm", "ecg_norm_minmax"]
+
+
+def test_j_compiled_plan(sample_windowed, monkeypatch):
+    import biobss.pipeline.bio_process as bio_process
+
+    calls = []
+    signature = bio_process.inspect.signature
+    monkeypatch.setattr(bio_process.inspect, "signature", lambda f: calls.append(f) or signature(f))
+
+    def scale(signal, factor=1.0, offset=0.0):
+        return signal * factor + offset
+
+    windowed_data = Bio_Data()
+    windowed_data.add_channel(Channel(sample_windowed, name="ecg", sampling_rate=256))
+    test_queue = Process_List()
+    # process kwargs are overridden by queue kwargs, unknown kwargs such as sampling_rate are dropped
+    test_queue.add_process(
+        Bio_Process(scale, process_name="scale", factor=3.0, offset=1.0),
+        input_signals={"signal": "ecg"},
+        output_signals=["ecg_scaled"],
+        offset=2.0,
+        sampling_rate=256,
+    )
+    plan = test_queue.compile()
+    assert test_queue.compile() is plan
+    results = test_queue.run_process_queue(windowed_data)
+    assert np.allclose(results["ecg_scaled"].channel, sample_windowed * 3.0 + 2.0)
+    assert calls == [scale]
+
+    # parameters modified in place are used by the next run
+    test_queue.process_list[0].kwargs["factor"] = 5.0
+    results = test_queue.run_process_queue(windowed_data)
+    assert np.allclose(results["ecg_scaled"].channel, sample_windowed * 5.0 + 2.0)
+    test_queue.kwargs[0]["offset"] = 7.0
+    results = test_queue.run_process_queue(windowed_data)
+    assert np.allclose(results["ecg_scaled"].channel, sample_windowed * 5.0 + 7.0)
+    assert calls == [scale]
+
+
+def _rectify_in_place(signal):
+    signal[signal < 0] = 0
+    return signal
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_k_process_writes_input(sample_ecg_array, batch):
+    signal = np.asarray(sample_ecg_array, dtype=float).flatten()
+    windows = segment_signal(signal, sampling_rate=256, window_size=2, step_size=1, as_view=True)
+    data = Bio_Data()
+    data.add_channel(Channel(windows, name="ecg", sampling_rate=256))
+    assert data["ecg"].is_view
+
+    queue = Process_List()
+    queue.add_process(
+        Bio_Process(_rectify_in_place, process_name="rectify", batch=batch),
+        input_signals=["ecg"],
+        output_signals=["ecg_rectified"],
+    )
+    with pytest.raises(ValueError):
+        queue.run_process_queue(data)
+
+    # the process receives writable copies, the overlapping windows of the input are not changed
+    queue.process_list[0].writes_input = True
+    results = queue.run_process_queue(data)
+    assert np.array_equal(results["ecg_rectified"].channel, np.maximum(windows, 0))
+    assert np.array_equal(data["ecg"].channel, segment_signal(signal, sampling_rate=256, window_size=2, step_size=1))
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.pipeline.pipeline_export import export_pipeline, import_pipeline
+from biobss.pipeline.step_profiler import REPORT_COLUMNS, Step_Profiler
+from biobss.preprocess.signal_normalize import normalize_signal
+
+
+def _window_stats(sig):
+    return {"mean": np.mean(sig), "std": np.std(sig)}
+
+
+@pytest.mark.parametrize("trace_memory", [True, False])
+def test_a_pipeline_profile(ref_ecg_channel, trace_memory):
+    profiler = Step_Profiler(trace_memory=trace_memory)
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=10, step_size=5)
+    pipeline.set_input(ref_ecg_channel)
+    pipeline.set_profiler(profiler)
+    normalize = Bio_Process(normalize_signal, process_name="normalize")
+    pipeline.process_queue.add_process(normalize, input_signals=["ecg"], output_signals=["ecg_normalized"])
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg_normalized"])
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+
+    report = profiler.report()
+    n_windows = len(pipeline.get_features())
+    assert list(report.columns) == REPORT_COLUMNS
+    assert list(report["step"]) == ["normalize", "stats"]
+    assert list(report["windows"]) == [n_windows, n_windows]
+    assert (report["wall_time"] > 0).all()
+    assert report.loc[0, "output_bytes"] == pipeline.get_data()["ecg_normalized"].channel.nbytes
+    assert report["peak_memory"].notna().all() == trace_memory
+
+    records = json.loads(profiler.to_json())
+    assert [r["step"] for r in records] == ["normalize", "stats"]
+    assert "normalize" in profiler.summary() and "stats" in profiler.summary()
+
+    profiler.clear()
+    assert len(profiler.report()) == 0
+
+
+def test_b_pickle_export(ref_ecg_channel, tmp_path):
+    profiler = Step_Profiler()
+    pipeline = Bio_Pipeline()
+    pipeline.set_input(ref_ecg_channel)
+    pipeline.set_profiler(profiler)
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ecg"])
+    pipeline.run_pipeline()
+    pipeline.extract_features()
+
+    export_pipeline(pipeline, str(tmp_path / "pipeline.pkl"))
+    imported = import_pipeline(str(tmp_path / "pipeline.pkl"))
+    assert list(imported.profiler.report()["step"]) == ["stats"]
+
+    imported.profiler.call("feature", 0, "stats", _window_stats, np.zeros(10))
+    assert len(imported.profiler.report()) == 2
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from biobss.pipeline.bio_process import Bio_Process
+from biobss.pipeline.feature_extraction import Feature
+from biobss.pipeline.pipeline import Bio_Pipeline
+from biobss.pipeline.window_buffer import Window_Buffer
+from biobss.preprocess.signal_normalize import normalize_signal
+from biobss.preprocess.signal_segment import segment_signal
+
+
+def _window_stats(sig):
+    return {"mean": np.mean(sig), "std": np.std(sig), "max": np.max(sig)}
+
+
+def _build_pipeline():
+    pipeline = Bio_Pipeline(windowed_process=True, window_size=2, step_size=1)
+    minmax = Bio_Process(normalize_signal, process_name="minmax", method="minmax")
+    pipeline.process_queue.add_process(minmax, input_signals=["ppg"], output_signals=["ppg_normalized"])
+    pipeline.add_feature_step(Feature("stats", _window_stats), input_signals=["ppg_normalized"])
+    return pipeline
+
+
+@pytest.mark.parametrize("step_size", [1, 3])
+def test_a_window_buffer(step_size):
+    signal = np.arange(1000.0)
+    buffer = Window_Buffer(window_samples=20, step_samples=step_size * 10)
+    windows = []
+    for chunk in np.array_split(signal, 37):
+        buffer.append(chunk)
+        while buffer.ready():
+            windows.append(buffer.pop_window())
+    expected = segment_signal(signal, sampling_rate=10, window_size=2, step_size=step_size)
+    assert np.array_equal(np.array(windows), expected)
+
+
+def test_b_stream_matches_batch(sample_ecg_array):
+    signal = np.asarray(sample_ecg_array, dtype=float)[: 64 * 10]
+
+    batch = _build_pipeline()
+    batch.set_input(signal, sampling_rate=64, name="ppg")
+    batch.run_pipeline()
+    batch.extract_features()
+
+    stream = _build_pipeline()
+    stream.start_stream({"ppg": 64})
+    rows = []
+    for chunk in np.array_split(signal, 23):
+        rows.extend(stream.push(chunk, "ppg"))
+    streamed = pd.concat(rows)
+
+    assert streamed.shape == batch.get_features().shape == (9, 3)
+    assert len(stream.stream_latency) == len(rows)
+    assert np.allclose(streamed.values.astype(float), batch.get_features().values.astype(float))
+    assert list(streamed.index) == list(range(len(rows)))
+
+    # the feature queue of the pipeline is not changed by the stream, a batch run after it extracts all windows
+    stream.stop_stream()
+    stream.set_input(signal, sampling_rate=64, name="ppg")
+    stream.run_pipeline()
+    stream.extract_features()
+    pd.testing.assert_frame_equal(stream.get_features(), batch.get_features())
@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 
+from biobss.preprocess import signal_detectpeaks
 from biobss.preprocess.signal_detectpeaks import *
 from biobss.utils.sample_loader import *
 
@@ -22,3 +23,106 @@ def test_num_peaks(load_sample_ppg):
     # assert sum(info_heartpy['Peaks']) ==
     assert len(info_scipy["Peak_locs"]) == 16
     assert sum(sig[info_scipy["Peak_locs"]]) == pytest.approx(16.22889, 0.01)
+
+
+def _reference_peakdet(v, delta, x=None):
+    # sample by sample implementation of https://gist.github.com/endolith/250860
+    maxtab = []
+    mintab = []
+    if x is None:
+        x = np.arange(len(v))
+    v = np.asarray(v)
+    mn, mx = np.inf, -np.inf
+    mnpos, mxpos = np.nan, np.nan
+    lookformax = True
+    for i in np.arange(len(v)):
+        this = v[i]
+        if this > mx:
+            mx = this
+            mxpos = x[i]
+        if this < mn:
+            mn = this
+            mnpos = x[i]
+        if lookformax:
+            if this < mx - delta:
+                maxtab.append((mxpos, mx))
+                mn = this
+                mnpos = x[i]
+                lookformax = False
+        else:
+            if this > mn + delta:
+                mintab.append((mnpos, mn))
+                mx = this
+                mxpos = x[i]
+                lookformax = True
+    return np.array(maxtab), np.array(mintab)
+
+
+def _peakdet_signals():
+    rng = np.random.default_rng(0)
+    t = np.arange(3000) / 64
+    smooth = np.sin(2 * np.pi * 1.2 * t) + 0.3 * np.sin(2 * np.pi * 0.2 * t)
+    noisy = smooth + 0.2 * rng.standard_normal(len(t))
+    with_nan = noisy.copy()
+    with_nan[rng.choice(len(t), 100, replace=False)] = np.nan
+    with_inf = noisy.copy()
+    with_inf[[5, 700, 701, 1500]] = [np.inf, -np.inf, np.inf, -np.inf]
+    return {
+        "smooth": (smooth, 0.5),
+        "noisy": (noisy, 0.3),
+        "plateaus": (np.round(4 * noisy), 1),
+        "integers": (np.round(4 * noisy).astype(int), 2),
+        "float32": (noisy.astype(np.float32), np.float32(0.3)),
+        "nan": (with_nan, 0.3),
+        "inf": (with_inf, 0.3),
+        "constant": (np.ones(50), 0.1),
+        "walk": (np.cumsum(rng.standard_normal(5000)), 2.5),
+        "short": (np.array([0.0, 1.0]), 0.5),
+        "single": (np.array([1.0]), 0.5),
+        "empty": (np.array([]), 0.5),
+    }
+
+
+@pytest.mark.parametrize("name", list(_peakdet_signals()))
+def test_peakdet_parity(name):
+    v, delta = _peakdet_signals()[name]
+    x = None if name != "walk" else np.arange(len(v)) / 64 + 10
+
+    maxtab, mintab = signal_detectpeaks._peakdetection_peakdet(v, delta, x)
+    ref_maxtab, ref_mintab = _reference_peakdet(v, delta, x)
+
+    for table, ref_table in [(maxtab, ref_maxtab), (mintab, ref_mintab)]:
+        assert table.dtype == ref_table.dtype
+        assert table.shape == ref_table.shape
+        assert np.array_equal(table, ref_table)
+
+
+@pytest.mark.parametrize("name", ["smooth", "noisy", "plateaus", "integers", "nan", "inf", "walk"])
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000, None])
+def test_online_peak_detector(name, chunk_size):
+    v, delta = _peakdet_signals()[name]
+    maxtab, mintab = _reference_peakdet(v, delta)
+    if chunk_size is None:
+        chunks = np.split(v, np.sort(np.random.default_rng(1).integers(0, len(v), 40)))
+    else:
+        chunks = [v[i : i + chunk_size] for i in range(0, len(v), chunk_size)]
+
+    detector = OnlinePeakDetector(delta)
+    outputs = [detector.update(chunk) for chunk in chunks]
+
+    assert np.array_equal(np.concatenate([out["Peak_locs"] for out in outputs]), maxtab[:, 0].astype(int))
+    assert np.array_equal(np.concatenate([out["Trough_locs"] for out in outputs]), mintab[:, 0].astype(int))
+    assert detector.n_samples == len(v)
+
+    detector.reset()
+    out = detector.update(v)
+    assert np.array_equal(out["Peak_locs"], maxtab[:, 0].astype(int))
+
+
+def test_online_peak_detector_invalid():
+    with pytest.raises(ValueError):
+        OnlinePeakDetector(0)
+    with pytest.raises(ValueError):
+        OnlinePeakDetector([0.1, 0.2])
+    with pytest.raises(ValueError):
+        OnlinePeakDetector(0.1).update(np.zeros((2, 10)))
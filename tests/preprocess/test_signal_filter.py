@@ -1,7 +1,10 @@
 import numpy as np
 import pytest
+from scipy import signal
 
+from biobss.common.signal_filter_design import *
 from biobss.preprocess.signal_filter import *
+from biobss.preprocess.signal_segment import segment_signal
 from biobss.utils.sample_loader import *
 
 
@@ -19,3 +22,172 @@ def test_signal_lengths(load_sample_ppg):
     assert len(sig) == len(sig_lowpass)
     assert len(sig) == len(sig_highpass)
     assert len(sig) == len(sig_bandpass)
+
+
+def test_signal_dtype(load_sample_ppg):
+
+    data, info = load_sample_ppg
+
+    sig = np.asarray(data["PPG"], dtype=np.float64)
+    fs = info["sampling_rate"]
+
+    sig_bandpass = filter_signal(sig=sig, sampling_rate=fs, filter_type="bandpass", N=2, f_lower=0.5, f_upper=5)
+    sig_bandpass32 = filter_signal(
+        sig=sig.astype(np.float32), sampling_rate=fs, filter_type="bandpass", N=2, f_lower=0.5, f_upper=5
+    )
+    sig_ppg32 = filter_signal(sig=sig.astype(np.float32), sampling_rate=fs, signal_type="PPG", method="bandpass")
+
+    assert sig_bandpass.dtype == np.float64
+    assert sig_bandpass32.dtype == np.float32
+    assert sig_ppg32.dtype == np.float32
+    assert np.allclose(sig_bandpass32, sig_bandpass, rtol=1e-4, atol=1e-4 * np.abs(sig_bandpass).max())
+
+
+def test_filter_design_cache(load_sample_ppg):
+
+    data, info = load_sample_ppg
+
+    sig = np.asarray(data["PPG"], dtype=np.float64)
+    fs = info["sampling_rate"]
+
+    clear_filter_cache()
+    windows = np.array_split(sig, 10)
+    filtered = [
+        filter_signal(sig=w, sampling_rate=fs, filter_type="bandpass", N=2, f_lower=0.5, f_upper=5) for w in windows
+    ]
+    info_ = filter_cache_info()
+
+    sos = signal.butter(2, [0.5 / (fs / 2), 5 / (fs / 2)], "bandpass", output="sos")
+    assert info_["misses"] == 1
+    assert info_["hits"] == len(windows) - 1
+    assert info_["hit_rate"] == (len(windows) - 1) / len(windows)
+    assert np.array_equal(butter_sos(2, [0.5, 5], "bandpass", fs), sos)
+    butter_sos(2, [0.5, 5], "bandpass", fs)[:] = 0
+    assert np.array_equal(butter_sos(2, [0.5, 5], "bandpass", fs), sos)
+    assert all(np.array_equal(f, signal.sosfiltfilt(sos, w)) for f, w in zip(filtered, windows))
+
+    # a different sampling rate or order is a different design
+    butter_sos(2, [0.5, 5], "bandpass", 2 * fs)
+    butter_sos(3, [0.5, 5], "bandpass", fs)
+    assert filter_cache_info()["size"] == 3
+
+    clear_filter_cache()
+    assert precompute_filter_designs(filter_signal, fs, signal_type="ECG", method="pantompkins")
+    assert precompute_filter_designs(filter_signal, fs, filter_type="lowpass", N=4, f_upper=10)
+    assert precompute_filter_designs(filter_ecg, fs, method="notch", f_notch=fs / 4, quality_factor=30)
+    assert not precompute_filter_designs(np.mean, fs)
+    assert filter_cache_info() == {"hits": 0, "misses": 3, "size": 3, "hit_rate": 0.0}
+    filter_signal(sig=sig, sampling_rate=fs, signal_type="ECG", method="pantompkins")
+    filter_signal(sig=sig, sampling_rate=fs, signal_type="ECG", method="notch", f_notch=fs / 4, quality_factor=30)
+    assert filter_cache_info()["hits"] == 2
+    with pytest.raises(ValueError):
+        precompute_filter_designs(filter_signal, fs, filter_type="lowpass", N=4)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"filter_type": "lowpass", "N": 2, "f_upper": 5, "axis": -1},
+        {"filter_type": "bandpass", "N": 2, "f_lower": 0.5, "f_upper": 5, "axis": -1},
+        {"signal_type": "ECG", "method": "pantompkins"},
+        {"signal_type": "ECG", "method": "elgendi"},
+        {"signal_type": "ECG", "method": "notch", "f_notch": 10, "quality_factor": 30},
+        {"signal_type": "PPG", "method": "bandpass"},
+        {"signal_type": "ACC", "method": "lowpass"},
+        {"signal_type": "EDA", "method": "neurokit"},
+    ],
+)
+def test_batched_filtering(load_sample_ppg, kwargs):
+
+    data, info = load_sample_ppg
+
+    sig = np.asarray(data["PPG"], dtype=np.float64)
+    fs = info["sampling_rate"]
+    windows = segment_signal(sig, sampling_rate=fs, window_size=10, step_size=5)
+
+    batched = filter_signal(sig=windows, sampling_rate=fs, **kwargs)
+    single = np.array([filter_signal(sig=window, sampling_rate=fs, **kwargs) for window in windows])
+
+    assert batched.shape == windows.shape
+    assert np.allclose(batched, single, rtol=1e-12, atol=1e-12 * np.abs(single).max())
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"filter_type": "highpass", "N": 3, "f_lower": 0.5},
+        {"filter_type": "bandpass", "N": 2, "f_lower": 0.5, "f_upper": 5},
+        {"signal_type": "ECG", "method": "hamilton"},
+        {"signal_type": "ECG", "method": "notch", "f_notch": 10, "quality_factor": 30},
+        {"signal_type": "PPG"},
+        {"signal_type": "ACC", "method": "lowpass"},
+        {"signal_type": "EDA", "method": "neurokit"},
+    ],
+)
+def test_streaming_filter(load_sample_ppg, kwargs):
+
+    data, info = load_sample_ppg
+
+    sig = np.asarray(data["PPG"], dtype=np.float64)
+    fs = info["sampling_rate"]
+    rng = np.random.default_rng(0)
+    chunks = np.split(sig, np.sort(rng.choice(np.arange(1, len(sig)), size=50, replace=False)))
+
+    streaming = StreamingFilter(fs, **kwargs)
+    expected = signal.sosfilt(streaming.sos, sig)
+    assert np.array_equal(np.concatenate([streaming.filter(chunk) for chunk in chunks]), expected)
+
+    # several signals filtered together, starting in the steady state of their first sample
+    signals = np.vstack([sig, 2 * sig[::-1]]).astype(np.float32)
+    streaming = StreamingFilter(fs, steady_state=True, **kwargs)
+    filtered = np.concatenate([streaming.filter(chunk) for chunk in np.array_split(signals, 7, axis=-1)], axis=-1)
+    zi = signal.sosfilt_zi(streaming.sos)[:, None, :] * signals[None, :, :1].astype(np.float64)
+    assert filtered.dtype == np.float32
+    assert np.array_equal(filtered, signal.sosfilt(streaming.sos, signals, zi=zi)[0].astype(np.float32))
+    with pytest.raises(ValueError):
+        streaming.filter(sig[:10])
+
+    streaming.reset()
+    assert streaming.filter(sig[:10]).shape == (10,)
+
+
+def test_streaming_filter_presets():
+
+    fs = 256
+    assert np.array_equal(
+        StreamingFilter(fs, signal_type="ECG", method="elgendi").sos, butter_sos(2, [8, 20], "bandpass", fs)
+    )
+    assert np.array_equal(
+        StreamingFilter(fs, signal_type="EDA").sos, signal.butter(4, 3, "lowpass", output="sos", fs=fs)
+    )
+    assert StreamingFilter(4, signal_type="EDA").filter(np.arange(5)).tolist() == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        StreamingFilter(fs, signal_type="EDA", method="biosppy")
+    with pytest.raises(ValueError):
+        StreamingFilter(fs, signal_type="ECG", method="notch")
+    with pytest.raises(ValueError):
+        StreamingFilter(fs, filter_type="lowpass", N=2)
+
+
+def test_default_axis(load_sample_ppg):
+
+    data, info = load_sample_ppg
+
+    sig = np.asarray(data["PPG"], dtype=np.float64)
+    fs = info["sampling_rate"]
+    channels = np.column_stack([sig, -sig])
+
+    # (n_samples, n_channels) arrays are filtered along the first axis by default
+    filtered = filter_signal(sig=channels, sampling_rate=fs, filter_type="lowpass", N=2, f_upper=5)
+    single = filter_signal(sig=sig, sampling_rate=fs, filter_type="lowpass", N=2, f_upper=5)
+    assert np.allclose(filtered, np.column_stack([single, -single]))
+
+
+def test_common_exports():
+
+    import biobss.common as common
+    from biobss.common.signal_dtype import as_float_dtype
+
+    # only the public functions of the filter design and dtype helpers are exported by biobss.common
+    assert common.butter_sos is butter_sos and common.as_float_dtype is as_float_dtype
+    assert not any(hasattr(common, name) for name in ["OrderedDict", "threading", "inspect"])
@@ -26,3 +26,16 @@ def test_segment_length(load_sample_eda):
     assert np.shape(segmented)[1] == int(segment_length * fs)
     assert np.shape(segmented_sliding)[0] == num_frames_sliding
     assert np.shape(segmented_sliding)[1] == int(segment_length * fs)
+
+
+def test_segment_view():
+
+    fs = 64
+    sig = np.random.default_rng(0).standard_normal(fs * 60)
+
+    segmented = segment_signal(sig, window_size=10, step_size=1, sampling_rate=fs)
+    segmented_view = segment_signal(sig, window_size=10, step_size=1, sampling_rate=fs, as_view=True)
+
+    assert np.array_equal(segmented, segmented_view)
+    assert np.shares_memory(segmented_view, sig)
+    assert not segmented_view.flags.writeable